@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response
 import os
 import json
 import requests
@@ -7,14 +7,25 @@ import platform
 import traceback
 import uuid
 import tempfile
+import asyncio
 
-# for starting monero service
-import subprocess
+try:
+    from experimental.lmdb_reader import MoneroLMDBReader
+except ImportError as e:
+    print(f"Warning: Could not import lmdb_reader module: {e}")
+    MoneroLMDBReader = None
+
+try:
+    from experimental.async_node_visualization import AsyncMoneroNodeVisualization
+except ImportError as e:
+    print(f"Warning: Could not import async_node_visualization module: {e}")
+    AsyncMoneroNodeVisualization = None
 
 try:
-    from experimental import node_visualization
-    node = node_visualization.MoneroNodeVisualization()
+    from experimental.node_visualization import MoneroNodeVisualization
+    from experimental.node_registry import NodeRegistry
 except ImportError as e:
+    MoneroNodeVisualization = None
     print(f"Warning: Could not import node_visualization module: {e}")
     # Create a minimal mock to prevent startup errors
     class MockNode:
@@ -56,13 +67,95 @@ tempfile.tempdir = app.config["UPLOAD_FOLDER"]
 # RPC configuration for the Monero daemon
 # MONERO_RPC_URL = "http://192.168.177.149:38081/json_rpc"
 MONERO_RPC_URL = "http://127.0.0.1:18081"
+# Every daemon to serve reads from; with more than one, a DaemonPool balances and fails over between them
+MONERO_RPC_URLS = [MONERO_RPC_URL]
+# The asyncio client talks to a single daemon, so pooled setups use the pooled client instead
+ASYNC_RPC = AsyncMoneroNodeVisualization is not None and len(MONERO_RPC_URLS) == 1
+# monerod binary used for the per-dataset instances started from /start-service
+MONEROD_PATH = "/home/kali/ShadowX/monero-x86_64-linux-gnu-v0.18.4.4/monerod"
+# Deepest multi-hop transaction graph a request may ask for
+MAX_GRAPH_DEPTH = 5
+# Largest node and edge budgets a graph request may ask for
+MAX_GRAPH_NODES = 10000
+MAX_GRAPH_EDGES = 25000
+
+# Resumable chunked uploads of large data.mdb files
+from experimental.chunked_upload import ChunkedUploadManager, UploadError
+upload_manager = ChunkedUploadManager(app.config["UPLOAD_FOLDER"])
+
+# Confirmed blocks and transactions, shared by every route
+from experimental.block_cache import BlockCache
+block_cache = BlockCache(os.path.join(app.config["UPLOAD_FOLDER"], "chain_cache.sqlite"))
+
+# Global output index → origin table, built with `python -m experimental.output_index`
+from experimental.output_index import OutputIndex
+output_index = OutputIndex(os.path.join(app.config["UPLOAD_FOLDER"], "output_index.bin"))
+
+# Local indexed copy of recent blocks, kept current by the chain follower below
+from experimental.chain_store import ChainStore, PAGE_SIZE
+chain_store = ChainStore(os.path.join(app.config["UPLOAD_FOLDER"], "chain_store.sqlite"))
+MAX_KEY_IMAGE_LOOKUP = 10000
+
+from experimental.graph_stream import ndjson_lines, NDJSON_MIMETYPE
+from experimental.graph_model import Graph
+
+def graph_stream_response(events):
+    """Stream graph events as NDJSON; ?compact=1 sends only ids and types (details via /api/graph/node)"""
+    compact = request.args.get("compact", "0").lower() in ("1", "true")
+    return Response(ndjson_lines(events, compact), mimetype=NDJSON_MIMETYPE)
+
+def graph_response(result):
+    """A visualize_* result as JSON; compact Graphs are encoded directly, without the dict form"""
+    if isinstance(result, Graph):
+        return Response(result.to_json(), mimetype="application/json")
+    return jsonify(result)
 
-try:
-    from experimental.node_visualization import MoneroNodeVisualization
-    node = MoneroNodeVisualization(rpc_url= "http://127.0.0.1:18081" )
-except ImportError as e:
-    print(f"Warning: Could not import node_visualization module: {e}")
-    # Keep your mock implementation
+if MoneroNodeVisualization is not None:
+    # Height → (timestamp, cumulative RingCT outputs) for the whole chain, extended by the chain follower
+    from experimental.height_index import HeightIndex
+    height_index = HeightIndex(os.path.join(app.config["UPLOAD_FOLDER"], "height_index.bin"))
+
+    # One long-lived client per daemon URL
+    node_registry = NodeRegistry(cache=block_cache, output_index=output_index, chain_store=chain_store,
+                                 height_index=height_index)
+    if len(MONERO_RPC_URLS) > 1:
+        node = node_registry.get_pooled(MONERO_RPC_URLS)
+        # The follower and watcher diff successive answers, so they stay on one daemon while it is healthy
+        follower_node = node_registry.get_pooled(MONERO_RPC_URLS, sticky=True)
+    else:
+        node = follower_node = node_registry.get(MONERO_RPC_URL)
+
+    # Ingests new blocks into chain_store and rolls it back on reorgs
+    from experimental.chain_follower import ChainFollower
+    chain_follower = ChainFollower(follower_node, chain_store, height_index=height_index)
+
+    # Tracks the transaction pool incrementally and pushes changes to /api/mempool/events
+    from experimental.mempool_watcher import MempoolWatcher
+    mempool_watcher = MempoolWatcher(follower_node)
+
+    # Probes the daemons in the background; status routes only read its snapshot
+    from experimental.health_monitor import HealthMonitor
+    health_monitor = HealthMonitor(node_registry, MONERO_RPC_URLS)
+else:
+    health_monitor = None
+    chain_follower = None
+    mempool_watcher = None
+
+# One monerod per uploaded dataset on its own ports; API routes reach it with ?dataset=<id>
+from experimental.monerod_supervisor import MonerodSupervisor, MonerodError, HOLD_TIMEOUT
+from experimental.daemon_readiness import SERVING_STATES
+monerod_supervisor = MonerodSupervisor(MONEROD_PATH, app.config["UPLOAD_FOLDER"],
+                                       node_class=MoneroNodeVisualization, health_monitor=health_monitor)
+
+# `python app.py` runs the debug reloader: a parent process that only watches for file changes
+# and a serving child (WERKZEUG_RUN_MAIN set) that re-imports this module. The background
+# threads start in the serving process only, so a single follower writes to chain_store
+USE_RELOADER = True
+RELOADER_PARENT = __name__ == "__main__" and USE_RELOADER and os.environ.get("WERKZEUG_RUN_MAIN") != "true"
+if not RELOADER_PARENT:
+    for worker in (chain_follower, mempool_watcher, health_monitor, monerod_supervisor):
+        if worker is not None:
+            worker.start()
 
 @app.route("/")
 def home():
@@ -86,124 +179,111 @@ def visual_with_tx(tx_hash):
     """Render the visualization page with a transaction hash pre-loaded"""
     return render_template('visual.html', initial_tx=tx_hash)
 
-# functn to start monero service
-def start_monerod(data_dir, rpc_port=38081):
-    """
-    Start the Monero daemon in stagenet mode using the provided data.mdb file.
-    """
-    try:
-    	# monerod path
-        monerod_path = "/home/kali/ShadowX/monero-x86_64-linux-gnu-v0.18.4.4/monerod"
-    
-        # Generate a unique RPC port for this instance (e.g., range 38081–38100)
-        # rpc_port = 38081 + hash(data_dir) % 20
-
-        # Build the monerod command
-        command = [
-            monerod_path,
-            "--stagenet",
-            "--data-dir", data_dir,
-            "--rpc-bind-ip", "127.0.0.1",
-            "--rpc-bind-port", str(rpc_port),
-            "--non-interactive",
-            "--confirm-external-bind"
-        ]
-
-        # Start the process
-        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-        # Return process details
-        return {"process": process, "rpc_port": rpc_port}
-    except Exception as e:
-        print(f"Error starting monerod: {str(e)}")
-        return None
-
-monerod_process_data = {"process": None, "rpc_port": None}
 @app.route("/start-service", methods=["POST"])
 def start_monero_service():
     """
-    Start the Monero daemon service and return the RPC URL.
+    Start a monerod for a dataset ({"dataset_id": ...}, default: the latest upload).
+    It answers 202 while the daemon starts up; poll /api/monerod/<dataset_id> for its progress.
     """
-    global monerod_process_data
+    data = request.get_json(silent=True) or {}
+    dataset_id = data.get("dataset_id") or monerod_supervisor.latest_dataset()
+    if dataset_id is None:
+        return jsonify({"error": "No uploaded dataset to serve"}), 404
     try:
-        # Directory to store the blockchain data
-        data_dir = os.path.join(app.config["UPLOAD_FOLDER"], "monero_stagenet")
-        # Ensure the directory exists
-        os.makedirs(data_dir, exist_ok=True)
-
-        # Attempt to parse the JSON body
-        try:
-            request_data = request.get_json() or {}
-        except Exception as e:
-            return jsonify({"error": "Invalid JSON data"}), 400
-
-        # Get the port from the request or use default
-        rpc_port = request.json.get("rpc_port", 38081)
-        # Start monerod
-        monerod_process = start_monerod(data_dir, rpc_port)
-
-        if monerod_process:
-            # Store the process details
-            monerod_process_data["process"] = monerod_process["process"]
-            monerod_process_data["rpc_port"] = monerod_process["rpc_port"]
-
-            return jsonify({
-                "message": "Monero service started successfully.",
-                "rpc_url": f"http://127.0.0.1:{monerod_process['rpc_port']}/json_rpc",
-            }), 200
-        else:
-            return jsonify({"error": "Failed to start Monero service."}), 500
-
-    except Exception as e:
-        return jsonify({"error": f"An error occurred: {str(e)}"}), 500
+        instance = monerod_supervisor.launch(dataset_id)
+    except MonerodError as e:
+        return jsonify({"error": str(e)}), e.status
+    status = instance.status()
+    if instance.state in SERVING_STATES:
+        return jsonify({**status, "message": "Monero service is running."}), 200
+    return jsonify({**status, "message": f"Monero service is {instance.state}: {status['message']}"}), 202
 
 @app.route('/end-service', methods=["POST"])
 def end_service():
     """
-    Stop the Monero daemon service.
+    Stop the monerod of a dataset ({"dataset_id": ...}), or every supervised monerod.
     """
-    global monerod_process_data
-
-    # Check if a process is running
-    if monerod_process_data["process"] is None:
-        return jsonify({"error": "No Monero service is currently running."}), 400
-
+    dataset_id = (request.get_json(silent=True) or {}).get("dataset_id")
     try:
-        # Terminate the process
-        process = monerod_process_data["process"]
-        process.terminate()
-        process.wait(timeout=10)  # Wait for up to 10 seconds for the process to terminate
-        print("Monero service stopped successfully.")
-
-        # Clear the process data
-        monerod_process_data = {"process": None, "rpc_port": None}
-        return jsonify({"message": "Monero service stopped successfully."}), 200
-    except subprocess.TimeoutExpired:
-        # If the process did not terminate, kill it
-        process.kill()
-        monerod_process_data = {"process": None, "rpc_port": None}
-        return jsonify({"message": "Monero service forcefully stopped."}), 200
+        if dataset_id:
+            stopped = [monerod_supervisor.stop_instance(dataset_id)]
+        else:
+            stopped = monerod_supervisor.stop_all()
+    except MonerodError as e:
+        return jsonify({"error": str(e)}), e.status
     except Exception as e:
         print(f"Error stopping Monero service: {str(e)}")
         return jsonify({"error": f"Failed to stop Monero service: {str(e)}"}), 500
+    if not stopped:
+        return jsonify({"error": "No Monero service is currently running."}), 400
+    return jsonify({
+        "message": "Monero service stopped successfully.",
+        "stopped": [instance.dataset_id for instance in stopped],
+    }), 200
+
+@app.route('/api/monerod')
+def monerod_instances():
+    """Every supervised monerod with its state, ports and recent output"""
+    return jsonify({"instances": monerod_supervisor.status()})
+
+@app.route('/api/monerod/<dataset_id>')
+def monerod_instance(dataset_id):
+    """Startup state of one dataset's monerod (starting, loading, syncing, ready, failed, stopped) and its progress"""
+    try:
+        return jsonify(monerod_supervisor.instance(dataset_id, finished=True).status())
+    except MonerodError as e:
+        return jsonify({"error": str(e)}), e.status
+
+@app.errorhandler(MonerodError)
+def monerod_error(e):
+    response = jsonify({"error": str(e), **e.details})
+    if e.retry_after:
+        response.headers["Retry-After"] = str(e.retry_after)
+    return response, e.status
+
+def dataset_node():
+    """The client for ?dataset=<id>, i.e. that dataset's own monerod, else the default daemon
+
+    A request for a daemon that is still starting is held until it can serve;
+    ?wait=<seconds> bounds the hold (0 answers with the progress at once).
+    """
+    dataset_id = request.args.get("dataset")
+    if not dataset_id:
+        return node
+    wait = request.args.get("wait", HOLD_TIMEOUT, type=float)
+    return monerod_supervisor.node(dataset_id, wait=max(0.0, min(wait, HOLD_TIMEOUT)))
 
 
 @app.route('/api/transaction/<tx_hash>')
 def api_get_transaction(tx_hash):
     """API endpoint to get transaction data for graph visualization"""
     try:
-        data = node.process_data_mdb_for_transaction(tx_hash)
+        data = dataset_node().process_data_mdb_for_transaction(tx_hash)
         return jsonify(data)
+    except MonerodError:
+        raise
     except Exception as e:
         print(f"Error in api_get_transaction: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/block/<height>')
-def api_get_block(height):
+async def api_get_block(height):
     """API endpoint to get block data for graph visualization"""
     try:
-        data = node.process_data_mdb_for_block(height)
-        return jsonify(data)
+        client = dataset_node()
+        if request.args.get("format") == "ndjson":
+            if not height.isdigit():
+                return jsonify({'error': 'Invalid block height format'}), 400
+            return graph_stream_response(client.stream_block_graph(int(height)))
+        if AsyncMoneroNodeVisualization is None:
+            return jsonify(client.process_data_mdb_for_block(height))
+        if not ASYNC_RPC or client is not node:
+            return graph_response(await asyncio.to_thread(client.visualize_block, height, as_graph=True))
+        async with AsyncMoneroNodeVisualization(MONERO_RPC_URL, cache=block_cache) as async_node:
+            data = await async_node.visualize_block(height, as_graph=True)
+        return graph_response(data)
+    except MonerodError:
+        raise
     except Exception as e:
         print(f"Error in api_get_block: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -227,28 +307,26 @@ def upload():
         # Ensure the upload folder exists
         os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
         
-        # Save the file with a unique name
-        unique_filename = f"{uuid.uuid4().hex}_{file.filename}"
-        file_path = os.path.join(app.config["UPLOAD_FOLDER"], unique_filename)
-        print(f"Saving uploaded file to: {file_path}")
-        file.save(file_path)
-
-        # Rename the file back to "data.mdb" for processing
-        renamed_file_path = os.path.join(app.config["UPLOAD_FOLDER"], "data.mdb")
-        os.rename(file_path, renamed_file_path)  # Rename the file to "data.mdb"
-        print(f"Renamed file to: {renamed_file_path}")
+        # Each upload is its own dataset directory, the layout chunked uploads use, so
+        # a later upload never replaces the data.mdb a running monerod has open
+        dataset_id = uuid.uuid4().hex
+        dataset_dir = os.path.join(app.config["UPLOAD_FOLDER"], dataset_id)
+        os.makedirs(dataset_dir)
+        renamed_file_path = os.path.join(dataset_dir, "data.mdb")
+        print(f"Saving uploaded file to: {renamed_file_path}")
+        file.save(renamed_file_path)
 
         # Process the renamed file
         try:
             print("Calling process_data_mdb_direct...")
-            result = node.process_data_mdb_direct(renamed_file_path)
+            result = summarize_uploaded_mdb(renamed_file_path)
             print(f"Result from processing: {result is not None}")
         except Exception as e:
             print(f"Error processing file: {str(e)}")
             return jsonify({"error": f"Failed to process the uploaded file: {str(e)}"}), 500
 
         # Return success response
-        return jsonify({"message": "File uploaded and processed successfully"}), 200
+        return jsonify({"message": "File uploaded and processed successfully", "dataset_id": dataset_id}), 200
 
     except Exception as e:
         error_details = traceback.format_exc()
@@ -257,6 +335,69 @@ def upload():
         return jsonify({"error": f"An error occurred: {str(e)}"}), 500
 
 
+def summarize_uploaded_mdb(file_path):
+    """Summarize an uploaded data.mdb, reading it directly when the LMDB reader is available"""
+    if MoneroLMDBReader is None:
+        return node.process_data_mdb_direct(file_path)
+    reader = MoneroLMDBReader(file_path)
+    try:
+        return reader.process_data_mdb_direct(file_path)
+    finally:
+        reader.close()
+
+
+@app.route("/upload/chunked", methods=["POST"])
+def chunked_upload_create():
+    """Start a resumable upload; the client then PUTs the file in chunks"""
+    data = request.get_json(silent=True) or {}
+    try:
+        status = upload_manager.create(data.get("filename", ""), data.get("size"))
+        return jsonify(status), 201
+    except UploadError as e:
+        return jsonify({"error": str(e), **e.details}), e.status
+
+
+@app.route("/upload/chunked/<upload_id>", methods=["GET"])
+def chunked_upload_status(upload_id):
+    """Bytes received so far, i.e. where a client should resume"""
+    try:
+        return jsonify(upload_manager.status(upload_id))
+    except UploadError as e:
+        return jsonify({"error": str(e), **e.details}), e.status
+
+
+@app.route("/upload/chunked/<upload_id>", methods=["PUT"])
+def chunked_upload_chunk(upload_id):
+    """Stream one raw chunk body to disk at ?offset=<bytes already received>"""
+    offset = request.args.get("offset", type=int)
+    if offset is None:
+        return jsonify({"error": "Missing offset"}), 400
+    try:
+        # request.stream is read incrementally, never buffered whole
+        return jsonify(upload_manager.write_chunk(upload_id, offset, request.stream))
+    except UploadError as e:
+        return jsonify({"error": str(e), **e.details}), e.status
+
+
+@app.route("/upload/chunked/<upload_id>/complete", methods=["POST"])
+def chunked_upload_complete(upload_id):
+    """Verify the checksum, finalize data.mdb and process it"""
+    data = request.get_json(silent=True) or {}
+    try:
+        status = upload_manager.complete(upload_id, data.get("sha256"))
+    except UploadError as e:
+        return jsonify({"error": str(e), **e.details}), e.status
+
+    try:
+        result = summarize_uploaded_mdb(status["path"])
+        print(f"Result from processing: {result is not None}")
+    except Exception as e:
+        print(f"Error processing file: {str(e)}")
+        return jsonify({"error": f"Failed to process the uploaded file: {str(e)}"}), 500
+
+    return jsonify({"message": "File uploaded and processed successfully", "dataset_id": upload_id, **status}), 200
+
+
 @app.route("/process-upload", methods=["POST"])
 def process_upload():
     """
@@ -275,8 +416,6 @@ def process_upload():
         return jsonify({"error": "Invalid file type. Only data.mdb files are allowed."}), 400
 def visual_latest():
     """Render the visualization page with the latest transaction"""
-    node = MoneroNodeVisualization(MONERO_RPC_URL)
-    
     # Get the latest block height
     info_result = node._make_rpc_call("get_info")
     if "result" not in info_result:
@@ -323,18 +462,140 @@ def visual_latest():
 
 @app.route('/api/check_rpc_status')
 def check_rpc_status():
-    """Check all required RPC connections and return status"""
+    """Cached RPC status from the background health monitor (no RPCs are made here)"""
     try:
-        status = node.check_rpc_connections()
-        return jsonify({"success": True, "checks": status})
+        if health_monitor is None:
+            return jsonify({"success": False, "error": "Node visualization module not available"})
+        status = health_monitor.snapshot(MONERO_RPC_URL)
+        daemons = [health_monitor.snapshot(url) for url in health_monitor.urls()]
+        return jsonify({"success": True, "checks": status["checks"], "status": status, "daemons": daemons})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
+@app.route('/api/rpc_status/history')
+def rpc_status_history():
+    """Buffered health samples (latency, height, sync status) for charting"""
+    if health_monitor is None:
+        return jsonify({"error": "Node visualization module not available"}), 503
+    rpc_url = request.args.get("url", MONERO_RPC_URL)
+    if rpc_url not in health_monitor.urls():
+        return jsonify({"error": f"{rpc_url} is not monitored"}), 404
+    return jsonify({"url": rpc_url, "samples": health_monitor.history(rpc_url)})
+
+@app.route('/api/daemon_pool')
+def daemon_pool_status():
+    """Routing state of the daemon pool: in-flight requests, heights, cooldowns, hedges and latency"""
+    pool = node_registry.pool(MONERO_RPC_URLS) if health_monitor is not None else None
+    if pool is None:
+        return jsonify({"error": "Only one daemon is configured (see MONERO_RPC_URLS)"}), 404
+    return jsonify(pool.status())
+
+@app.route('/api/chain_store/status')
+def chain_store_status():
+    """Checkpoint height and lag of the local chain store"""
+    if chain_follower is None:
+        return jsonify({"error": "Node visualization module not available"}), 503
+    return jsonify(chain_follower.status())
+
+@app.route('/api/mempool')
+def mempool_snapshot():
+    """Pending transactions with their first-seen times, plus pool and confirmation latency stats"""
+    if mempool_watcher is None:
+        return jsonify({"error": "Node visualization module not available"}), 503
+    return jsonify(mempool_watcher.snapshot())
+
+@app.route('/api/mempool/stats')
+def mempool_stats():
+    """Pool size, confirmed/dropped counts and first-seen-to-confirmation latency percentiles"""
+    if mempool_watcher is None:
+        return jsonify({"error": "Node visualization module not available"}), 503
+    return jsonify(mempool_watcher.stats())
+
+@app.route('/api/mempool/events')
+def mempool_events():
+    """Server-Sent Events: a pool snapshot (or the events missed since Last-Event-ID), then add/remove events"""
+    if mempool_watcher is None:
+        return jsonify({"error": "Node visualization module not available"}), 503
+    last_event_id = request.headers.get("Last-Event-ID", request.args.get("last_event_id"))
+    last_event_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    return Response(mempool_watcher.sse_lines(last_event_id), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route('/api/key_images', methods=['POST'])
+def lookup_key_images():
+    """Bulk spent check: {"key_images": [...]} → the spending tx and height for each seen key image"""
+    key_images = (request.get_json(silent=True) or {}).get("key_images")
+    if not isinstance(key_images, list) or not all(isinstance(ki, str) for ki in key_images):
+        return jsonify({"error": "Expected a JSON body with a key_images list"}), 400
+    if len(key_images) > MAX_KEY_IMAGE_LOOKUP:
+        return jsonify({"error": f"At most {MAX_KEY_IMAGE_LOOKUP} key images per request"}), 400
+    results = chain_store.lookup_key_images(key_images)
+    tip = chain_store.tip()
+    return jsonify({
+        "results": results,
+        "spent": sum(1 for spend in results.values() if spend),
+        "indexed_height": tip[0] if tip else None
+    })
+
+def table_page(fetch, **filters):
+    """One page of a chain store table as JSON
+
+    Speaks DataTables server-side processing (draw, start, length, order[0][...],
+    search[value]) when ?draw= is present, else plain ?sort=&order=&limit=&search=.
+    Either way ?after=<cursor> (the previous page's "next") continues by keyset
+    instead of walking the index up to an offset.
+    """
+    args = request.args
+    draw = args.get("draw", type=int)
+    if draw is not None:
+        column = args.get("order[0][column]", type=int)
+        sort = args.get(f"columns[{column}][data]", "height") if column is not None else "height"
+        descending = args.get("order[0][dir]", "desc") != "asc"
+        limit = args.get("length", PAGE_SIZE, type=int)
+        offset = args.get("start", 0, type=int)
+        search = args.get("search[value]")
+    else:
+        sort = args.get("sort", "height")
+        descending = args.get("order", "desc") != "asc"
+        limit = args.get("limit", PAGE_SIZE, type=int)
+        offset = args.get("offset", 0, type=int)
+        search = args.get("search")
+    try:
+        page = fetch(sort=sort, descending=descending, limit=limit, after=args.get("after"), offset=offset,
+                     search=search, min_height=args.get("min_height", type=int),
+                     max_height=args.get("max_height", type=int), **filters)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if draw is None:
+        return jsonify(page)
+    return jsonify({
+        "draw": draw,
+        "recordsTotal": page["total"],
+        "recordsFiltered": page["filtered"],
+        "data": page["rows"],
+        "next": page["next"],
+    })
+
+@app.route('/api/blocks')
+def api_blocks():
+    """Paginated blocks from the chain store; sort by height, timestamp or num_txes"""
+    return table_page(chain_store.page_blocks)
+
+@app.route('/api/transactions')
+def api_transactions():
+    """Paginated non-miner transactions from the chain store; sort by height, fee or ring_size"""
+    return table_page(
+        chain_store.page_transactions,
+        ring_size=request.args.get("ring_size", type=int),
+        min_fee=request.args.get("min_fee", type=int),
+        max_fee=request.args.get("max_fee", type=int),
+    )
+
 @app.route('/transaction/<tx_hash>')
 def display_transaction(tx_hash):
     try:
         # Use the MoneroNodeVisualization class to get transaction data
-        tx_data = node.get_transaction(tx_hash)
+        tx_data = dataset_node().get_transaction(tx_hash)
         
         print(f"Transaction data: {json.dumps(tx_data, indent=2)}")
         
@@ -348,10 +609,30 @@ def display_transaction(tx_hash):
         return render_template('error.html', error=str(e))
         
 @app.route('/api/graph/transaction/<tx_hash>')
-def api_graph_transaction(tx_hash):
-    node = MoneroNodeVisualization("http://127.0.0.1:18081")
+async def api_graph_transaction(tx_hash):
     print(f"API graph request for transaction hash: {tx_hash}")
-    result = node.visualize_transaction(tx_hash)
+    depth = max(1, min(request.args.get("depth", 1, type=int), MAX_GRAPH_DEPTH))
+    graph_args = {
+        "graph_depth": depth,
+        "max_nodes": max(1, min(request.args.get("max_nodes", 2000, type=int), MAX_GRAPH_NODES)),
+        "max_edges": max(0, min(request.args.get("max_edges", 5000, type=int), MAX_GRAPH_EDGES))
+    }
+    client = dataset_node()
+    if request.args.get("format") == "ndjson":
+        return graph_stream_response(client.stream_transaction_graph(tx_hash, **graph_args))
+    if not ASYNC_RPC or depth > 1 or client is not node:
+        # Multi-hop expansion is a sequence of batched frontier calls; keep it off the event loop
+        return graph_response(await asyncio.to_thread(client.visualize_transaction, tx_hash, as_graph=True, **graph_args))
+    async with AsyncMoneroNodeVisualization(MONERO_RPC_URL, cache=block_cache, output_index=output_index) as async_node:
+        result = await async_node.visualize_transaction(tx_hash, as_graph=True)
+    return graph_response(result)
+
+@app.route('/api/graph/node/<path:node_id>')
+def api_graph_node(node_id):
+    """Full data for one node of a compact graph stream"""
+    result = dataset_node().get_graph_node_detail(node_id)
+    if "error" in result:
+        return jsonify(result), 404
     return jsonify(result)
         
 from datetime import datetime
@@ -381,4 +662,4 @@ if __name__ == "__main__":
     print(f"- Platform: {platform.system()} {platform.release()}")
     
     # Start the Flask app
-    app.run(debug=True)
+    app.run(debug=True, use_reloader=USE_RELOADER)
@@ -0,0 +1,282 @@
+import asyncio
+
+import aiohttp
+
+from experimental.node_visualization import MoneroNodeVisualization, DECODE_TX_BLOBS
+from experimental.output_resolver import GET_OUTS_BATCH
+
+# Upper bound on RPCs in flight to one daemon from a single client
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 10
+# Tx hashes per get_transactions call when a block's transactions are fetched in parallel
+TX_FETCH_CHUNK = 25
+
+
+async def _none():
+    return None
+
+
+class AsyncMoneroNodeVisualization:
+    """asyncio twin of MoneroNodeVisualization that runs independent RPCs concurrently
+
+    Use as an async context manager so the aiohttp session is bound to the running loop:
+
+        async with AsyncMoneroNodeVisualization(url) as node:
+            graph = await node.visualize_transaction(tx_hash)
+    """
+
+    def __init__(self, rpc_url="http://localhost:18081", max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 timeout=DEFAULT_TIMEOUT, cache=None, output_index=None):
+        self.rpc_url = rpc_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.cache = cache
+        self.output_index = output_index
+        self.tip_height = None
+        self.session = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"Content-Type": "application/json"},
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+
+    # Shared with the synchronous client
+    _format_timestamp = MoneroNodeVisualization._format_timestamp
+    _note_tip = MoneroNodeVisualization._note_tip
+    _attach_block_transactions = staticmethod(MoneroNodeVisualization._attach_block_transactions)
+    _build_transaction_graph = staticmethod(MoneroNodeVisualization._build_transaction_graph)
+    _build_block_graph = staticmethod(MoneroNodeVisualization._build_block_graph)
+    _ring_members = staticmethod(MoneroNodeVisualization._ring_members)
+    _indexed_origins = staticmethod(MoneroNodeVisualization._indexed_origins)
+    _get_outs_params = staticmethod(MoneroNodeVisualization._get_outs_params)
+    _origins_from_outs = staticmethod(MoneroNodeVisualization._origins_from_outs)
+    _decode_tx_entries = staticmethod(MoneroNodeVisualization._decode_tx_entries)
+
+    async def _post(self, endpoint, payload):
+        async with self._semaphore:
+            async with self.session.post(f"{self.rpc_url}/{endpoint}", json=payload) as response:
+                if response.status != 200:
+                    return response.status, None
+                # monerod labels some replies text/plain, so skip the content-type check
+                return response.status, await response.json(content_type=None)
+
+    async def _make_rpc_call(self, method, params=None):
+        """Make RPC call to Monero daemon"""
+        payload = {
+            "jsonrpc": "2.0",
+            "id": "0",
+            "method": method
+        }
+
+        if params:
+            payload["params"] = params
+
+        try:
+            status, result = await self._post("json_rpc", payload)
+            if result is None:
+                print(f"❌ RPC call failed: {method} - HTTP {status}")
+                return {"error": f"HTTP Error: {status}"}
+            if "result" in result:
+                if method == "get_info":
+                    self._note_tip(result["result"].get("height", 0) - 1)
+                return result
+            error_msg = result.get("error", {}).get("message", "Unknown error")
+            print(f"❌ RPC call failed: {method} - {error_msg}")
+            return {"error": error_msg}
+        except aiohttp.ClientConnectionError:
+            print(f"❌ RPC connection error: Could not connect to {self.rpc_url}")
+            return {"error": f"Connection refused to {self.rpc_url}"}
+        except Exception as e:
+            print(f"❌ RPC call exception ({method}): {str(e)}")
+            return {"error": str(e)}
+
+    async def _make_non_json_rpc_call(self, endpoint, params=None):
+        """Make RPC call to non-JSON RPC endpoints"""
+        try:
+            status, result = await self._post(endpoint, params)
+            if result is None:
+                print(f"❌ Non-JSON RPC call failed: {endpoint} - HTTP {status}")
+                return {"error": f"HTTP Error: {status}"}
+            return result
+        except aiohttp.ClientConnectionError:
+            print(f"❌ RPC connection error: Could not connect to {self.rpc_url}/{endpoint}")
+            return {"error": f"Connection refused to {self.rpc_url}/{endpoint}"}
+        except Exception as e:
+            print(f"❌ Non-JSON RPC call exception ({endpoint}): {str(e)}")
+            return {"error": str(e)}
+
+    async def check_rpc_connections(self):
+        """Test all required RPC endpoints concurrently and return status"""
+        info, block, pool, txs = await asyncio.gather(
+            self._make_rpc_call("get_info"),
+            self._make_rpc_call("get_block", {"height": 0}),
+            self._make_rpc_call("get_transaction_pool"),
+            self._make_non_json_rpc_call("get_transactions", {"txs_hashes": []}),
+        )
+        return {
+            "get_info": "result" in info,
+            "get_block": "result" in block,
+            "get_transactions": "error" not in txs,
+            "get_transaction_pool": "result" in pool
+        }
+
+    async def get_network_stats(self):
+        """Get network statistics with all five calls in flight at once"""
+        info, hard_fork, connections, mining, fee = await asyncio.gather(
+            self._make_rpc_call("get_info"),
+            self._make_rpc_call("hard_fork_info"),
+            self._make_rpc_call("get_connections"),
+            self._make_rpc_call("mining_status"),
+            self._make_rpc_call("get_fee_estimate"),
+        )
+
+        return {
+            "info": info.get("result", {}),
+            "hard_fork": hard_fork.get("result", {}),
+            "connections": connections.get("result", {}),
+            "mining": mining.get("result", {}),
+            "fee": fee.get("result", {})
+        }
+
+    async def get_block_by_height(self, height):
+        """Get block data by height"""
+        if self.cache:
+            cached = self.cache.get_block(height=height)
+            if cached:
+                return cached
+
+        result = await self._make_rpc_call("get_block", {"height": height})
+
+        if "result" in result:
+            block_data = result["result"]
+
+            if "block_header" in block_data and "timestamp" in block_data["block_header"]:
+                block_data["block_header"]["timestamp_formatted"] = self._format_timestamp(
+                    block_data["block_header"]["timestamp"]
+                )
+
+            block_data["height"] = height
+
+            if self.cache:
+                self.cache.put_block(block_data)
+
+            return block_data
+
+        return {"error": "Failed to get block", "details": result}
+
+    async def get_transactions(self, tx_hashes, decode_as_json=True):
+        """Get transaction data by hash, splitting large requests into concurrent chunks"""
+        cached = self.cache.get_txs(tx_hashes) if self.cache and decode_as_json else {}
+        missing = [tx_hash for tx_hash in tx_hashes if tx_hash not in cached]
+
+        chunks = [missing[i:i + TX_FETCH_CHUNK] for i in range(0, len(missing), TX_FETCH_CHUNK)]
+        decode_locally = decode_as_json and DECODE_TX_BLOBS
+        results = await asyncio.gather(*[
+            self._make_non_json_rpc_call("get_transactions", {
+                "txs_hashes": chunk,
+                "decode_as_json": decode_as_json and not decode_locally,
+                "prune": decode_locally
+            })
+            for chunk in chunks
+        ])
+
+        fetched = {}
+        for result in results:
+            if "txs" not in result:
+                return {"error": "Failed to get transactions", "details": result}
+            for tx in result["txs"]:
+                fetched[tx["tx_hash"]] = tx
+
+        if decode_as_json:
+            undecoded = self._decode_tx_entries(fetched.values())
+            if undecoded:
+                # Layouts the local decoder does not know are left to monerod
+                retry = await self._make_non_json_rpc_call("get_transactions", {"txs_hashes": undecoded, "decode_as_json": True})
+                replacements = {tx["tx_hash"]: tx for tx in retry.get("txs", [])}
+                self._decode_tx_entries(replacements.values())
+                failed = [tx_hash for tx_hash in undecoded if "tx_json" not in replacements.get(tx_hash, {})]
+                if failed:
+                    print(f"Failed to decode transactions {failed}")
+                    return {"error": "Failed to decode transactions", "tx_hashes": failed, "details": retry}
+                fetched.update(replacements)
+
+        if self.cache and decode_as_json:
+            self.cache.put_txs(list(fetched.values()), self.tip_height)
+
+        fetched.update(cached)
+        return {"txs": [fetched[tx_hash] for tx_hash in tx_hashes if tx_hash in fetched], "status": "OK"}
+
+    async def get_transaction(self, tx_hash, decode_as_json=True):
+        """Get single transaction data by hash"""
+        result = await self.get_transactions([tx_hash], decode_as_json)
+
+        if "error" not in result and "txs" in result and len(result["txs"]) > 0:
+            return result["txs"][0]
+
+        return {"error": "Transaction not found", "details": result}
+
+    async def get_block_with_transactions(self, height):
+        """Get block with full transaction details"""
+        block = await self.get_block_by_height(height)
+
+        if "error" in block:
+            return block
+
+        transactions_result = None
+        if block.get("tx_hashes"):
+            transactions_result = await self.get_transactions(block["tx_hashes"])
+
+        return self._attach_block_transactions(block, transactions_result)
+
+    async def visualize_transaction(self, tx_hash, graph_depth=1, include_rings=True, as_graph=False):
+        """Visualize transaction with RPC data (the compact Graph with as_graph)"""
+        try:
+            tx_data = await self.get_transaction(tx_hash)
+            if "error" in tx_data:
+                return {"error": tx_data["error"]}
+
+            # The containing block and the ring member origins are independent lookups
+            block_data, ring_origins = await asyncio.gather(
+                self.get_block_by_height(tx_data["block_height"]) if "block_height" in tx_data else _none(),
+                self.get_ring_member_origins(tx_data.get("tx_json", {})) if include_rings else _none()
+            )
+
+            return self._build_transaction_graph(tx_hash, tx_data, block_data, include_rings, ring_origins, as_graph)
+        except Exception as e:
+            return {"error": str(e)}
+
+    async def get_ring_member_origins(self, tx_json):
+        """Map every ring member, as (amount, global_index), to its origin output (see the sync client)"""
+        origins, missing = self._indexed_origins(self.output_index, self._ring_members(tx_json))
+        batches = [missing[i:i + GET_OUTS_BATCH] for i in range(0, len(missing), GET_OUTS_BATCH)]
+        results = await asyncio.gather(*[
+            self._make_non_json_rpc_call("get_outs", self._get_outs_params(batch)) for batch in batches
+        ])
+        for batch, result in zip(batches, results):
+            origins.update(self._origins_from_outs(batch, result.get("outs", [])))
+        return origins
+
+    async def visualize_block(self, height, as_graph=False):
+        """Visualize block with RPC data (the compact Graph with as_graph)"""
+        try:
+            if isinstance(height, str):
+                if height.isdigit():
+                    height = int(height)
+                else:
+                    return {"error": "Invalid block height format"}
+
+            block_data = await self.get_block_with_transactions(height)
+            if "error" in block_data:
+                return {"error": block_data["error"]}
+
+            return self._build_block_graph(height, block_data, as_graph)
+        except Exception as e:
+            return {"error": str(e)}
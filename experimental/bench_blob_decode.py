@@ -0,0 +1,151 @@
+"""
+Usage:
+    python -m experimental.bench_blob_decode [num_txs] [inputs] [outputs] [ring_size]
+
+Compares the two ways get_transactions results can be turned into tx_json, from
+the reply entry as received: monerod's escaped as_json string parsed a second
+time, or the pruned binary blob (pruned_as_hex) decoded locally with blob_decoder.
+Synthetic CLSAG/Bulletproof+ transactions are encoded here, so no daemon is
+needed; every decoded blob is checked against the transaction it was built from.
+Also reports the bytes each form puts on the wire.
+"""
+
+import json
+import os
+import sys
+import time
+
+from experimental.blob_decoder import parse_transaction, RCT_TYPE_BULLETPROOF_PLUS, TXIN_TO_KEY, TXOUT_TO_TAGGED_KEY
+
+
+def write_varint(value):
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def random_hex(size=32):
+    return os.urandom(size).hex()
+
+
+def make_transaction(inputs, outputs, ring_size):
+    """A random v2 CLSAG/Bulletproof+ transaction as monerod's as_json dict (prunable part included)"""
+    vin = []
+    for _ in range(inputs):
+        offsets = [int.from_bytes(os.urandom(3), "little") for _ in range(ring_size)]
+        vin.append({"key": {"amount": 0, "key_offsets": offsets, "k_image": random_hex()}})
+    vout = [
+        {"amount": 0, "target": {"tagged_key": {"key": random_hex(), "view_tag": random_hex(1)}}}
+        for _ in range(outputs)
+    ]
+    return {
+        "version": 2,
+        "unlock_time": 0,
+        "vin": vin,
+        "vout": vout,
+        "extra": list(os.urandom(44)),
+        "rct_signatures": {
+            "type": RCT_TYPE_BULLETPROOF_PLUS,
+            "txnFee": 30_000_000 + int.from_bytes(os.urandom(2), "little"),
+            "ecdhInfo": [{"amount": random_hex(8)} for _ in range(outputs)],
+            "outPk": [random_hex() for _ in range(outputs)],
+        },
+        # Sized like the real thing: one aggregated BP+ proof, one CLSAG per input
+        "rctsig_prunable": {
+            "nbp": 1,
+            "bpp": [{
+                "A": random_hex(), "A1": random_hex(), "B": random_hex(),
+                "r1": random_hex(), "s1": random_hex(), "d1": random_hex(),
+                "L": [random_hex() for _ in range(7)], "R": [random_hex() for _ in range(7)],
+            }],
+            "CLSAGs": [
+                {"s": [random_hex() for _ in range(ring_size)], "c1": random_hex(), "D": random_hex()}
+                for _ in range(inputs)
+            ],
+            "pseudoOuts": [random_hex() for _ in range(inputs)],
+        },
+    }
+
+
+def encode_pruned(tx):
+    """Serialize the prefix and rct_signatures base, i.e. what pruned_as_hex carries"""
+    out = bytearray()
+    out += write_varint(tx["version"]) + write_varint(tx["unlock_time"])
+    out += write_varint(len(tx["vin"]))
+    for vin in tx["vin"]:
+        key = vin["key"]
+        out.append(TXIN_TO_KEY)
+        out += write_varint(key["amount"]) + write_varint(len(key["key_offsets"]))
+        for offset in key["key_offsets"]:
+            out += write_varint(offset)
+        out += bytes.fromhex(key["k_image"])
+    out += write_varint(len(tx["vout"]))
+    for vout in tx["vout"]:
+        tagged = vout["target"]["tagged_key"]
+        out += write_varint(vout["amount"])
+        out.append(TXOUT_TO_TAGGED_KEY)
+        out += bytes.fromhex(tagged["key"]) + bytes.fromhex(tagged["view_tag"])
+    out += write_varint(len(tx["extra"])) + bytes(tx["extra"])
+
+    rct = tx["rct_signatures"]
+    out.append(rct["type"])
+    out += write_varint(rct["txnFee"])
+    for info in rct["ecdhInfo"]:
+        out += bytes.fromhex(info["amount"])
+    for commitment in rct["outPk"]:
+        out += bytes.fromhex(commitment)
+    return bytes(out)
+
+
+def prunable_size(tx):
+    """Binary size of the prunable section that pruned_as_hex leaves out"""
+    prunable = tx["rctsig_prunable"]
+    proof = 6 * 32 + 2 * (1 + 7 * 32)
+    clsags = sum((len(c["s"]) + 2) * 32 for c in prunable["CLSAGs"])
+    return 1 + proof + clsags + 32 * len(prunable["pseudoOuts"])
+
+
+def bench(label, fn, items):
+    started = time.perf_counter()
+    for item in items:
+        fn(item)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<34} {len(items) / elapsed:>10.0f} tx/s   {elapsed / len(items) * 1e6:>7.1f} µs/tx")
+
+
+def main():
+    num_txs = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    inputs = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    outputs = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    ring_size = int(sys.argv[4]) if len(sys.argv) > 4 else 16
+
+    txs = [make_transaction(inputs, outputs, ring_size) for _ in range(num_txs)]
+    as_json = [json.dumps(tx) for tx in txs]
+    pruned_hex = [encode_pruned(tx).hex() for tx in txs]
+    # One get_transactions reply entry per tx, in each of the two forms
+    json_entries = [json.dumps({"tx_hash": random_hex(), "as_json": s}) for s in as_json]
+    blob_entries = [json.dumps({"tx_hash": random_hex(), "pruned_as_hex": h}) for h in pruned_hex]
+
+    # Round trip: the decoder must reproduce everything but the prunable section
+    for tx, blob in zip(txs, pruned_hex):
+        expected = {k: v for k, v in tx.items() if k != "rctsig_prunable"}
+        if parse_transaction(bytes.fromhex(blob)) != expected:
+            raise SystemExit("[!] Decoded blob does not match the source transaction")
+
+    # as_json travels as an escaped string inside the RPC reply
+    json_wire = sum(len(e) for e in json_entries) / num_txs
+    full_wire = sum(len(e) + 2 * prunable_size(tx) for e, tx in zip(blob_entries, txs)) / num_txs
+    pruned_wire = sum(len(e) for e in blob_entries) / num_txs
+
+    print(f"{num_txs} txs, {inputs} in / {outputs} out, ring size {ring_size}\n")
+    print(f"Bytes on the wire per tx:  as_json {json_wire:.0f}   as_hex {full_wire:.0f}   pruned_as_hex {pruned_wire:.0f}\n")
+    bench("reply + json.loads(as_json)", lambda e: json.loads(json.loads(e)["as_json"]), json_entries)
+    bench("reply + parse_transaction(pruned)",
+          lambda e: parse_transaction(bytes.fromhex(json.loads(e)["pruned_as_hex"])), blob_entries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Usage:
+    python -m experimental.bench_rpc_session [num_requests] [threads]
+
+Compares requests/second of bare requests.post (new TCP connection per call)
+against the pooled keep-alive RpcSession, using a local stub monerod.
+"""
+
+import contextlib
+import io
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from experimental.rpc_session import RpcSession
+from experimental.node_visualization import MoneroNodeVisualization
+
+STUB_BLOCK = {
+    "block_header": {"height": 1, "hash": "00" * 32, "timestamp": 1700000000, "difficulty": 1},
+    "tx_hashes": [],
+    "status": "OK",
+}
+
+
+class StubDaemonHandler(BaseHTTPRequestHandler):
+    """Answers just enough of the monerod RPC surface for benchmarking"""
+    protocol_version = "HTTP/1.1"  # keep-alive, like monerod
+    # Headers and body go out in separate writes; without this, delayed ACKs stall keep-alive
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.path == "/json_rpc":
+            method = body.get("method")
+            if method == "get_info":
+                result = {"height": 2, "status": "OK"}
+            elif method == "get_block":
+                result = STUB_BLOCK
+            else:
+                result = {"status": "OK"}
+            reply = {"jsonrpc": "2.0", "id": body.get("id", "0"), "result": result}
+        else:
+            reply = {"txs": [], "status": "OK"}
+
+        data = json.dumps(reply).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_daemon():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubDaemonHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def run(label, call, num_requests, threads):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda _: call(), range(num_requests)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {num_requests / elapsed:>10.0f} req/s  ({elapsed:.2f}s)")
+    return num_requests / elapsed
+
+
+def main(num_requests=2000, threads=8):
+    server, url = start_stub_daemon()
+    payload = {"jsonrpc": "2.0", "id": "0", "method": "get_block", "params": {"height": 1}}
+    print(f"Stub daemon at {url}, {num_requests} requests, {threads} threads\n")
+
+    before = run("bare requests.post",
+                 lambda: requests.post(url + "/json_rpc", json=payload, timeout=10).json(),
+                 num_requests, threads)
+
+    session = RpcSession(url, pool_size=threads)
+    after = run("RpcSession.post (pooled keep-alive)",
+                lambda: session.post("json_rpc", payload).json(),
+                num_requests, threads)
+
+    # Same comparison through the visualization class, with its per-call logging muted
+    with contextlib.redirect_stdout(io.StringIO()):
+        node = MoneroNodeVisualization(url, session=session)
+        node_rps = run("MoneroNodeVisualization.get_block_by_height",
+                       lambda: node.get_block_by_height(1),
+                       num_requests, threads)
+    print(f"{'MoneroNodeVisualization.get_block_by_height':<40} {node_rps:>10.0f} req/s")
+
+    print(f"\nSpeedup: {after / before:.2f}x")
+    session.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,299 @@
+"""
+Decoder for Monero's binary block and transaction serialization.
+
+Produces the same dict shapes monerod returns in get_block's `json` and
+get_transactions' `as_json`, so decoded blobs can stand in for RPC results.
+"""
+
+TXIN_GEN = 0xff
+TXIN_TO_KEY = 0x02
+TXOUT_TO_KEY = 0x02
+TXOUT_TO_TAGGED_KEY = 0x03
+
+# rct::RCTType
+RCT_TYPE_NULL = 0
+RCT_TYPE_FULL = 1
+RCT_TYPE_SIMPLE = 2
+RCT_TYPE_BULLETPROOF = 3
+RCT_TYPE_BULLETPROOF2 = 4
+RCT_TYPE_CLSAG = 5
+RCT_TYPE_BULLETPROOF_PLUS = 6
+# From Bulletproof2 on, ecdhInfo only carries an 8-byte truncated amount
+COMPACT_ECDH_TYPES = (RCT_TYPE_BULLETPROOF2, RCT_TYPE_CLSAG, RCT_TYPE_BULLETPROOF_PLUS)
+# Types whose pseudo output commitments moved into the prunable section
+PRUNABLE_PSEUDO_OUTS_TYPES = (RCT_TYPE_BULLETPROOF, RCT_TYPE_BULLETPROOF2, RCT_TYPE_CLSAG, RCT_TYPE_BULLETPROOF_PLUS)
+# Borromean range signature: s0[64], s1[64], ee, Ci[64]
+BORROMEAN_RANGE_SIG_SIZE = (64 + 64 + 1 + 64) * 32
+V1_SIGNATURE_SIZE = 64
+
+
+class BlobDecodeError(ValueError):
+    pass
+
+
+def read_varint(buf, pos):
+    """Read a little-endian base-128 varint, returning (value, new_pos)"""
+    try:
+        byte = buf[pos]
+    except IndexError:
+        raise BlobDecodeError("Truncated varint") from None
+    # Most varints (counts, offsets of dense rings, types) fit in one byte
+    if byte < 0x80:
+        return byte, pos + 1
+    value = 0
+    shift = 0
+    while True:
+        try:
+            byte = buf[pos]
+        except IndexError:
+            raise BlobDecodeError("Truncated varint") from None
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+        if shift > 63:
+            raise BlobDecodeError("Varint too long")
+
+
+def read_varints(buf, pos, count):
+    """Read `count` consecutive varints (e.g. ring key offsets) in one loop, returning (values, new_pos)"""
+    values = []
+    append = values.append
+    end = len(buf)
+    for _ in range(count):
+        value = 0
+        shift = 0
+        while True:
+            if pos >= end:
+                raise BlobDecodeError("Truncated varint")
+            byte = buf[pos]
+            pos += 1
+            value |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+            if shift > 63:
+                raise BlobDecodeError("Varint too long")
+        append(value)
+    return values, pos
+
+
+def read_bytes(buf, pos, size):
+    end = pos + size
+    if end > len(buf):
+        raise BlobDecodeError(f"Truncated field: need {size} bytes at {pos}")
+    return buf[pos:end], end
+
+
+def read_hash(buf, pos):
+    """Read a 32-byte hash/key, returning (hex_string, new_pos)"""
+    raw, pos = read_bytes(buf, pos, 32)
+    return raw.hex(), pos
+
+
+def parse_block_header(buf, pos=0):
+    header = {}
+    header["major_version"], pos = read_varint(buf, pos)
+    header["minor_version"], pos = read_varint(buf, pos)
+    header["timestamp"], pos = read_varint(buf, pos)
+    header["prev_id"], pos = read_hash(buf, pos)
+    nonce, pos = read_bytes(buf, pos, 4)
+    header["nonce"] = int.from_bytes(nonce, "little")
+    return header, pos
+
+
+def parse_tx_prefix(buf, pos=0):
+    """Parse a transaction prefix (version, unlock_time, vin, vout, extra)"""
+    tx = {}
+    tx["version"], pos = read_varint(buf, pos)
+    tx["unlock_time"], pos = read_varint(buf, pos)
+
+    vin_count, pos = read_varint(buf, pos)
+    vin = []
+    for _ in range(vin_count):
+        tag = buf[pos]
+        pos += 1
+        if tag == TXIN_GEN:
+            height, pos = read_varint(buf, pos)
+            vin.append({"gen": {"height": height}})
+        elif tag == TXIN_TO_KEY:
+            amount, pos = read_varint(buf, pos)
+            offset_count, pos = read_varint(buf, pos)
+            key_offsets, pos = read_varints(buf, pos, offset_count)
+            k_image, pos = read_hash(buf, pos)
+            vin.append({"key": {"amount": amount, "key_offsets": key_offsets, "k_image": k_image}})
+        else:
+            raise BlobDecodeError(f"Unsupported input type 0x{tag:02x}")
+    tx["vin"] = vin
+
+    vout_count, pos = read_varint(buf, pos)
+    vout = []
+    for _ in range(vout_count):
+        amount, pos = read_varint(buf, pos)
+        tag = buf[pos]
+        pos += 1
+        if tag == TXOUT_TO_KEY:
+            key, pos = read_hash(buf, pos)
+            vout.append({"amount": amount, "target": {"key": key}})
+        elif tag == TXOUT_TO_TAGGED_KEY:
+            key, pos = read_hash(buf, pos)
+            view_tag, pos = read_bytes(buf, pos, 1)
+            vout.append({"amount": amount, "target": {"tagged_key": {"key": key, "view_tag": bytes(view_tag).hex()}}})
+        else:
+            raise BlobDecodeError(f"Unsupported output type 0x{tag:02x}")
+    tx["vout"] = vout
+
+    extra_size, pos = read_varint(buf, pos)
+    extra, pos = read_bytes(buf, pos, extra_size)
+    tx["extra"] = list(extra)
+    return tx, pos
+
+
+def parse_rct_base(buf, pos, num_inputs, num_outputs):
+    """Parse the prunable-free rct_signatures base that follows a v2 prefix
+
+    Returns the dict monerod puts in as_json's rct_signatures. The prunable part
+    (range proofs, ring signatures) is not read.
+    """
+    rct_type = buf[pos]
+    pos += 1
+    rct = {"type": rct_type}
+    if rct_type == RCT_TYPE_NULL:
+        return rct, pos
+    if rct_type > RCT_TYPE_BULLETPROOF_PLUS:
+        raise BlobDecodeError(f"Unsupported RingCT type {rct_type}")
+
+    rct["txnFee"], pos = read_varint(buf, pos)
+    if rct_type == RCT_TYPE_SIMPLE:
+        pseudo_outs = []
+        for _ in range(num_inputs):
+            commitment, pos = read_hash(buf, pos)
+            pseudo_outs.append(commitment)
+        rct["pseudoOuts"] = pseudo_outs
+
+    ecdh_info = []
+    for _ in range(num_outputs):
+        if rct_type in COMPACT_ECDH_TYPES:
+            amount, pos = read_bytes(buf, pos, 8)
+            ecdh_info.append({"amount": bytes(amount).hex()})
+        else:
+            mask, pos = read_hash(buf, pos)
+            amount, pos = read_hash(buf, pos)
+            ecdh_info.append({"mask": mask, "amount": amount})
+    rct["ecdhInfo"] = ecdh_info
+
+    out_pk = []
+    for _ in range(num_outputs):
+        commitment, pos = read_hash(buf, pos)
+        out_pk.append(commitment)
+    rct["outPk"] = out_pk
+    return rct, pos
+
+
+def skip_rct_prunable(buf, pos, rct_type, num_inputs, num_outputs, ring_size):
+    """Return the position just past a RingCT prunable section (range proofs, ring signatures)"""
+    if rct_type == RCT_TYPE_NULL:
+        return pos
+
+    if rct_type == RCT_TYPE_BULLETPROOF_PLUS:
+        num_proofs, pos = read_varint(buf, pos)
+        for _ in range(num_proofs):
+            pos += 6 * 32  # A, A1, B, r1, s1, d1
+            for _ in range(2):  # L, R
+                count, pos = read_varint(buf, pos)
+                pos += count * 32
+    elif rct_type in (RCT_TYPE_BULLETPROOF, RCT_TYPE_BULLETPROOF2, RCT_TYPE_CLSAG):
+        if rct_type == RCT_TYPE_BULLETPROOF:
+            raw, pos = read_bytes(buf, pos, 4)
+            num_proofs = int.from_bytes(raw, "little")
+        else:
+            num_proofs, pos = read_varint(buf, pos)
+        for _ in range(num_proofs):
+            pos += 6 * 32  # A, S, T1, T2, taux, mu
+            for _ in range(2):  # L, R
+                count, pos = read_varint(buf, pos)
+                pos += count * 32
+            pos += 3 * 32  # a, b, t
+    else:
+        pos += num_outputs * BORROMEAN_RANGE_SIG_SIZE
+
+    if rct_type in (RCT_TYPE_CLSAG, RCT_TYPE_BULLETPROOF_PLUS):
+        # s[ring_size], c1, D
+        pos += num_inputs * (ring_size + 2) * 32
+    elif rct_type == RCT_TYPE_FULL:
+        # One MLSAG over every input: ss[ring_size][inputs + 1], cc
+        pos += (ring_size * (num_inputs + 1) + 1) * 32
+    else:
+        # One MLSAG per input: ss[ring_size][2], cc
+        pos += num_inputs * (ring_size * 2 + 1) * 32
+
+    if rct_type in PRUNABLE_PSEUDO_OUTS_TYPES:
+        pos += num_inputs * 32
+    if pos > len(buf):
+        raise BlobDecodeError("Truncated RingCT prunable section")
+    return pos
+
+
+def parse_full_transaction(buf, pos=0):
+    """Parse a complete serialized transaction starting at pos
+
+    Returns (tx, prefix_end, base_end, end): the as_json-style dict plus the absolute
+    offsets needed to hash it (see monero_hash.transaction_hash) or to step to the
+    next one. For v1, base_end is the end of the signatures.
+    """
+    tx, pos = parse_tx_prefix(buf, pos)
+    prefix_end = pos
+    inputs = [vin["key"] for vin in tx["vin"] if "key" in vin]
+    if tx["version"] == 1:
+        # One signature per ring member of every key input
+        pos += sum(len(key["key_offsets"]) for key in inputs) * V1_SIGNATURE_SIZE
+        if pos > len(buf):
+            raise BlobDecodeError("Truncated transaction signatures")
+        return tx, prefix_end, pos, pos
+
+    tx["rct_signatures"], pos = parse_rct_base(buf, pos, len(tx["vin"]), len(tx["vout"]))
+    base_end = pos
+    ring_size = len(inputs[0]["key_offsets"]) if inputs else 0
+    pos = skip_rct_prunable(buf, pos, tx["rct_signatures"]["type"], len(tx["vin"]), len(tx["vout"]), ring_size)
+    return tx, prefix_end, base_end, pos
+
+
+def parse_transaction(blob):
+    """Parse a full or pruned transaction blob into the dict monerod returns as `as_json`
+
+    Covers the prefix and, for v2, the rct_signatures base. v1 ring signatures and
+    the RingCT prunable section are skipped, so pruned_as_hex decodes identically.
+    """
+    buf = memoryview(blob)
+    tx, pos = parse_tx_prefix(buf)
+    if tx["version"] >= 2:
+        tx["rct_signatures"], pos = parse_rct_base(buf, pos, len(tx["vin"]), len(tx["vout"]))
+    return tx
+
+
+def parse_block(blob):
+    """Parse a block blob into the dict monerod returns as get_block's `json`"""
+    return parse_block_at(memoryview(blob))[0]
+
+
+def parse_block_at(buf, pos=0):
+    """Parse a serialized block starting at pos
+
+    Returns (block, header_end, miner_tx_span, end) with absolute offsets;
+    miner_tx_span is the miner tx's (start, prefix_end, base_end, end).
+    """
+    block, pos = parse_block_header(buf, pos)
+    header_end = pos
+
+    miner_tx, prefix_end, base_end, pos = parse_full_transaction(buf, pos)
+    block["miner_tx"] = miner_tx
+    miner_tx_span = (header_end, prefix_end, base_end, pos)
+
+    tx_count, pos = read_varint(buf, pos)
+    tx_hashes = []
+    for _ in range(tx_count):
+        tx_hash, pos = read_hash(buf, pos)
+        tx_hashes.append(tx_hash)
+    block["tx_hashes"] = tx_hashes
+    return block, header_end, miner_tx_span, pos
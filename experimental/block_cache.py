@@ -0,0 +1,137 @@
+import json
+import sqlite3
+import threading
+
+# Blocks with at least this many blocks on top are treated as final.
+# Anything shallower may still be reorged out, so it is never written to the cache.
+REORG_SAFE_DEPTH = 10
+
+
+class BlockCache:
+    """On-disk SQLite cache of confirmed blocks, headers and transactions"""
+
+    def __init__(self, path, reorg_depth=REORG_SAFE_DEPTH):
+        self.path = path
+        self.reorg_depth = reorg_depth
+        self._last_tip = None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS blocks (
+                height INTEGER PRIMARY KEY,
+                hash TEXT UNIQUE NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS headers (
+                height INTEGER PRIMARY KEY,
+                hash TEXT UNIQUE NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS txs (
+                hash TEXT PRIMARY KEY,
+                height INTEGER NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS txs_height ON txs(height);
+        """)
+        self._conn.commit()
+
+    def is_final(self, depth):
+        """True when an entry `depth` blocks below the tip is safe from reorgs"""
+        return depth is not None and depth >= self.reorg_depth
+
+    # Blocks
+
+    def get_block(self, height=None, block_hash=None):
+        if height is not None:
+            row = self._fetchone("SELECT data FROM blocks WHERE height = ?", (height,))
+        else:
+            row = self._fetchone("SELECT data FROM blocks WHERE hash = ?", (block_hash,))
+        return json.loads(row[0]) if row else None
+
+    def put_block(self, block_data):
+        header = block_data.get("block_header", {})
+        if not self.is_final(header.get("depth")) or "height" not in header:
+            return False
+        self._execute(
+            "INSERT OR REPLACE INTO blocks (height, hash, data) VALUES (?, ?, ?)",
+            [(header["height"], header["hash"], json.dumps(block_data))],
+        )
+        return True
+
+    # Headers
+
+    def get_headers(self, start_height, end_height):
+        """Return {height: header} for the cached part of start_height..end_height"""
+        rows = self._fetchall(
+            "SELECT height, data FROM headers WHERE height BETWEEN ? AND ?",
+            (start_height, end_height),
+        )
+        return {height: json.loads(data) for height, data in rows}
+
+    def put_headers(self, headers):
+        rows = [(h["height"], h["hash"], json.dumps(h)) for h in headers if self.is_final(h.get("depth"))]
+        if rows:
+            self._execute("INSERT OR REPLACE INTO headers (height, hash, data) VALUES (?, ?, ?)", rows)
+        return len(rows)
+
+    # Transactions
+
+    def get_txs(self, tx_hashes):
+        """Return {tx_hash: tx} for whichever of tx_hashes are cached"""
+        found = {}
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(tx_hashes), 500):
+            chunk = tx_hashes[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._fetchall(f"SELECT hash, data FROM txs WHERE hash IN ({placeholders})", chunk)
+            found.update((tx_hash, json.loads(data)) for tx_hash, data in rows)
+        return found
+
+    def put_txs(self, txs, tip_height=None):
+        rows = []
+        for tx in txs:
+            if tx.get("in_pool") or "block_height" not in tx:
+                continue
+            depth = tx.get("confirmations")
+            if depth is None and tip_height is not None:
+                depth = tip_height - tx["block_height"]
+            if self.is_final(depth):
+                rows.append((tx["tx_hash"], tx["block_height"], json.dumps(tx)))
+        if rows:
+            self._execute("INSERT OR REPLACE INTO txs (hash, height, data) VALUES (?, ?, ?)", rows)
+        return len(rows)
+
+    # Invalidation
+
+    def note_tip(self, tip_height):
+        """Record the daemon's tip; a tip that moved backwards means a reorg or a different chain"""
+        if self._last_tip is not None and tip_height < self._last_tip:
+            self.evict_above(tip_height - self.reorg_depth)
+        self._last_tip = tip_height
+
+    def evict_above(self, height):
+        """Drop every cached entry above `height`; entries at or below it are kept"""
+        with self._lock:
+            for table in ("blocks", "headers", "txs"):
+                self._conn.execute(f"DELETE FROM {table} WHERE height > ?", (height,))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _fetchone(self, sql, params):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def _fetchall(self, sql, params):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _execute(self, sql, rows):
+        with self._lock:
+            self._conn.executemany(sql, rows)
+            self._conn.commit()
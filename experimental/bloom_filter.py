@@ -0,0 +1,45 @@
+import math
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over 32-byte hex keys (key images, hashes)
+
+    The keys are already uniformly distributed, so the bit positions are taken
+    straight from the key bytes by double hashing; nothing is rehashed. A miss is
+    definite, a hit only means "probably present".
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = max(64, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key):
+        raw = bytes.fromhex(key)
+        h1 = int.from_bytes(raw[:8], "little")
+        h2 = int.from_bytes(raw[8:16], "little") | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def add(self, key):
+        bits = self._bits
+        for pos in self._positions(key):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        bits = self._bits
+        try:
+            positions = self._positions(key)
+        except ValueError:
+            return False
+        for pos in positions:
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def full(self):
+        return self.count >= self.capacity
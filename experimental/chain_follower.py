@@ -0,0 +1,233 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from experimental.node_visualization import BLOCK_FETCH_WORKERS, DECODE_TX_BLOBS
+from experimental.graph_expansion import TX_FETCH_BATCH
+
+# Seconds between tip polls
+FOLLOW_INTERVAL = 10
+# Blocks fetched and written per round trip while catching up
+INGEST_BATCH = 50
+# How far behind the tip an empty store starts
+BACKFILL_BLOCKS = 1000
+# Headers compared per request while searching for a fork point
+FORK_SEARCH_CHUNK = 100
+# Height index chunks synced per round, so its backfill never holds up block ingestion for long
+HEIGHT_INDEX_CHUNKS = 5
+
+
+class ChainFollower:
+    """Background thread that keeps a ChainStore in step with a daemon
+
+    Each round polls the tip and pulls only the blocks above the store's checkpoint
+    (its highest block). Before ingesting, the checkpoint hash is compared with the
+    daemon's block at that height; if they differ the store is rolled back to the
+    last height where both agree and ingestion resumes from there. With a
+    height_index, each round also extends it by up to HEIGHT_INDEX_CHUNKS chunks
+    (see HeightIndex.sync); while it is still behind, the next round starts at once.
+    """
+
+    def __init__(self, node, store, interval=FOLLOW_INTERVAL, batch_size=INGEST_BATCH,
+                 start_height=None, height_index=None):
+        self.node = node
+        self.store = store
+        self.height_index = height_index
+        self.interval = interval
+        self.batch_size = batch_size
+        # Where an empty store begins; defaults to BACKFILL_BLOCKS below the tip
+        self.start_height = start_height
+        self.daemon_height = None
+        self.last_sync = None
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="chain-follower", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+
+    def _run(self):
+        while True:
+            delay = self.interval
+            try:
+                result = self.sync()
+                self.last_error = result.get("error")
+                if result.get("height_index_behind"):
+                    delay = 0
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"❌ Chain follower error: {str(e)}")
+            if self._stop.wait(delay):
+                return
+
+    def status(self):
+        tip = self.store.tip()
+        height = tip[0] if tip else None
+        return {
+            "height": height,
+            "daemon_height": self.daemon_height,
+            "lag": self.daemon_height - height if tip and self.daemon_height is not None else None,
+            "last_sync": self.last_sync,
+            "last_error": self.last_error,
+            "running": self._thread is not None and self._thread.is_alive(),
+        }
+
+    def sync(self):
+        """Catch the store up with the daemon's tip, rolling back past any reorg"""
+        info = self.node._make_rpc_call("get_info")
+        if "result" not in info:
+            return {"error": info.get("error", "Failed to get blockchain info")}
+        daemon_tip = info["result"]["height"] - 1
+        self.daemon_height = daemon_tip
+
+        rolled_back = 0
+        ingested = 0
+        while not self._stop.is_set():
+            reconciled = self._reconcile(daemon_tip)
+            if "error" in reconciled:
+                return reconciled
+            rolled_back += reconciled["rolled_back"]
+
+            tip = self.store.tip()
+            if tip is None:
+                next_height = self.start_height if self.start_height is not None else max(0, daemon_tip - BACKFILL_BLOCKS + 1)
+                prev_hash = None
+            else:
+                next_height, prev_hash = tip[0] + 1, tip[1]
+            if next_height > daemon_tip:
+                break
+
+            end_height = min(daemon_tip, next_height + self.batch_size - 1)
+            result = self._ingest_range(next_height, end_height, prev_hash)
+            if "error" in result:
+                return result
+            ingested += result["ingested"]
+            # A short batch means the chain changed under us; reconcile again
+            if result["ingested"] < end_height - next_height + 1:
+                continue
+            print(f"⛓️ Chain store at height {end_height} ({daemon_tip - end_height} behind)")
+
+        height_index_behind = False
+        if self.height_index is not None and not self._stop.is_set():
+            indexed = self.height_index.sync(self.node, max_chunks=HEIGHT_INDEX_CHUNKS, stop=self._stop)
+            if "error" in indexed:
+                return {"error": f"Height index: {indexed['error']}"}
+            height_index_behind = not indexed["complete"]
+
+        self.last_sync = time.time()
+        tip = self.store.tip()
+        return {"height": tip[0] if tip else None, "ingested": ingested, "rolled_back": rolled_back,
+                "height_index_behind": height_index_behind}
+
+    def _reconcile(self, daemon_tip):
+        """Roll the store back to the highest height whose hash the daemon agrees with"""
+        tip = self.store.tip()
+        if tip is None:
+            return {"rolled_back": 0}
+        height = min(tip[0], daemon_tip)
+        first = self.store.first_height()
+
+        while height >= first:
+            low = max(first, height - FORK_SEARCH_CHUNK + 1)
+            headers = self.node._make_rpc_call("get_block_headers_range", {"start_height": low, "end_height": height})
+            if "result" not in headers:
+                return {"error": headers.get("error", "Failed to get block headers")}
+            daemon_hashes = {hdr["height"]: hdr["hash"] for hdr in headers["result"].get("headers", [])}
+            for h in range(height, low - 1, -1):
+                if daemon_hashes.get(h) == self.store.block_hash(h):
+                    if h < tip[0]:
+                        print(f"🔀 Reorg detected: rolling chain store back from {tip[0]} to {h}")
+                        self.store.rollback_to(h)
+                    return {"rolled_back": tip[0] - h}
+            height = low - 1
+
+        # Nothing in common with the daemon; start over
+        print(f"🔀 Chain store shares no blocks with the daemon, clearing it")
+        self.store.rollback_to(first - 1)
+        return {"rolled_back": tip[0] - first + 1}
+
+    def _ingest_range(self, start_height, end_height, prev_hash):
+        """Fetch and store blocks start..end in order, stopping if the chain does not link up"""
+        heights = list(range(start_height, end_height + 1))
+        with ThreadPoolExecutor(max_workers=min(BLOCK_FETCH_WORKERS, len(heights))) as pool:
+            blocks = list(pool.map(self._fetch_block, heights))
+        for height, block in zip(heights, blocks):
+            if "error" in block:
+                return {"error": f"Failed to get block {height}: {block['error']}"}
+
+        tx_hashes = []
+        for block in blocks:
+            tx_hashes.append(block["miner_tx_hash"])
+            tx_hashes.extend(block.get("tx_hashes", []))
+        txs = self._fetch_transactions(tx_hashes)
+        if "error" in txs:
+            return txs
+
+        ingested = 0
+        for block in blocks:
+            header = block["block_header"]
+            if prev_hash is not None and header.get("prev_hash") != prev_hash:
+                break
+            miner_tx = txs.get(block["miner_tx_hash"]) or self._miner_tx_from_block(block)
+            block_txs = [miner_tx]
+            for tx_hash in block.get("tx_hashes", []):
+                if tx_hash not in txs:
+                    return {"error": f"Transaction {tx_hash} missing from daemon response"}
+                block_txs.append(txs[tx_hash])
+            self.store.ingest_block(header, block_txs)
+            prev_hash = header["hash"]
+            ingested += 1
+        return {"ingested": ingested}
+
+    def _fetch_block(self, height):
+        result = self.node._make_rpc_call("get_block", {"height": height})
+        if "result" not in result:
+            return {"error": result.get("error", "Failed to get block")}
+        return result["result"]
+
+    def _fetch_transactions(self, tx_hashes):
+        """{tx_hash: tx} with tx_json parsed, fetched in TX_FETCH_BATCH chunks
+
+        Like the node clients, pruned blobs are decoded locally unless DECODE_TX_BLOBS
+        is off, in which case monerod's own JSON is requested.
+        """
+        found = {}
+        for i in range(0, len(tx_hashes), TX_FETCH_BATCH):
+            result = self.node._make_non_json_rpc_call("get_transactions", {
+                "txs_hashes": tx_hashes[i:i + TX_FETCH_BATCH],
+                "decode_as_json": not DECODE_TX_BLOBS,
+                "prune": DECODE_TX_BLOBS
+            })
+            if "txs" not in result and "missed_tx" not in result:
+                return {"error": result.get("error", "Failed to get transactions")}
+            txs = result.get("txs", [])
+            undecoded = self.node._decode_tx_entries(txs)
+            if undecoded:
+                # Layouts the local decoder does not know are left to monerod
+                retry = self.node._make_non_json_rpc_call("get_transactions", {"txs_hashes": undecoded, "decode_as_json": True})
+                if "txs" not in retry:
+                    return {"error": retry.get("error", "Failed to get transactions")}
+                self.node._decode_tx_entries(retry["txs"])
+                txs = [tx for tx in txs if tx["tx_hash"] not in undecoded] + retry["txs"]
+            for tx in txs:
+                found[tx["tx_hash"]] = tx
+        return found
+
+    @staticmethod
+    def _miner_tx_from_block(block):
+        """Miner transaction from the block's own JSON, for daemons that don't serve it by hash"""
+        try:
+            miner_tx = json.loads(block.get("json", "{}")).get("miner_tx", {})
+        except json.JSONDecodeError:
+            miner_tx = {}
+        return {"tx_hash": block["miner_tx_hash"], "tx_json": miner_tx, "output_indices": []}
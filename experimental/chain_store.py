@@ -0,0 +1,475 @@
+import sqlite3
+import threading
+from datetime import datetime
+
+from experimental.bloom_filter import BloomFilter
+
+# Rows per IN (...) query; stays under SQLite's bound-parameter limit
+SQL_CHUNK = 500
+# Smallest key image filter; it doubles whenever it fills up
+KEY_IMAGE_FILTER_CAPACITY = 1_000_000
+# Default and largest page of the paginated block and transaction tables
+PAGE_SIZE = 25
+MAX_PAGE_SIZE = 500
+# Sort keys of the paginated tables → index columns. Each ends with the row's unique position, so
+# the order is total and a page can continue from the previous page's last row (keyset pagination)
+BLOCK_SORTS = {
+    "height": ("height",),
+    "timestamp": ("timestamp", "height"),
+    "num_txes": ("num_txes", "height"),
+}
+TX_SORTS = {
+    "height": ("t.height", "t.tx_index"),
+    "fee": ("t.fee", "t.height", "t.tx_index"),
+    "ring_size": ("IFNULL(t.ring_size, 0)", "t.height", "t.tx_index"),
+}
+
+
+class ChainStore:
+    """Local indexed SQLite copy of the chain, filled by ChainFollower
+
+    Every row carries the height of the block it came from, so rolling back to a
+    fork point is one DELETE per table. Ring members are indexed by global output
+    index, which also makes the store a ring reference index for GraphExpander
+    (see spenders_of). Key images are answered through an in-memory Bloom filter
+    in front of their table, so unseen key images never touch the database.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS blocks (
+                height INTEGER PRIMARY KEY,
+                hash TEXT UNIQUE NOT NULL,
+                prev_hash TEXT NOT NULL,
+                timestamp INTEGER NOT NULL,
+                difficulty INTEGER,
+                size INTEGER,
+                reward INTEGER,
+                num_txes INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS txs (
+                hash TEXT PRIMARY KEY,
+                height INTEGER NOT NULL,
+                tx_index INTEGER NOT NULL,
+                coinbase INTEGER NOT NULL,
+                version INTEGER,
+                fee INTEGER,
+                num_inputs INTEGER NOT NULL,
+                num_outputs INTEGER NOT NULL,
+                ring_size INTEGER
+            );
+            DROP INDEX IF EXISTS txs_height;
+            CREATE INDEX IF NOT EXISTS txs_position ON txs(height, tx_index);
+            -- Keyset indexes of the paginated tables; the transaction table leaves out miner txs
+            CREATE INDEX IF NOT EXISTS blocks_timestamp ON blocks(timestamp, height);
+            CREATE INDEX IF NOT EXISTS blocks_num_txes ON blocks(num_txes, height);
+            CREATE INDEX IF NOT EXISTS txs_fee ON txs(fee, height, tx_index) WHERE coinbase = 0;
+            CREATE INDEX IF NOT EXISTS txs_ring_size ON txs(IFNULL(ring_size, 0), height, tx_index) WHERE coinbase = 0;
+            CREATE TABLE IF NOT EXISTS inputs (
+                tx_hash TEXT NOT NULL,
+                input_index INTEGER NOT NULL,
+                height INTEGER NOT NULL,
+                amount INTEGER NOT NULL,
+                key_image TEXT NOT NULL,
+                ring_size INTEGER NOT NULL,
+                PRIMARY KEY (tx_hash, input_index)
+            );
+            CREATE INDEX IF NOT EXISTS inputs_height ON inputs(height);
+            CREATE TABLE IF NOT EXISTS ring_members (
+                tx_hash TEXT NOT NULL,
+                input_index INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                height INTEGER NOT NULL,
+                amount INTEGER NOT NULL,
+                global_index INTEGER NOT NULL,
+                PRIMARY KEY (tx_hash, input_index, position)
+            );
+            CREATE INDEX IF NOT EXISTS ring_members_output ON ring_members(amount, global_index);
+            CREATE INDEX IF NOT EXISTS ring_members_height ON ring_members(height);
+            CREATE TABLE IF NOT EXISTS outputs (
+                tx_hash TEXT NOT NULL,
+                vout INTEGER NOT NULL,
+                height INTEGER NOT NULL,
+                amount INTEGER NOT NULL,
+                global_index INTEGER,
+                key TEXT NOT NULL,
+                PRIMARY KEY (tx_hash, vout)
+            );
+            CREATE INDEX IF NOT EXISTS outputs_global ON outputs(amount, global_index);
+            CREATE INDEX IF NOT EXISTS outputs_height ON outputs(height);
+            CREATE TABLE IF NOT EXISTS key_images (
+                key_image TEXT PRIMARY KEY,
+                tx_hash TEXT NOT NULL,
+                height INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS key_images_height ON key_images(height);
+        """)
+        self._conn.commit()
+        self._key_image_filter = None
+        # (height, hash) of the tip whose key images are all in the filter, None for an empty store
+        self._filtered_tip = None
+        self._filter_lock = threading.Lock()
+        self._rebuild_key_image_filter()
+        # (query, params) → (tip, row count) of the paginated tables; recounted when the tip moves
+        self._counts = {}
+
+    # Checkpoint
+
+    def tip(self):
+        """(height, hash) of the highest stored block, or None for an empty store"""
+        return self._fetchone("SELECT height, hash FROM blocks ORDER BY height DESC LIMIT 1", ())
+
+    def block_hash(self, height):
+        row = self._fetchone("SELECT hash FROM blocks WHERE height = ?", (height,))
+        return row[0] if row else None
+
+    def first_height(self):
+        row = self._fetchone("SELECT MIN(height) FROM blocks", ())
+        return row[0] if row else None
+
+    # Writes
+
+    def ingest_block(self, header, txs):
+        """Store one block and its decoded transactions, miner tx first, atomically
+
+        `header` is a get_block block_header; each tx is a get_transactions entry with
+        a parsed tx_json and output_indices.
+        """
+        self.ingest_blocks([(header, txs)])
+
+    def ingest_blocks(self, blocks):
+        """Store many (header, txs) pairs in one transaction; used for bulk loads"""
+        rows = [self._block_rows(header, txs) for header, txs in blocks]
+        with self._lock:
+            with self._conn:
+                for block_row, tx_rows, input_rows, member_rows, output_rows, key_image_rows in rows:
+                    self._conn.execute("INSERT OR REPLACE INTO blocks VALUES (?, ?, ?, ?, ?, ?, ?, ?)", block_row)
+                    self._conn.executemany("INSERT OR REPLACE INTO txs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", tx_rows)
+                    self._conn.executemany("INSERT OR REPLACE INTO inputs VALUES (?, ?, ?, ?, ?, ?)", input_rows)
+                    self._conn.executemany("INSERT OR REPLACE INTO ring_members VALUES (?, ?, ?, ?, ?, ?)", member_rows)
+                    self._conn.executemany("INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?, ?, ?)", output_rows)
+                    self._conn.executemany("INSERT OR REPLACE INTO key_images VALUES (?, ?, ?)", key_image_rows)
+
+    def _block_rows(self, header, txs):
+        height = header["height"]
+        tx_rows, input_rows, member_rows, output_rows, key_image_rows = [], [], [], [], []
+
+        for tx_index, tx in enumerate(txs):
+            tx_hash = tx["tx_hash"]
+            tx_json = tx.get("tx_json", {})
+            vin = tx_json.get("vin", [])
+            vout = tx_json.get("vout", [])
+            # The miner transaction always comes first
+            coinbase = tx_index == 0
+
+            ring_sizes = set()
+            for input_index, entry in enumerate(vin):
+                key = entry.get("key")
+                if not key:
+                    continue
+                offsets = key.get("key_offsets", [])
+                ring_sizes.add(len(offsets))
+                input_rows.append((tx_hash, input_index, height, key.get("amount", 0), key["k_image"], len(offsets)))
+                key_image_rows.append((key["k_image"], tx_hash, height))
+                global_index = 0
+                # key_offsets are relative; each one is added to the previous index
+                for position, offset in enumerate(offsets):
+                    global_index += offset
+                    member_rows.append((tx_hash, input_index, position, height, key.get("amount", 0), global_index))
+
+            output_indices = tx.get("output_indices", [])
+            for vout_index, out in enumerate(vout):
+                target = out.get("target", {})
+                key = target.get("key") or target.get("tagged_key", {}).get("key", "")
+                global_index = output_indices[vout_index] if vout_index < len(output_indices) else None
+                output_rows.append((tx_hash, vout_index, height, out.get("amount", 0), global_index, key))
+
+            tx_rows.append((
+                tx_hash, height, tx_index, int(coinbase), tx_json.get("version"),
+                0 if coinbase else self._fee(tx_json), len(vin), len(vout),
+                ring_sizes.pop() if len(ring_sizes) == 1 else None,
+            ))
+
+        block_row = (height, header["hash"], header.get("prev_hash", ""), header.get("timestamp", 0),
+                     header.get("difficulty"), header.get("block_size"), header.get("reward"), len(txs))
+        return block_row, tx_rows, input_rows, member_rows, output_rows, key_image_rows
+
+    @staticmethod
+    def _fee(tx_json):
+        rct = tx_json.get("rct_signatures") or {}
+        if "txnFee" in rct:
+            return rct["txnFee"]
+        # Pre-RingCT: inputs minus outputs
+        spent = sum(v["key"].get("amount", 0) for v in tx_json.get("vin", []) if "key" in v)
+        return max(0, spent - sum(o.get("amount", 0) for o in tx_json.get("vout", [])))
+
+    def rollback_to(self, height):
+        """Drop every block above `height` and everything that came from it
+
+        Rolled-back key images stay set in the Bloom filter; they only cost a table
+        lookup that comes back empty.
+        """
+        with self._lock:
+            with self._conn:
+                for table in ("blocks", "txs", "inputs", "ring_members", "outputs", "key_images"):
+                    self._conn.execute(f"DELETE FROM {table} WHERE height > ?", (height,))
+
+    # Queries
+
+    def spenders_of(self, global_indices):
+        """{global_index: [tx_hash, ...]} of transactions whose rings reference RingCT outputs"""
+        found = {}
+        global_indices = list(global_indices)
+        for i in range(0, len(global_indices), SQL_CHUNK):
+            chunk = global_indices[i:i + SQL_CHUNK]
+            rows = self._fetchall(
+                f"SELECT DISTINCT global_index, tx_hash FROM ring_members "
+                f"WHERE amount = 0 AND global_index IN ({','.join('?' * len(chunk))})", chunk
+            )
+            for global_index, tx_hash in rows:
+                found.setdefault(global_index, []).append(tx_hash)
+        return found
+
+    def lookup_key_images(self, key_images):
+        """{key_image: {"tx_hash", "height"} or None} for the transaction that spent each key image"""
+        key_images = [ki.lower() for ki in key_images]
+        found = dict.fromkeys(key_images)
+        self._sync_key_image_filter()
+        candidates = [ki for ki in found if ki in self._key_image_filter]
+        for i in range(0, len(candidates), SQL_CHUNK):
+            chunk = candidates[i:i + SQL_CHUNK]
+            rows = self._fetchall(
+                f"SELECT key_image, tx_hash, height FROM key_images "
+                f"WHERE key_image IN ({','.join('?' * len(chunk))})", chunk
+            )
+            for key_image, tx_hash, height in rows:
+                found[key_image] = {"tx_hash": tx_hash, "height": height}
+        return found
+
+    def _sync_key_image_filter(self):
+        """Add the key images of blocks stored since the filter was last brought up to date
+
+        The store has other writers (raw_export --load, a second process on the same
+        file), so the filter follows the table rather than this process's ingests: a
+        key image missing from it would be answered as unspent. When the block the
+        filter was synced at is gone or replaced, a reorg happened and it is rebuilt.
+        """
+        with self._filter_lock:
+            tip = self.tip()
+            if tip == self._filtered_tip:
+                return
+            if tip is None or self._filtered_tip is None:
+                self._rebuild_key_image_filter()
+                return
+            filtered_height, filtered_hash = self._filtered_tip
+            if self.block_hash(filtered_height) != filtered_hash:
+                self._rebuild_key_image_filter()
+                return
+            with self._lock:
+                # The tip is read first: rows another writer adds meanwhile are only filtered early
+                tip = self._conn.execute("SELECT height, hash FROM blocks ORDER BY height DESC LIMIT 1").fetchone()
+                for (key_image,) in self._conn.execute(
+                    "SELECT key_image FROM key_images WHERE height > ?", (filtered_height,)
+                ):
+                    self._key_image_filter.add(key_image)
+            self._filtered_tip = tuple(tip)
+            if self._key_image_filter.full():
+                self._rebuild_key_image_filter()
+
+    def _rebuild_key_image_filter(self):
+        """Size the filter for twice the stored key images and reload it from the table"""
+        with self._lock:
+            tip = self._conn.execute("SELECT height, hash FROM blocks ORDER BY height DESC LIMIT 1").fetchone()
+            stored = self._conn.execute("SELECT COUNT(*) FROM key_images").fetchone()[0]
+            key_image_filter = BloomFilter(max(KEY_IMAGE_FILTER_CAPACITY, 2 * stored))
+            for (key_image,) in self._conn.execute("SELECT key_image FROM key_images"):
+                key_image_filter.add(key_image)
+            self._key_image_filter = key_image_filter
+            self._filtered_tip = tuple(tip) if tip else None
+
+    def blockchain_summary(self, max_blocks=100):
+        """Same shape as MoneroNodeVisualization.get_blockchain_summary, read locally"""
+        blocks = self._fetchall(
+            "SELECT height, hash, timestamp, difficulty FROM blocks ORDER BY height DESC LIMIT ?", (max_blocks,)
+        )
+        if not blocks:
+            return {"blocks": [], "transactions": []}
+        blocks.reverse()
+        txs = self._fetchall(
+            "SELECT hash, height FROM txs WHERE height >= ? AND coinbase = 0 ORDER BY height, tx_index",
+            (blocks[0][0],),
+        )
+        return {
+            "blocks": [
+                {
+                    "height": height,
+                    "hash": block_hash,
+                    "timestamp": datetime.utcfromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S UTC'),
+                    "difficulty": difficulty,
+                }
+                for height, block_hash, timestamp, difficulty in blocks
+            ],
+            "transactions": [{"hash": tx_hash, "block_height": height} for tx_hash, height in txs],
+        }
+
+    def block_stats(self, max_blocks=100):
+        """Per-block rows for analyze_block_data: height, timestamp, size, difficulty, tx count and fees"""
+        return self._fetchall(
+            "SELECT b.height, b.timestamp, b.size, b.difficulty, b.num_txes - 1, "
+            "COALESCE((SELECT SUM(fee) FROM txs WHERE txs.height = b.height), 0) "
+            "FROM blocks b ORDER BY b.height DESC LIMIT ?", (max_blocks,)
+        )[::-1]
+
+    # Paginated tables
+
+    def page_blocks(self, sort="height", descending=True, limit=PAGE_SIZE, after=None, offset=0,
+                    search=None, min_height=None, max_height=None):
+        """One page of blocks, keyset-paginated: pass the previous page's "next" as `after`
+
+        Returns {"rows", "total", "filtered", "next"}; "next" is None on the last page.
+        `offset` is only for jumping to an arbitrary page and walks the index up to it.
+        search is a height or a hash prefix.
+        """
+        where, params = ["1"], []
+        if not self._add_search(where, params, search, "height", "hash"):
+            return {"rows": [], "total": self._count("blocks", ["1"], []), "filtered": 0, "next": None}
+        self._add_range(where, params, "height", min_height, max_height)
+        rows, next_cursor = self._page(
+            "height, hash, timestamp, num_txes, size, difficulty, reward", "blocks",
+            BLOCK_SORTS, sort, descending, limit, after, offset, where, params,
+        )
+        return {
+            "rows": [
+                {"height": height, "hash": block_hash, "timestamp": timestamp, "num_txes": num_txes,
+                 "size": size, "difficulty": difficulty, "reward": reward}
+                for height, block_hash, timestamp, num_txes, size, difficulty, reward in rows
+            ],
+            "total": self._count("blocks", ["1"], []),
+            "filtered": self._count("blocks", where, params),
+            "next": next_cursor,
+        }
+
+    def page_transactions(self, sort="height", descending=True, limit=PAGE_SIZE, after=None, offset=0,
+                          search=None, min_height=None, max_height=None, ring_size=None, min_fee=None,
+                          max_fee=None):
+        """One page of non-miner transactions; same paging as page_blocks
+
+        search is a block height or a transaction hash prefix.
+        """
+        where, params = ["t.coinbase = 0"], []
+        if not self._add_search(where, params, search, "t.height", "t.hash"):
+            return {"rows": [], "total": self._count("txs t", ["t.coinbase = 0"], []), "filtered": 0, "next": None}
+        self._add_range(where, params, "t.height", min_height, max_height)
+        self._add_range(where, params, "t.fee", min_fee, max_fee)
+        if ring_size is not None:
+            where.append("IFNULL(t.ring_size, 0) = ?")
+            params.append(ring_size)
+        rows, next_cursor = self._page(
+            "t.hash, t.height, b.timestamp, t.fee, t.ring_size, t.num_inputs, t.num_outputs, t.version",
+            "txs t JOIN blocks b ON b.height = t.height",
+            TX_SORTS, sort, descending, limit, after, offset, where, params,
+        )
+        return {
+            "rows": [
+                {"hash": tx_hash, "height": height, "timestamp": timestamp, "fee": fee, "ring_size": ring,
+                 "num_inputs": num_inputs, "num_outputs": num_outputs, "version": version}
+                for tx_hash, height, timestamp, fee, ring, num_inputs, num_outputs, version in rows
+            ],
+            "total": self._count("txs t", ["t.coinbase = 0"], []),
+            "filtered": self._count("txs t", where, params),
+            "next": next_cursor,
+        }
+
+    @staticmethod
+    def _add_search(where, params, search, height_column, hash_column):
+        """Filter on a height or hash prefix; False when the search can match nothing"""
+        search = (search or "").strip().lower()
+        if not search:
+            return True
+        if search.isdigit():
+            where.append(f"{height_column} = ?")
+            params.append(int(search))
+            return True
+        if len(search) <= 64 and all(c in "0123456789abcdef" for c in search):
+            # A range on the hash index; every hex digit sorts below "g"
+            where.append(f"{hash_column} >= ? AND {hash_column} < ?")
+            params.extend([search, search + "g"])
+            return True
+        return False
+
+    @staticmethod
+    def _add_range(where, params, column, low, high):
+        if low is not None:
+            where.append(f"{column} >= ?")
+            params.append(low)
+        if high is not None:
+            where.append(f"{column} <= ?")
+            params.append(high)
+
+    def _page(self, columns, tables, sorts, sort, descending, limit, after, offset, where, params):
+        """(rows, next cursor) for one page; the sort key is selected ahead of `columns` and stripped again"""
+        keys = sorts.get(sort)
+        if keys is None:
+            raise ValueError(f"Cannot sort by {sort}; expected one of {', '.join(sorts)}")
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        direction = "DESC" if descending else "ASC"
+        op = "<" if descending else ">"
+
+        def select(conditions, condition_params, order_keys, count, skip=0):
+            sql = (f"SELECT {', '.join(keys)}, {columns} FROM {tables} "
+                   f"WHERE {' AND '.join(where + conditions)} "
+                   f"ORDER BY {', '.join(f'{key} {direction}' for key in order_keys)} LIMIT ? OFFSET ?")
+            return self._fetchall(sql, params + condition_params + [count, skip])
+
+        if not after:
+            rows = select([], [], keys, limit + 1, max(0, int(offset)))
+        else:
+            values = after.split(":")
+            if len(values) != len(keys) or not all(v.lstrip("-").isdigit() for v in values):
+                raise ValueError("Invalid page cursor")
+            values = [int(v) for v in values]
+            rows = []
+            if len(keys) > 1:
+                # Rest of the cursor's leading-key group first: an equality plus a range seeks
+                # every index, where one row-value comparison cannot seek an expression index
+                rest = keys[1:]
+                rows = select([f"{keys[0]} = ?", f"({', '.join(rest)}) {op} ({', '.join('?' * len(rest))})"],
+                              values, rest, limit + 1)
+            if len(rows) <= limit:
+                rows += select([f"{keys[0]} {op} ?"], values[:1], keys, limit + 1 - len(rows))
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = ":".join(str(value) for value in rows[-1][:len(keys)])
+        return [row[len(keys):] for row in rows], next_cursor
+
+    def _count(self, table, where, params):
+        """COUNT(*) of a filtered table, cached until the tip changes"""
+        key = (table, tuple(where), tuple(params))
+        tip = self.tip()
+        cached = self._counts.get(key)
+        if cached is not None and cached[0] == tip:
+            return cached[1]
+        count = self._fetchone(f"SELECT COUNT(*) FROM {table} WHERE {' AND '.join(where)}", params)[0]
+        if len(self._counts) > 256:
+            self._counts.clear()
+        self._counts[key] = (tip, count)
+        return count
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _fetchone(self, sql, params):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def _fetchall(self, sql, params):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
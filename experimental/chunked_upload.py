@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import threading
+import uuid
+
+# Bytes read from the request stream per write; bounds memory per upload
+STREAM_READ_SIZE = 1024 * 1024
+# Size the browser is asked to slice the file into
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+PART_NAME = "data.mdb.part"
+FINAL_NAME = "data.mdb"
+STATE_NAME = "upload.json"
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400, **details):
+        super().__init__(message)
+        self.status = status
+        self.details = details
+
+
+class ChunkedUploadManager:
+    """Resumable uploads written straight into their dataset directory
+
+    Each upload lives in <upload_root>/<upload_id>/. Chunks are appended to
+    data.mdb.part as they stream in, a SHA-256 is updated incrementally, and
+    completing the upload renames the part file to data.mdb in place. The bytes
+    already on disk are the resume point, so a dropped connection only costs
+    the chunk that was in flight.
+    """
+
+    def __init__(self, upload_root, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.upload_root = upload_root
+        self.chunk_size = chunk_size
+        self._hashers = {}
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def create(self, filename, total_size):
+        if not filename or filename.split(".")[-1].lower() != "mdb":
+            raise UploadError("Invalid file type. Only .mdb files are allowed.")
+        if not isinstance(total_size, int) or total_size <= 0:
+            raise UploadError("File size must be a positive integer")
+
+        upload_id = uuid.uuid4().hex
+        upload_dir = self._upload_dir(upload_id)
+        os.makedirs(upload_dir)
+        open(os.path.join(upload_dir, PART_NAME), "wb").close()
+        state = {
+            "upload_id": upload_id,
+            "filename": filename,
+            "total_size": total_size,
+            "complete": False,
+            "sha256": None,
+        }
+        self._save_state(upload_id, state)
+        self._hashers[upload_id] = hashlib.sha256()
+        return self.status(upload_id)
+
+    def status(self, upload_id):
+        state = self._load_state(upload_id)
+        if state["complete"]:
+            received = state["total_size"]
+        else:
+            received = os.path.getsize(self._part_path(upload_id))
+        return {
+            **state,
+            "received": received,
+            "progress": round(100.0 * received / state["total_size"], 2),
+            "chunk_size": self.chunk_size,
+            "path": os.path.join(self._upload_dir(upload_id), FINAL_NAME if state["complete"] else PART_NAME),
+        }
+
+    def write_chunk(self, upload_id, offset, stream):
+        """Append the request body at `offset`, which must be the current resume point"""
+        with self._lock_for(upload_id):
+            state = self._load_state(upload_id)
+            if state["complete"]:
+                raise UploadError("Upload already completed", status=409)
+
+            part_path = self._part_path(upload_id)
+            received = os.path.getsize(part_path)
+            if offset != received:
+                raise UploadError("Chunk offset does not match bytes received", status=409, received=received)
+
+            hasher = self._hasher(upload_id, part_path, received)
+            with open(part_path, "ab") as f:
+                while True:
+                    data = stream.read(STREAM_READ_SIZE)
+                    if not data:
+                        break
+                    if received + len(data) > state["total_size"]:
+                        raise UploadError("Chunk runs past the declared file size", status=413, received=received)
+                    f.write(data)
+                    hasher.update(data)
+                    received += len(data)
+
+        return self.status(upload_id)
+
+    def complete(self, upload_id, expected_sha256=None):
+        """Verify size and checksum, then move the part file to its final name"""
+        with self._lock_for(upload_id):
+            state = self._load_state(upload_id)
+            if state["complete"]:
+                return self.status(upload_id)
+
+            part_path = self._part_path(upload_id)
+            received = os.path.getsize(part_path)
+            if received != state["total_size"]:
+                raise UploadError("Upload is incomplete", status=409, received=received)
+
+            digest = self._hasher(upload_id, part_path, received).hexdigest()
+            if expected_sha256 and expected_sha256.lower() != digest:
+                raise UploadError("Checksum mismatch", status=422, sha256=digest)
+
+            os.replace(part_path, os.path.join(self._upload_dir(upload_id), FINAL_NAME))
+            state["complete"] = True
+            state["sha256"] = digest
+            self._save_state(upload_id, state)
+            self._hashers.pop(upload_id, None)
+
+        return self.status(upload_id)
+
+    def _hasher(self, upload_id, part_path, received):
+        """The running SHA-256; rebuilt from disk when the server restarted mid-upload"""
+        hasher = self._hashers.get(upload_id)
+        if hasher is None:
+            hasher = hashlib.sha256()
+            with open(part_path, "rb") as f:
+                remaining = received
+                while remaining:
+                    data = f.read(min(STREAM_READ_SIZE, remaining))
+                    if not data:
+                        break
+                    hasher.update(data)
+                    remaining -= len(data)
+            self._hashers[upload_id] = hasher
+        return hasher
+
+    def _lock_for(self, upload_id):
+        with self._locks_lock:
+            return self._locks.setdefault(upload_id, threading.Lock())
+
+    def _upload_dir(self, upload_id):
+        # Upload ids come from URLs, so only accept what create() generates
+        if len(upload_id) != 32 or any(c not in "0123456789abcdef" for c in upload_id):
+            raise UploadError("Unknown upload", status=404)
+        return os.path.join(self.upload_root, upload_id)
+
+    def _part_path(self, upload_id):
+        return os.path.join(self._upload_dir(upload_id), PART_NAME)
+
+    def _load_state(self, upload_id):
+        try:
+            with open(os.path.join(self._upload_dir(upload_id), STATE_NAME)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise UploadError("Unknown upload", status=404) from None
+
+    def _save_state(self, upload_id, state):
+        path = os.path.join(self._upload_dir(upload_id), STATE_NAME)
+        with open(path + ".tmp", "w") as f:
+            json.dump(state, f)
+        os.replace(path + ".tmp", path)
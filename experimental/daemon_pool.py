@@ -0,0 +1,335 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+
+from experimental.health_monitor import percentile
+from experimental.rpc_session import RpcSession, DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT, RETRY_STATUS_CODES
+
+# Blocks a daemon may trail the highest one in the pool before reads stop going to it
+MAX_HEIGHT_LAG = 2
+# Seconds between get_info height checks of every daemon in the pool
+HEIGHT_CHECK_INTERVAL = 10
+# (connect, read) timeout of a height check
+HEIGHT_CHECK_TIMEOUT = (1, 3)
+# Latency samples kept per RPC method (and per daemon, for status)
+LATENCY_WINDOW = 200
+# Samples a method needs before its slow requests are hedged
+HEDGE_MIN_SAMPLES = 20
+# A request still running after this percentile of its method's latency gets a duplicate on another daemon
+HEDGE_PERCENTILE = 95
+# Seconds; keeps calls that are always fast from being duplicated on jitter
+HEDGE_MIN_DELAY = 0.05
+# Seconds a daemon is skipped after a failed request, doubled per consecutive failure up to the max
+FAILURE_COOLDOWN = 2
+MAX_FAILURE_COOLDOWN = 60
+# RPCs with side effects: sent to exactly one daemon, never hedged or failed over
+WRITE_METHODS = frozenset([
+    "send_raw_transaction", "sendrawtransaction", "relay_tx", "submit_block", "submitblock",
+    "generateblocks", "start_mining", "stop_mining", "stop_daemon", "save_bc", "pop_blocks",
+    "flush_txpool", "set_bans", "set_limit", "out_peers", "in_peers", "set_log_level",
+    "set_log_categories", "set_bootstrap_daemon", "update",
+])
+
+
+class PooledDaemon:
+    """One monerod in a DaemonPool and the bookkeeping used to route to it"""
+
+    def __init__(self, url, session):
+        self.url = url
+        self.session = session
+        self.outstanding = 0
+        self.height = None
+        self.failures = 0
+        # time.monotonic() until which the daemon only gets requests when nothing else is left
+        self.cooldown_until = 0
+        self.last_error = None
+        self.last_pick = 0
+        self.requests = 0
+        self.errors = 0
+        self.hedges = 0
+        self.hedges_won = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+
+class DaemonPool:
+    """Drop-in RpcSession that spreads read-only RPCs over several daemons
+
+    Each request goes to the daemon with the fewest requests in flight. Daemons
+    more than max_height_lag blocks behind the highest one, and daemons cooling
+    down after a failed request, are only used once no other daemon is left. A
+    connection error, timeout or 5xx moves the request on to the next daemon, so
+    a node restart is invisible to callers. A read still running after the
+    method's p95 latency gets a duplicate on a second daemon and the first good
+    answer wins. Writes (WRITE_METHODS) go to one daemon only.
+    """
+
+    def __init__(self, urls, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT,
+                 max_height_lag=MAX_HEIGHT_LAG, height_check_interval=HEIGHT_CHECK_INTERVAL, hedge=True):
+        urls = [url.rstrip("/") for url in urls]
+        if not urls:
+            raise ValueError("DaemonPool needs at least one daemon URL")
+        self.base_url = ",".join(urls)
+        self.timeout = timeout
+        self.max_height_lag = max_height_lag
+        self.height_check_interval = height_check_interval
+        self.hedge = hedge
+        # Failing over to another daemon replaces the single-daemon session's own retries
+        self.daemons = [PooledDaemon(url, RpcSession(url, pool_size=pool_size, timeout=timeout, retries=0))
+                        for url in urls]
+        self._method_latencies = {}
+        self._picks = 0
+        self._heights_checked = 0
+        self._checking_heights = False
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=pool_size * len(urls), thread_name_prefix="daemon-pool")
+
+    def post(self, endpoint, payload=None, timeout=None):
+        """POST to the best daemon, failing over and hedging as described above"""
+        return self._request(endpoint, payload, timeout)
+
+    def sticky(self):
+        """A session view that keeps using one daemon while it stays healthy"""
+        return StickyDaemonSession(self)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        for daemon in self.daemons:
+            daemon.session.close()
+
+    # Routing
+
+    def _request(self, endpoint, payload, timeout, sticky=None):
+        method = payload.get("method") if endpoint == "json_rpc" and payload else endpoint.strip("/")
+        self._maybe_check_heights()
+
+        if method in WRITE_METHODS:
+            return self._send(self._acquire(), endpoint, payload, timeout, method)
+
+        tried = set()
+        error = None
+        response = None
+        while True:
+            daemon = self._acquire(tried, sticky)
+            if daemon is None:
+                break
+            tried.add(daemon)
+            try:
+                if sticky is not None or not self.hedge:
+                    response = self._send(daemon, endpoint, payload, timeout, method)
+                else:
+                    response = self._send_hedged(daemon, tried, endpoint, payload, timeout, method)
+            except requests.exceptions.RequestException as e:
+                error = e
+                continue
+            if response.status_code not in RETRY_STATUS_CODES:
+                if sticky is not None:
+                    sticky.daemon = daemon
+                return response
+        if response is not None:
+            return response
+        raise error
+
+    def _rank(self, daemon, now, top):
+        lagging = top is not None and daemon.height is not None and daemon.height < top - self.max_height_lag
+        return (daemon.cooldown_until > now, lagging, daemon.outstanding, daemon.last_pick)
+
+    def _acquire(self, exclude=(), sticky=None, healthy_only=False):
+        """Pick a daemon and count the request against it; None when every daemon was tried"""
+        with self._lock:
+            now = time.monotonic()
+            top = max((d.height for d in self.daemons if d.height is not None), default=None)
+            preferred = sticky.daemon if sticky is not None else None
+            if preferred is not None and preferred not in exclude and self._rank(preferred, now, top)[:2] == (False, False):
+                daemon = preferred
+            else:
+                candidates = [d for d in self.daemons if d not in exclude]
+                if not candidates:
+                    return None
+                daemon = min(candidates, key=lambda d: self._rank(d, now, top))
+                if healthy_only and self._rank(daemon, now, top)[:2] != (False, False):
+                    return None
+            self._picks += 1
+            daemon.last_pick = self._picks
+            daemon.outstanding += 1
+            daemon.requests += 1
+            return daemon
+
+    def _send(self, daemon, endpoint, payload, timeout, method):
+        """One request to an acquired daemon; releases it and records the outcome"""
+        started = time.monotonic()
+        try:
+            response = daemon.session.post(endpoint, payload, timeout=timeout)
+        except requests.exceptions.RequestException as e:
+            self._release(daemon, error=str(e))
+            raise
+        except BaseException:
+            self._release(daemon)
+            raise
+        if response.status_code in RETRY_STATUS_CODES:
+            self._release(daemon, error=f"HTTP Error: {response.status_code}")
+        else:
+            self._release(daemon, method=method, elapsed=time.monotonic() - started)
+        return response
+
+    def _release(self, daemon, error=None, method=None, elapsed=None):
+        with self._lock:
+            daemon.outstanding -= 1
+            if error is not None:
+                self._fail_locked(daemon, error)
+            elif elapsed is not None:
+                daemon.failures = 0
+                daemon.cooldown_until = 0
+                daemon.latencies.append(elapsed)
+                latencies = self._method_latencies.get(method)
+                if latencies is None:
+                    latencies = self._method_latencies[method] = deque(maxlen=LATENCY_WINDOW)
+                latencies.append(elapsed)
+        if error is not None:
+            print(f"⚠️ Daemon pool: {daemon.url} failed ({error}), failing over")
+
+    def _fail_locked(self, daemon, error):
+        """Count a failure and start (or lengthen) the daemon's cooldown; call with the lock held"""
+        daemon.errors += 1
+        daemon.failures += 1
+        daemon.last_error = error
+        cooldown = min(FAILURE_COOLDOWN * 2 ** (daemon.failures - 1), MAX_FAILURE_COOLDOWN)
+        daemon.cooldown_until = time.monotonic() + cooldown
+
+    # Hedging
+
+    def _hedge_delay(self, method):
+        """Seconds to wait before duplicating a `method` request, None until enough samples exist"""
+        with self._lock:
+            latencies = list(self._method_latencies.get(method, ()))
+        if len(latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        return max(HEDGE_MIN_DELAY, percentile(latencies, HEDGE_PERCENTILE))
+
+    def _send_hedged(self, daemon, tried, endpoint, payload, timeout, method):
+        delay = self._hedge_delay(method)
+        if delay is None or len(self.daemons) < 2:
+            return self._send(daemon, endpoint, payload, timeout, method)
+
+        first = self._executor.submit(self._send, daemon, endpoint, payload, timeout, method)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+        backup = self._acquire(tried, healthy_only=True)
+        if backup is None:
+            return first.result()
+        tried.add(backup)
+        with self._lock:
+            backup.hedges += 1
+        second = self._executor.submit(self._send, backup, endpoint, payload, timeout, method)
+
+        # The loser keeps running in the executor and still counts as outstanding until it ends
+        pending = {first, second}
+        error = None
+        response = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except requests.exceptions.RequestException as e:
+                    error = e
+                    continue
+                if response.status_code not in RETRY_STATUS_CODES:
+                    if future is second:
+                        with self._lock:
+                            backup.hedges_won += 1
+                    return response
+        if response is not None:
+            return response
+        raise error
+
+    # Heights
+
+    def _maybe_check_heights(self):
+        """Start a background height check once the last one is older than the interval"""
+        with self._lock:
+            if self._checking_heights or time.monotonic() - self._heights_checked < self.height_check_interval:
+                return
+            self._checking_heights = True
+        threading.Thread(target=self.check_heights, name="daemon-pool-heights", daemon=True).start()
+
+    def check_heights(self):
+        """get_info every daemon and record its height; failures start its cooldown"""
+        payload = {"jsonrpc": "2.0", "id": "0", "method": "get_info"}
+        try:
+            for daemon in self.daemons:
+                try:
+                    response = daemon.session.post("json_rpc", payload, timeout=HEIGHT_CHECK_TIMEOUT)
+                    height = response.json()["result"]["height"]
+                except Exception as e:
+                    with self._lock:
+                        self._fail_locked(daemon, str(e))
+                    continue
+                with self._lock:
+                    daemon.height = height
+        finally:
+            with self._lock:
+                self._heights_checked = time.monotonic()
+                self._checking_heights = False
+
+    # Readers
+
+    def status(self):
+        """Per-daemon routing state, plus the current hedge delay per method"""
+        with self._lock:
+            now = time.monotonic()
+            top = max((d.height for d in self.daemons if d.height is not None), default=None)
+            daemons = []
+            for daemon in self.daemons:
+                cooling, lagging, _, _ = self._rank(daemon, now, top)
+                latencies = list(daemon.latencies)
+                daemons.append({
+                    "url": daemon.url,
+                    "height": daemon.height,
+                    "lagging": lagging,
+                    "cooling_down": cooling,
+                    "outstanding": daemon.outstanding,
+                    "requests": daemon.requests,
+                    "errors": daemon.errors,
+                    "hedges": daemon.hedges,
+                    "hedges_won": daemon.hedges_won,
+                    "last_error": daemon.last_error,
+                    "latency_ms": {
+                        "p50": _ms(percentile(latencies, 50)),
+                        "p95": _ms(percentile(latencies, 95)),
+                    },
+                })
+            methods = list(self._method_latencies)
+        hedge_delays = {}
+        for method in methods:
+            delay = self._hedge_delay(method)
+            hedge_delays[method] = _ms(delay)
+        return {"daemons": daemons, "top_height": top, "hedge_delay_ms": hedge_delays}
+
+
+class StickyDaemonSession:
+    """Session view of a DaemonPool that sticks to one daemon while it stays healthy
+
+    For consumers that diff successive answers (the chain follower, the mempool
+    watcher): switching daemons between polls would show two slightly different
+    tips or pools as churn. They still fail over, without hedging.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.base_url = pool.base_url
+        self.timeout = pool.timeout
+        self.daemon = None
+
+    def post(self, endpoint, payload=None, timeout=None):
+        return self.pool._request(endpoint, payload, timeout, sticky=self)
+
+    def close(self):
+        pass
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
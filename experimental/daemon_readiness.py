@@ -0,0 +1,184 @@
+import re
+import threading
+import time
+
+import requests
+
+# Startup states in order; "failed" and "stopped" end tracking from any of them
+STARTING = "starting"
+LOADING = "loading"
+SYNCING = "syncing"
+READY = "ready"
+FAILED = "failed"
+STOPPED = "stopped"
+STATE_ORDER = (STARTING, LOADING, SYNCING, READY)
+# A syncing daemon already answers for the blocks it has, so held requests are released then
+SERVING_STATES = (SYNCING, READY)
+FINAL_STATES = (FAILED, STOPPED)
+
+# Seconds before the first get_info probe; doubled after each unanswered probe
+FIRST_PROBE_DELAY = 0.25
+MAX_PROBE_DELAY = 5
+# (connect, read) timeout of one get_info probe
+PROBE_TIMEOUT = (1, 3)
+# Seconds without any log output or probe progress before startup is declared stuck
+STALL_TIMEOUT = 600
+
+# monerod log lines that mark a startup stage; a match also triggers an immediate probe
+LOG_STAGES = (
+    (re.compile(r"Loading blockchain from folder|Initializing core"), LOADING),
+    (re.compile(r"Core RPC server initialized OK|Starting core RPC server"), LOADING),
+    (re.compile(r"Synced (\d+)/(\d+)"), SYNCING),
+    (re.compile(r"SYNCHRONIZATION started"), SYNCING),
+    (re.compile(r"You are now synchronized with the network"), READY),
+)
+# monerod log lines that mean it will not come up
+LOG_ERRORS = re.compile(r"Failed to initialize|Error opening database|Failed to open|Exception in main")
+
+
+class DaemonReadiness:
+    """Startup state machine of one launched monerod: starting → loading → syncing → ready
+
+    Two sources drive it. feed_log() gets every line of the daemon's output and
+    advances the state on the lines in LOG_STAGES. track() probes get_info with
+    exponential backoff; a log stage change wakes it at once. Once get_info
+    answers, height and target_height give the sync progress, and the daemon is
+    ready when it reports itself synchronized (or has no peers ahead of it).
+    Startup fails when the process exits or when STALL_TIMEOUT passes with no new
+    output and no progress. There is no fixed deadline otherwise. wait() blocks
+    callers until the daemon can serve them or startup ends.
+    """
+
+    def __init__(self, rpc_url, process):
+        self.rpc_url = rpc_url
+        self.process = process
+        self.state = STARTING
+        self.message = "Process started"
+        self.error = None
+        self.height = None
+        self.target_height = None
+        self.ready_at = None
+        # Requests currently held in wait()
+        self.waiting = 0
+        self._last_activity = time.time()
+        self._changed = threading.Condition()
+        self._wake = threading.Event()
+
+    def _advance(self, state, message=None):
+        """Move forward to `state` (never back), waking probes and waiters; call with the condition held"""
+        if self.state in FINAL_STATES:
+            return
+        if STATE_ORDER.index(state) > STATE_ORDER.index(self.state):
+            self.state = state
+            if state in SERVING_STATES and self.ready_at is None:
+                self.ready_at = time.time()
+            self._wake.set()
+            self._changed.notify_all()
+        if message:
+            self.message = message
+
+    def feed_log(self, line):
+        """Update the state from one line of monerod output"""
+        with self._changed:
+            self._last_activity = time.time()
+            if LOG_ERRORS.search(line):
+                self.message = line
+                return
+            for pattern, state in LOG_STAGES:
+                match = pattern.search(line)
+                if match is None:
+                    continue
+                if match.groups():
+                    self.height, self.target_height = int(match.group(1)), int(match.group(2))
+                self._advance(state, line)
+                break
+
+    def probe(self):
+        """One get_info; returns its result or None while the RPC server is not up"""
+        payload = {"jsonrpc": "2.0", "id": "0", "method": "get_info"}
+        try:
+            response = requests.post(f"{self.rpc_url}/json_rpc", json=payload, timeout=PROBE_TIMEOUT)
+            result = response.json().get("result") if response.status_code == 200 else None
+        except (requests.exceptions.RequestException, ValueError):
+            return None
+        return result if result and result.get("status") == "OK" else None
+
+    def _apply_info(self, info):
+        with self._changed:
+            height, target = info.get("height"), info.get("target_height") or 0
+            if height != self.height or target != self.target_height:
+                self._last_activity = time.time()
+            self.height, self.target_height = height, target
+            # With no peer ahead (target_height 0 or reached) there is nothing left to sync
+            synced = info.get("synchronized") or (not info.get("busy_syncing") and target <= height)
+            if synced:
+                self._advance(READY, f"Synchronized at height {height}")
+            else:
+                self._advance(SYNCING, f"Syncing {height}/{target}")
+
+    def track(self, on_serving=None):
+        """Probe until the daemon is ready or startup ends; returns the final state
+
+        on_serving() is called once, when the daemon first starts answering requests.
+        """
+        delay = FIRST_PROBE_DELAY
+        notified = False
+        while True:
+            returncode = self.process.poll()
+            if returncode is not None:
+                self.finish(FAILED, f"monerod exited with code {returncode} during startup ({self.message})")
+                return self.state
+            info = self.probe()
+            if info is not None:
+                self._apply_info(info)
+                # Answering, so later probes only follow the sync
+                delay = MAX_PROBE_DELAY
+            else:
+                delay = min(delay * 2, MAX_PROBE_DELAY)
+            if self.state in SERVING_STATES and not notified:
+                notified = True
+                if on_serving is not None:
+                    on_serving()
+            if self.state == READY or self.state in FINAL_STATES:
+                return self.state
+            if self.state not in SERVING_STATES and time.time() - self._last_activity > STALL_TIMEOUT:
+                self.finish(FAILED, f"No startup progress for {STALL_TIMEOUT}s ({self.message})")
+                return self.state
+            self._wake.wait(delay)
+            if self._wake.is_set():
+                self._wake.clear()
+                delay = FIRST_PROBE_DELAY
+
+    def finish(self, state, error=None):
+        """End startup as "failed" or "stopped", releasing every held request"""
+        with self._changed:
+            if self.state in FINAL_STATES:
+                return
+            self.state = state
+            self.error = error
+            self._wake.set()
+            self._changed.notify_all()
+
+    def wait(self, timeout):
+        """Block until the daemon can serve requests or startup ends, at most `timeout` seconds"""
+        with self._changed:
+            self.waiting += 1
+            try:
+                self._changed.wait_for(lambda: self.state in SERVING_STATES or self.state in FINAL_STATES, timeout)
+            finally:
+                self.waiting -= 1
+            return self.state
+
+    def status(self):
+        with self._changed:
+            percent = None
+            if self.height is not None and self.target_height:
+                percent = round(min(100.0, 100.0 * self.height / self.target_height), 2)
+            return {
+                "state": self.state,
+                "message": self.message,
+                "error": self.error,
+                "progress": {"height": self.height, "target_height": self.target_height, "percent": percent},
+                "ready_at": self.ready_at,
+                "waiting": self.waiting,
+            }
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Batch Guess-Newest-Heuristic scoring for every ring in a block range.
+
+Usage:
+    python -m experimental.gnh_batch <start_height> <end_height> [--out FILE] [--daemon URL | --lmdb PATH]
+                                     [--height-index FILE] [--output-index FILE] [--workers N]
+
+Every key input of every transaction in [start_height, end_height] is scored in
+one vectorized pass. Ring members are laid out as flat arrays with one segment
+per ring, so the per-ring min/max/sum/rank steps are NumPy segment reductions
+instead of Python loops. Results are written as Parquet (needs pyarrow) or CSV.
+With --workers N the range is split across N processes (see parallel_analysis).
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from experimental.height_index import HeightIndex
+from experimental.output_index import OutputIndex
+from experimental.node_visualization import MoneroNodeVisualization
+from experimental.output_resolver import OutputResolver
+
+DAEMON = "http://127.0.0.1:38081"
+EPS = 1e-9
+DAY = 86400.0
+# Transactions requested per get_transactions call
+TX_BATCH = 100
+
+SCORE_COLUMNS = ["inv_age", "norm_age", "neglog", "softmax_norm_age", "gnh_score", "newest_rank"]
+
+
+###############################################################################
+# FETCHING
+###############################################################################
+
+def fetch_range_transactions(node, start_height, end_height):
+    """Return decoded, non-coinbase transactions mined in start_height..end_height"""
+    headers = node.get_block_headers_range(start_height, end_height)
+    if "error" in headers:
+        raise RuntimeError(f"Failed to fetch headers: {headers}")
+
+    heights = [h["height"] for h in headers["headers"] if h.get("num_txes", 0) > 0]
+    blocks = node.get_blocks_by_heights(heights)
+    tx_hashes = [tx_hash for h in heights for tx_hash in blocks[h].get("tx_hashes", [])]
+
+    txs = []
+    for i in range(0, len(tx_hashes), TX_BATCH):
+        result = node.get_transactions(tx_hashes[i:i + TX_BATCH])
+        if "error" in result:
+            raise RuntimeError(f"Failed to fetch transactions: {result}")
+        txs.extend(result["txs"])
+    return txs
+
+
+def collect_rings(txs):
+    """Flatten every key input into ring segments
+
+    Returns (ring_rows, members) where ring_rows holds one metadata dict per ring and
+    members is a flat int64 array of global output indices, ring after ring. The
+    indices count within the ring's "amount": 0 for RingCT, the input's own amount
+    for pre-RingCT inputs.
+    """
+    ring_rows = []
+    members = []
+    for tx in txs:
+        tx_json = tx.get("tx_json", {})
+        for input_index, vin in enumerate(tx_json.get("vin", [])):
+            key = vin.get("key")
+            if not key:
+                continue
+            ring_rows.append({
+                "tx_hash": tx["tx_hash"],
+                "tx_height": tx.get("block_height", -1),
+                "tx_timestamp": tx.get("block_timestamp", 0),
+                "input_index": input_index,
+                "key_image": key.get("k_image", ""),
+                "amount": key.get("amount", 0),
+                "ring_size": len(key["key_offsets"]),
+            })
+            # key_offsets are deltas; the running sum gives global output indices
+            members.append(np.cumsum(np.asarray(key["key_offsets"], dtype=np.int64)))
+    flat = np.concatenate(members) if members else np.empty(0, dtype=np.int64)
+    return ring_rows, flat
+
+
+###############################################################################
+# SCORING
+###############################################################################
+
+def score_rings(ages, ring_sizes):
+    """Vectorized GNH scores for flat ring-member ages (NaN = unknown)
+
+    `ring_sizes` splits `ages` into consecutive rings. Scores match
+    rank_ring_by_age.compute_scores_for_valid_ages applied ring by ring,
+    with NaN for members whose age is unknown.
+    """
+    ages = np.asarray(ages, dtype=np.float64)
+    ring_sizes = np.asarray(ring_sizes, dtype=np.int64)
+    n = len(ages)
+    scores = {col: np.full(n, np.nan) for col in SCORE_COLUMNS}
+    if n == 0:
+        return scores
+
+    starts = np.concatenate(([0], np.cumsum(ring_sizes)[:-1]))
+    ring_of = np.repeat(np.arange(len(ring_sizes)), ring_sizes)
+    valid = ~np.isnan(ages)
+
+    scores["inv_age"] = 1.0 / (ages + DAY)
+    scores["neglog"] = -np.log(ages / DAY + 1e-6)
+
+    # fmin/fmax skip NaN, so missing members do not affect the ring's range
+    ring_min = np.fmin.reduceat(ages, starts)[ring_of]
+    ring_max = np.fmax.reduceat(ages, starts)[ring_of]
+    spread = ring_max - ring_min
+    flat = spread < EPS
+    with np.errstate(invalid="ignore", divide="ignore"):
+        norm = np.where(flat, 1.0, (ring_max - ages) / np.where(flat, 1.0, spread))
+    norm[~valid] = np.nan
+    scores["norm_age"] = norm
+    scores["gnh_score"] = norm
+
+    exps = np.where(valid, np.exp(np.nan_to_num(norm)), 0.0)
+    ring_sum = np.add.reduceat(exps, starts)[ring_of] + EPS
+    scores["softmax_norm_age"] = np.where(valid, exps / ring_sum, np.nan)
+
+    scores["newest_rank"] = _rank_within_rings(ages, ring_of, valid)
+    return scores
+
+
+def _rank_within_rings(ages, ring_of, valid):
+    """Ascending age rank inside each ring, ties averaged (pandas rank method='average')"""
+    ranks = np.full(len(ages), np.nan)
+    idx = np.flatnonzero(valid)
+    if len(idx) == 0:
+        return ranks
+
+    order = idx[np.lexsort((ages[idx], ring_of[idx]))]
+    ring_sorted = ring_of[order]
+    age_sorted = ages[order]
+
+    # 1-based position inside each ring
+    ring_start = np.r_[True, ring_sorted[1:] != ring_sorted[:-1]]
+    start_pos = np.maximum.accumulate(np.where(ring_start, np.arange(len(order)), 0))
+    position = np.arange(len(order)) - start_pos + 1.0
+
+    # Average the positions over runs of equal age within a ring
+    run_start = ring_start | np.r_[True, age_sorted[1:] != age_sorted[:-1]]
+    run_id = np.cumsum(run_start) - 1
+    run_mean = np.bincount(run_id, weights=position) / np.bincount(run_id)
+    ranks[order] = run_mean[run_id]
+    return ranks
+
+
+###############################################################################
+# PIPELINE
+###############################################################################
+
+def analyze_range(node, start_height, end_height, resolver):
+    """Score every ring of every transaction in a height range; returns a DataFrame"""
+    txs = fetch_range_transactions(node, start_height, end_height)
+    ring_rows, members = collect_rings(txs)
+    return score_ring_rows(ring_rows, members, resolver)
+
+
+def score_ring_rows(ring_rows, members, resolver):
+    ring_sizes = np.array([row["ring_size"] for row in ring_rows], dtype=np.int64)
+    amounts = np.repeat(np.array([row["amount"] for row in ring_rows], dtype=np.uint64), ring_sizes)
+    # Members shared between rings are resolved once, in bulk
+    out_heights, out_timestamps = resolver.resolve_arrays(members, amounts)
+
+    tx_ts = np.repeat(np.array([row["tx_timestamp"] for row in ring_rows], dtype=np.float64), ring_sizes)
+    ages = np.maximum(0.0, tx_ts - out_timestamps)
+    scores = score_rings(ages, ring_sizes)
+
+    columns = {
+        "tx_hash": np.repeat(np.array([row["tx_hash"] for row in ring_rows], dtype=object), ring_sizes),
+        "tx_height": np.repeat(np.array([row["tx_height"] for row in ring_rows], dtype=np.int64), ring_sizes),
+        "input_index": np.repeat(np.array([row["input_index"] for row in ring_rows], dtype=np.int32), ring_sizes),
+        "key_image": np.repeat(np.array([row["key_image"] for row in ring_rows], dtype=object), ring_sizes),
+        "ring_position": np.concatenate([np.arange(s, dtype=np.int32) for s in ring_sizes]) if len(ring_sizes) else np.empty(0, dtype=np.int32),
+        "amount": amounts,
+        "global_index": members,
+        "out_height": out_heights,
+        "out_timestamp": out_timestamps,
+        "age_seconds": ages,
+    }
+    columns.update(scores)
+    return pd.DataFrame(columns)
+
+
+def check_parquet_engine(path):
+    """Fail before any work when Parquet output was asked for but cannot be written"""
+    if not path.endswith(".parquet"):
+        return
+    for engine in ("pyarrow", "fastparquet"):
+        try:
+            __import__(engine)
+            return
+        except ImportError:
+            continue
+    raise SystemExit(f"[!] {path}: writing Parquet needs pyarrow (pip install pyarrow), or use a .csv output")
+
+
+def write_columnar(df, path):
+    """Write Parquet for a .parquet path, CSV otherwise"""
+    if path.endswith(".parquet"):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch GNH ring scoring over a block range")
+    parser.add_argument("start_height", type=int)
+    parser.add_argument("end_height", type=int)
+    parser.add_argument("--out", default="ring_age_scores.parquet")
+    parser.add_argument("--daemon", default=DAEMON)
+    parser.add_argument("--outputs-db", default="output_index.sqlite",
+                        help="Persistent (amount, global index) → (height, timestamp, key, mask) table reused across runs")
+    parser.add_argument("--output-index", default=None,
+                        help="RingCT output index built by experimental.output_index; read before the daemon")
+    parser.add_argument("--height-index", default=None,
+                        help="Memory-mapped height → timestamp index; synced to the tip before scoring")
+    parser.add_argument("--lmdb", default=None, help="Read a data.mdb directly instead of a daemon")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes; 0 uses every core")
+    args = parser.parse_args()
+    check_parquet_engine(args.out)
+
+    started = time.perf_counter()
+    # The node client logs every RPC; keep the batch output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        if args.lmdb:
+            from experimental.lmdb_reader import MoneroLMDBReader
+            node = MoneroLMDBReader(args.lmdb)
+        else:
+            height_index = HeightIndex(args.height_index) if args.height_index else None
+            output_index = OutputIndex(args.output_index) if args.output_index else None
+            node = MoneroNodeVisualization(args.daemon, height_index=height_index, output_index=output_index)
+            if height_index is not None:
+                synced = height_index.sync(node)
+                if "error" in synced:
+                    raise SystemExit(f"[!] Height index sync failed: {synced['error']}")
+        node._make_rpc_call("get_info")
+
+        if args.workers != 1:
+            from experimental.parallel_analysis import run_parallel
+            df = run_parallel(args.start_height, args.end_height, daemon=args.daemon, lmdb_path=args.lmdb,
+                              height_index=args.height_index if not args.lmdb else None,
+                              output_index=args.output_index if not args.lmdb else None,
+                              outputs_db=args.outputs_db, workers=args.workers or None)
+        else:
+            resolver = OutputResolver(node, args.outputs_db)
+            df = analyze_range(node, args.start_height, args.end_height, resolver)
+            resolver.close()
+
+    path = write_columnar(df, args.out)
+    rings = df.groupby(["tx_hash", "input_index"]).ngroups if len(df) else 0
+    print(f"[+] Scored {rings} rings ({len(df)} members) from blocks "
+          f"{args.start_height}-{args.end_height} in {time.perf_counter() - started:.1f}s")
+    print(f"[+] Saved → {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+from experimental.graph_model import Graph, GraphNode
+
+# Tx hashes per get_transactions call while resolving a frontier
+TX_FETCH_BATCH = 100
+DEFAULT_MAX_NODES = 2000
+DEFAULT_MAX_EDGES = 5000
+
+
+class GraphExpander:
+    """Breadth-first multi-hop transaction graph around one transaction
+
+    Each hop follows ring members back to the transactions that created them and,
+    when a ring reference index is given, outputs forward to the transactions whose
+    rings reference them. A whole frontier level is resolved at once: one batched
+    get_transactions for its transactions and one batched get_outs for all ring
+    members it introduces. Outputs are keyed by (amount, global index), so a ring
+    member and the output it points at are the same node and every transaction is
+    expanded once.
+
+    `ring_references` is any object with `spenders_of(global_indices)` returning
+    {global_index: [tx_hash, ...]}; without it only backward hops are followed.
+    """
+
+    def __init__(self, node, max_depth=3, max_nodes=DEFAULT_MAX_NODES, max_edges=DEFAULT_MAX_EDGES,
+                 ring_references=None):
+        self.node = node
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.max_edges = max_edges
+        self.ring_references = ring_references
+
+    def expand(self, tx_hash, as_graph=False):
+        """Return {"nodes", "links", "transaction", "depth_reached", "unexpanded", "truncated", "error"}
+
+        With as_graph the compact Graph carrying those fields is returned instead.
+        """
+        for kind, item in self.iter_expand(tx_hash):
+            if kind == "error":
+                return item
+            if kind == "meta":
+                self._graph.meta = {"transaction": self._graph.get(tx_hash).data, **item, "error": None}
+                return self._graph if as_graph else self._graph.to_dict()
+
+    def iter_expand(self, tx_hash):
+        """Yield ("node", node) and ("link", link) events level by level, then ("meta", summary)
+
+        A node that was already sent is sent again when a later level fills in its data,
+        so consumers should merge nodes by id. Failures end the stream with ("error", {...}).
+        """
+        self._graph = Graph()
+        self._link_keys = set()
+        # Slots of nodes added or changed since the last flush, and links already sent
+        self._dirty_slots = {}
+        self._sent_links = 0
+        self._truncated = False
+
+        expanded = set()
+        frontier = [tx_hash]
+        depth = 0
+        while frontier and depth < self.max_depth and not self._truncated:
+            txs = self._fetch_transactions(frontier)
+            if "error" in txs:
+                if depth == 0:
+                    yield "error", {"error": txs["error"]}
+                    return
+                break
+            expanded.update(frontier)
+            if depth == 0 and tx_hash not in txs["txs"]:
+                yield "error", {"error": "Transaction not found"}
+                return
+
+            ring_members = set()
+            outputs = set()
+            for hash_, tx in txs["txs"].items():
+                ring_members |= self._add_transaction(hash_, tx)
+                outputs.update(self._output_keys(tx))
+
+            discovered = self._follow_ring_members(ring_members)
+            discovered |= self._follow_outputs(outputs)
+            frontier = sorted(discovered - expanded)
+            depth += 1
+            yield from self._flush()
+
+        yield "meta", {
+            "depth_reached": depth,
+            "unexpanded": len(frontier),
+            "truncated": self._truncated
+        }
+
+    def _flush(self):
+        """Events for nodes added or changed and links added since the last flush"""
+        for slot in self._dirty_slots:
+            yield "node", self._graph.nodes[slot]
+        for i in range(self._sent_links, self._graph.link_count):
+            for link in self._graph.link_dicts(i):
+                yield "link", link
+        self._dirty_slots = {}
+        self._sent_links = self._graph.link_count
+
+    # Frontier resolution
+
+    def _fetch_transactions(self, tx_hashes):
+        txs = {}
+        for i in range(0, len(tx_hashes), TX_FETCH_BATCH):
+            result = self.node.get_transactions(tx_hashes[i:i + TX_FETCH_BATCH])
+            if "error" in result:
+                return {"error": result["error"]}
+            for tx in result.get("txs", []):
+                txs[tx["tx_hash"]] = tx
+        return {"txs": txs}
+
+    def _follow_ring_members(self, members):
+        """Resolve a level's (amount, global_index) ring members in one batch; returns the origin tx hashes found"""
+        origins = self.node.resolve_ring_members(members)
+        discovered = set()
+        for (amount, global_index), origin in origins.items():
+            out_id = self._output_id(amount, global_index)
+            slot = self._graph.slot(out_id)
+            if slot is not None:
+                self._graph.nodes[slot].data["origin"] = origin
+                self._dirty_slots[slot] = None
+            if not origin.get("txid"):
+                continue
+            self._add_node(origin["txid"], "transaction", {"tx_hash": origin["txid"], "block_height": origin["height"]})
+            self._add_link(origin["txid"], out_id, "output")
+            discovered.add(origin["txid"])
+        return discovered
+
+    def _follow_outputs(self, outputs):
+        """Transactions whose rings reference this level's outputs (needs a ring reference index)"""
+        # The ring reference index covers RingCT outputs only
+        global_indices = sorted(index for amount, index in outputs if amount == 0)
+        if self.ring_references is None or not global_indices:
+            return set()
+        discovered = set()
+        for global_index, spenders in self.ring_references.spenders_of(global_indices).items():
+            for spender in spenders:
+                self._add_node(spender, "transaction", {"tx_hash": spender})
+                self._add_link(self._output_id(0, global_index), spender, "referenced_by")
+                discovered.add(spender)
+        return discovered
+
+    # Graph assembly
+
+    def _add_transaction(self, tx_hash, tx):
+        """Add a fetched transaction with its inputs and outputs; returns its ring members as (amount, global_index)"""
+        self._add_node(tx_hash, "transaction", tx, replace=True)
+        tx_json = tx.get("tx_json", {})
+        ring_members = set()
+
+        for idx, vin in enumerate(tx_json.get("vin", [])):
+            if "key" not in vin:
+                continue
+            input_id = f"{tx_hash}_in_{idx}"
+            self._add_node(input_id, "input", vin)
+            self._add_link(input_id, tx_hash, "input")
+            amount = vin["key"].get("amount", 0)
+            global_index = 0
+            for offset in vin["key"].get("key_offsets", []):
+                global_index += offset
+                out_id = self._output_id(amount, global_index)
+                self._add_node(out_id, "ring_member", {"global_index": global_index,
+                                                       "key_image": vin["key"].get("k_image", "")})
+                self._add_link(out_id, input_id, "ring_member")
+                ring_members.add((amount, global_index))
+
+        output_keys = self._output_keys(tx)
+        for idx, vout in enumerate(tx_json.get("vout", [])):
+            target = vout.get("target", {})
+            key = target.get("key") or target.get("tagged_key", {}).get("key")
+            out_id = self._output_id(*output_keys[idx]) if idx < len(output_keys) else f"{tx_hash}_out_{idx}"
+            data = {"key": key, "amount": vout.get("amount", 0), "vout": idx}
+            if idx < len(output_keys):
+                data["global_index"] = output_keys[idx][1]
+            self._add_node(out_id, "output", data, replace=True)
+            self._add_link(tx_hash, out_id, "output")
+
+        return ring_members
+
+    @staticmethod
+    def _output_keys(tx):
+        """(amount, global_index) of each output, in vout order
+
+        Every output of a RingCT (version 2) transaction, coinbase included, is indexed
+        under amount 0; a version 1 output is indexed under its own amount.
+        """
+        tx_json = tx.get("tx_json", {})
+        ringct = tx_json.get("version", 1) >= 2
+        vout = tx_json.get("vout", [])
+        return [
+            (0 if ringct or idx >= len(vout) else vout[idx].get("amount", 0), global_index)
+            for idx, global_index in enumerate(tx.get("output_indices", []))
+        ]
+
+    @staticmethod
+    def _output_id(amount, global_index):
+        # Matches GLOBAL_OUTPUT_NODE_ID in node_visualization
+        return f"out_{global_index}" if amount == 0 else f"out_{amount}_{global_index}"
+
+    def _add_node(self, node_id, node_type, data, replace=False):
+        slot = self._graph.slot(node_id)
+        if slot is not None:
+            if replace:
+                # A placeholder discovered earlier now has its full data
+                existing = self._graph.nodes[slot]
+                existing.type = node_type
+                existing.data = {**existing.data, **data}
+                self._dirty_slots[slot] = None
+            return
+        if self._graph.node_count >= self.max_nodes:
+            self._truncated = True
+            return
+        self._dirty_slots[self._graph.add(GraphNode(node_id, node_type, data))] = None
+
+    def _add_link(self, source, target, link_type):
+        source, target = self._graph.slot(source), self._graph.slot(target)
+        key = (source, target, link_type)
+        if source is None or target is None or key in self._link_keys:
+            return
+        if len(self._link_keys) >= self.max_edges:
+            self._truncated = True
+            return
+        self._link_keys.add(key)
+        self._graph.link(source, target, link_type)
@@ -0,0 +1,293 @@
+"""
+Compact in-memory graph used while building transaction and block visualizations.
+
+Node ids are interned once into integer slots; links are parallel typed arrays
+(source slot, target slot, link type code) rather than one dict per link. Nodes are
+__slots__ records that keep a reference to the payload they were built from, and an
+input's ring members are a single RingMembers record over its key_offsets, so a
+16-member ring costs one object and one link until the graph is serialized.
+
+The {"nodes": [...], "links": [...]} shape the frontend expects is produced only
+where the graph leaves the process: to_dict() for callers that want the dicts,
+to_json() for HTTP responses, events() for NDJSON streams. to_json() encodes each
+payload once, so a block's transactions, which appear in the block node, in their
+own nodes and in the "block" field, are serialized a single time.
+"""
+
+import json
+from array import array
+from itertools import accumulate
+
+LINK_TYPES = ("input", "ring_member", "output", "contains", "referenced_by")
+LINK_TYPE_CODES = {name: code for code, name in enumerate(LINK_TYPES)}
+# Code 0 means "no subtype"
+LINK_SUBTYPES = (None, "miner")
+LINK_SUBTYPE_CODES = {name: code for code, name in enumerate(LINK_SUBTYPES)}
+# Container levels below a payload searched for other payloads to reuse (block -> transactions -> tx)
+SHARED_PAYLOAD_DEPTH = 2
+
+_dumps = json.JSONEncoder(separators=(",", ":")).encode
+
+
+class GraphNode:
+    """A node whose data is the payload it was created with, shared by reference"""
+
+    __slots__ = ("id", "type", "subtype", "data")
+
+    def __init__(self, node_id, node_type, data, subtype=None):
+        self.id = node_id
+        self.type = node_type
+        self.subtype = subtype
+        self.data = data
+
+    def payload(self):
+        return self.data
+
+    def compact(self):
+        """Just the id and type; the detail endpoint serves the rest on demand"""
+        node = {"id": self.id, "type": self.type}
+        if self.subtype is not None:
+            node["subtype"] = self.subtype
+        return node
+
+    def to_dict(self):
+        node = self.compact()
+        node["data"] = self.payload()
+        return node
+
+
+class OutputNode(GraphNode):
+    """Transaction output; its data dict is derived from the vout entry on demand"""
+
+    __slots__ = ("vout",)
+
+    def __init__(self, node_id, vout):
+        self.id = node_id
+        self.type = "output"
+        self.subtype = None
+        self.data = None
+        self.vout = vout
+
+    def payload(self):
+        return {"key": self.vout["target"]["key"], "amount": self.vout.get("amount", 0)}
+
+
+class RingMembers:
+    """All ring members of one input, expanded into nodes `<input id>_ring_<i>` on demand"""
+
+    __slots__ = ("id", "key", "origins")
+
+    def __init__(self, input_id, key, origins):
+        # Prefix of the member ids; never a node id itself
+        self.id = f"{input_id}_ring"
+        # The input's "key" dict and the {(amount, global_index): origin} map shared by the whole graph
+        self.key = key
+        self.origins = origins
+
+    def __len__(self):
+        return len(self.key["key_offsets"])
+
+    def node_dicts(self):
+        key_image = self.key.get("k_image", "")
+        amount = self.key.get("amount", 0)
+        offsets = self.key["key_offsets"]
+        return [
+            {
+                "id": f"{self.id}_{i}",
+                "type": "ring_member",
+                "data": {
+                    "offset": offset,
+                    "global_index": global_index,
+                    "key_image": key_image,
+                    "origin": self.origins.get((amount, global_index)),
+                },
+            }
+            for i, (offset, global_index) in enumerate(zip(offsets, accumulate(offsets)))
+        ]
+
+    def nodes(self):
+        return [GraphNode(node["id"], "ring_member", node["data"]) for node in self.node_dicts()]
+
+    def link_dicts(self, target_id):
+        return [{"source": f"{self.id}_{i}", "target": target_id, "type": "ring_member"} for i in range(len(self))]
+
+    def nodes_json(self):
+        """node_dicts() as comma-separated JSON objects, formatted without building the dicts"""
+        prefix = _dumps(self.id)[:-1]
+        key_image = _dumps(self.key.get("k_image", ""))
+        origins = self.origins
+        amount = self.key.get("amount", 0)
+        offsets = self.key["key_offsets"]
+        return ",".join(
+            f'{{"id":{prefix}_{i}","type":"ring_member","data":{{"offset":{offset},"global_index":{global_index},'
+            f'"key_image":{key_image},"origin":{_dumps(origins.get((amount, global_index)))}}}}}'
+            for i, (offset, global_index) in enumerate(zip(offsets, accumulate(offsets)))
+        )
+
+    def links_json(self, target_id):
+        """link_dicts() as comma-separated JSON objects; target_id is already encoded"""
+        prefix = _dumps(self.id)[:-1]
+        return ",".join(f'{{"source":{prefix}_{i}","target":{target_id},"type":"ring_member"}}' for i in range(len(self)))
+
+
+class Graph:
+    """Nodes in insertion order plus links as typed arrays of node slots
+
+    Keyword arguments become extra top-level fields of the serialized result
+    (e.g. transaction=..., error=None).
+    """
+
+    __slots__ = ("nodes", "meta", "node_count", "_slots", "_sources", "_targets", "_types", "_subtypes")
+
+    def __init__(self, **meta):
+        # GraphNode and RingMembers records
+        self.nodes = []
+        self.meta = meta
+        # Nodes once every RingMembers is expanded
+        self.node_count = 0
+        self._slots = {}
+        self._sources = array("I")
+        self._targets = array("I")
+        self._types = array("B")
+        self._subtypes = array("B")
+
+    def __contains__(self, node_id):
+        return node_id in self._slots
+
+    @property
+    def link_count(self):
+        return len(self._sources)
+
+    def add(self, node):
+        """Add a node (or RingMembers) and return its slot; an id already present keeps the first one"""
+        slot = self._slots.get(node.id)
+        if slot is None:
+            slot = self._slots[node.id] = len(self.nodes)
+            self.nodes.append(node)
+            self.node_count += len(node) if isinstance(node, RingMembers) else 1
+        return slot
+
+    def slot(self, node_id):
+        return self._slots.get(node_id)
+
+    def get(self, node_id):
+        """The node with this id, including members of a RingMembers record"""
+        slot = self._slots.get(node_id)
+        if slot is not None:
+            return self.nodes[slot]
+        prefix, _, index = node_id.rpartition("_")
+        slot = self._slots.get(prefix)
+        if slot is not None and index.isdigit() and int(index) < len(self.nodes[slot]):
+            return self.nodes[slot].nodes()[int(index)]
+        return None
+
+    def link(self, source, target, link_type, subtype=None):
+        """Link two slots; a RingMembers source links each of its members"""
+        self._sources.append(source)
+        self._targets.append(target)
+        self._types.append(LINK_TYPE_CODES[link_type])
+        self._subtypes.append(LINK_SUBTYPE_CODES[subtype] if subtype else 0)
+
+    def link_dicts(self, i):
+        source = self.nodes[self._sources[i]]
+        target_id = self.nodes[self._targets[i]].id
+        if isinstance(source, RingMembers):
+            return source.link_dicts(target_id)
+        link = {"source": source.id, "target": target_id, "type": LINK_TYPES[self._types[i]]}
+        if self._subtypes[i]:
+            link["subtype"] = LINK_SUBTYPES[self._subtypes[i]]
+        return [link]
+
+    def events(self, since=(0, 0)):
+        """Yield ("node", GraphNode) then ("link", link dict), skipping the first `since` (slots, links)
+
+        Nodes go out as records so the consumer picks compact() or to_dict().
+        """
+        first_node, first_link = since
+        for node in self.nodes[first_node:]:
+            if isinstance(node, RingMembers):
+                for member in node.nodes():
+                    yield "node", member
+            else:
+                yield "node", node
+        for i in range(first_link, len(self._sources)):
+            for link in self.link_dicts(i):
+                yield "link", link
+
+    def to_dict(self):
+        """The {"nodes", "links", **meta} result"""
+        nodes = []
+        for node in self.nodes:
+            if isinstance(node, RingMembers):
+                nodes.extend(node.node_dicts())
+            else:
+                nodes.append(node.to_dict())
+        links = []
+        for i in range(len(self._sources)):
+            links.extend(self.link_dicts(i))
+        return {"nodes": nodes, "links": links, **self.meta}
+
+    def to_json(self):
+        """to_dict() encoded as JSON text, with every shared payload encoded once"""
+        # Payload objects held by nodes; their text is cached the first time it is produced
+        shared = {id(node.data): None for node in self.nodes
+                  if not isinstance(node, RingMembers) and isinstance(node.data, (dict, list))}
+        encode = _PayloadEncoder(shared).encode
+
+        ids = [_dumps(node.id) for node in self.nodes]
+        parts = []
+        for node_id, node in zip(ids, self.nodes):
+            if isinstance(node, RingMembers):
+                if len(node):
+                    parts.append(node.nodes_json())
+                continue
+            head = f'{{"id":{node_id},"type":{_dumps(node.type)}'
+            if node.subtype is not None:
+                head += f',"subtype":{_dumps(node.subtype)}'
+            parts.append(f'{head},"data":{encode(node.payload())}}}')
+
+        types = [_dumps(t) for t in LINK_TYPES]
+        subtypes = [""] + [f',"subtype":{_dumps(s)}' for s in LINK_SUBTYPES[1:]]
+        links = []
+        for s, t, c, sc in zip(self._sources, self._targets, self._types, self._subtypes):
+            source = self.nodes[s]
+            if isinstance(source, RingMembers):
+                if len(source):
+                    links.append(source.links_json(ids[t]))
+            else:
+                links.append(f'{{"source":{ids[s]},"target":{ids[t]},"type":{types[c]}{subtypes[sc]}}}')
+
+        meta = "".join(f",{_dumps(key)}:{encode(value)}" for key, value in self.meta.items())
+        return f'{{"nodes":[{",".join(parts)}],"links":[{",".join(links)}]{meta}}}'
+
+
+class _PayloadEncoder:
+    """json.dumps that reuses the text of payloads already encoded elsewhere in the graph"""
+
+    def __init__(self, shared):
+        self.shared = shared
+
+    def encode(self, value, depth=SHARED_PAYLOAD_DEPTH):
+        key = id(value)
+        text = self.shared.get(key)
+        if text is not None:
+            return text
+        if depth and isinstance(value, dict) and self._holds_shared(value.values()):
+            text = "{" + ",".join(f"{_dumps(str(k))}:{self.encode(v, depth - 1)}" for k, v in value.items()) + "}"
+        elif depth and isinstance(value, list) and self._holds_shared(value):
+            text = "[" + ",".join(self.encode(v, depth - 1) for v in value) + "]"
+        else:
+            text = _dumps(value)
+        if key in self.shared:
+            self.shared[key] = text
+        return text
+
+    def _holds_shared(self, values):
+        """Whether any value, or any item of a list value, is a payload held by a node"""
+        shared = self.shared
+        for v in values:
+            if id(v) in shared:
+                return True
+            if isinstance(v, list) and any(id(item) in shared for item in v):
+                return True
+        return False
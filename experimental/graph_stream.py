@@ -0,0 +1,48 @@
+import json
+
+from experimental.graph_model import GraphNode
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+def compact_item(kind, item):
+    """Strip a graph node to its id and type; the detail endpoint serves the rest on demand"""
+    if kind != "node":
+        return item
+    if isinstance(item, GraphNode):
+        return item.compact()
+    compact = {"id": item["id"], "type": item["type"]}
+    if "subtype" in item:
+        compact["subtype"] = item["subtype"]
+    return compact
+
+
+def ndjson_lines(events, compact=False):
+    """Encode ("node" | "link" | "meta" | "error", item) graph events as NDJSON lines
+
+    Every node and link becomes one line as soon as it is produced; GraphNode records
+    are serialized here, so compact streams never build their payloads. The stream ends
+    with a {"kind": "done", ...} line carrying any summary, or an {"kind": "error"} line.
+    """
+    summary = {}
+    try:
+        for kind, item in events:
+            if kind == "error":
+                yield _line({"kind": "error", **item})
+                return
+            if kind == "meta":
+                summary.update(item)
+                continue
+            if compact:
+                item = compact_item(kind, item)
+            elif isinstance(item, GraphNode):
+                item = item.to_dict()
+            yield _line({"kind": kind, **item})
+    except Exception as e:
+        yield _line({"kind": "error", "error": str(e)})
+        return
+    yield _line({"kind": "done", **summary})
+
+
+def _line(obj):
+    return json.dumps(obj, separators=(",", ":")) + "\n"
@@ -0,0 +1,157 @@
+import threading
+import time
+from collections import deque
+
+# Seconds between probes of each daemon
+HEALTH_INTERVAL = 15
+# Samples kept per daemon (one hour at the default interval)
+HISTORY_SIZE = 240
+# The per-method endpoint checks are heavier, so they run on every Nth probe only
+FULL_CHECK_EVERY = 4
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers, None when empty"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+class HealthMonitor:
+    """Background thread that probes daemons and keeps their recent health in memory
+
+    Every interval each daemon gets a timed get_info (latency, height, sync status),
+    stored in a fixed-size ring buffer; every FULL_CHECK_EVERY probes the endpoint
+    checks also run. Readers get the cached snapshot and never wait on an RPC.
+    """
+
+    def __init__(self, registry, urls=(), interval=HEALTH_INTERVAL, history_size=HISTORY_SIZE,
+                 full_check_every=FULL_CHECK_EVERY):
+        self.registry = registry
+        self.interval = interval
+        self.history_size = history_size
+        self.full_check_every = full_check_every
+        self._history = {}
+        self._checks = {}
+        self._probes = {}
+        # Clients passed to add_url; every other URL is probed through the registry
+        self._nodes = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        for url in urls:
+            self.add_url(url)
+
+    def add_url(self, rpc_url, node=None):
+        """Start probing a daemon, through `node` when given instead of the registry's shared client"""
+        with self._lock:
+            if rpc_url not in self._history:
+                self._history[rpc_url] = deque(maxlen=self.history_size)
+                self._checks[rpc_url] = None
+                self._probes[rpc_url] = 0
+            if node is not None:
+                self._nodes[rpc_url] = node
+
+    def remove_url(self, rpc_url):
+        """Stop probing a daemon and drop its registry client"""
+        with self._lock:
+            self._history.pop(rpc_url, None)
+            self._checks.pop(rpc_url, None)
+            self._probes.pop(rpc_url, None)
+            self._nodes.pop(rpc_url, None)
+        self.registry.remove(rpc_url)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="health-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+
+    def _run(self):
+        # Probe straight away so the first status request already has data
+        while True:
+            with self._lock:
+                urls = list(self._history)
+            for rpc_url in urls:
+                try:
+                    self.probe(rpc_url)
+                except Exception as e:
+                    print(f"❌ Health probe failed for {rpc_url}: {str(e)}")
+            if self._stop.wait(self.interval):
+                return
+
+    def probe(self, rpc_url):
+        """Probe one daemon now and record the sample"""
+        with self._lock:
+            node = self._nodes.get(rpc_url)
+        if node is None:
+            node = self.registry.get(rpc_url)
+        started = time.perf_counter()
+        info = node._make_rpc_call("get_info")
+        latency_ms = (time.perf_counter() - started) * 1000
+        result = info.get("result", {})
+        sample = {
+            "time": time.time(),
+            "ok": "result" in info,
+            "latency_ms": round(latency_ms, 2),
+            "height": result.get("height"),
+            "target_height": result.get("target_height"),
+            "synchronized": result.get("synchronized"),
+            "error": info.get("error"),
+        }
+
+        with self._lock:
+            if rpc_url not in self._history:
+                return sample
+            run_full = self._probes[rpc_url] % self.full_check_every == 0
+            self._probes[rpc_url] += 1
+
+        checks = node.check_rpc_connections() if run_full else None
+        with self._lock:
+            if rpc_url not in self._history:
+                return sample
+            self._history[rpc_url].append(sample)
+            if checks is not None:
+                self._checks[rpc_url] = {"checks": checks, "checked_at": sample["time"]}
+        return sample
+
+    def snapshot(self, rpc_url):
+        """Latest sample, endpoint checks and latency percentiles for one daemon"""
+        with self._lock:
+            if rpc_url not in self._history:
+                return None
+            samples = list(self._history[rpc_url])
+            checks = self._checks[rpc_url]
+
+        latencies = [s["latency_ms"] for s in samples if s["ok"]]
+        return {
+            "url": rpc_url,
+            "latest": samples[-1] if samples else None,
+            "checks": checks["checks"] if checks else None,
+            "checked_at": checks["checked_at"] if checks else None,
+            "latency_ms": {
+                "p50": percentile(latencies, 50),
+                "p90": percentile(latencies, 90),
+                "p99": percentile(latencies, 99),
+            },
+            "availability": round(sum(s["ok"] for s in samples) / len(samples), 4) if samples else None,
+            "samples": len(samples),
+            "interval": self.interval,
+        }
+
+    def history(self, rpc_url):
+        """Every buffered sample for one daemon, oldest first"""
+        with self._lock:
+            return list(self._history.get(rpc_url, ()))
+
+    def urls(self):
+        with self._lock:
+            return list(self._history)
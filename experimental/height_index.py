@@ -0,0 +1,153 @@
+import mmap
+import os
+import shutil
+import threading
+from array import array
+from bisect import bisect_right
+
+from experimental.block_cache import REORG_SAFE_DEPTH
+from experimental.node_visualization import HEADERS_RANGE_CHUNK
+
+# Per height: block timestamp, cumulative RingCT output count (native uint64 each)
+FIELDS = 2
+RECORD_SIZE = FIELDS * 8
+
+
+class HeightIndex:
+    """Memory-mapped height → (timestamp, cumulative RingCT outputs) table for the whole chain
+
+    Records are fixed-width and stored in height order in one flat file, so a lookup
+    is a single offset into the mapping with no RPC or SQL involved. `sync` streams
+    headers and the output distribution from a node chunk by chunk and re-reads the
+    last REORG_SAFE_DEPTH heights each time, so the tail follows reorgs.
+    """
+
+    def __init__(self, path="height_index.bin"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._view = None
+        if not os.path.exists(path):
+            open(path, "wb").close()
+        self._remap()
+
+    def __len__(self):
+        view = self._view
+        return len(view) // FIELDS if view is not None else 0
+
+    def timestamp(self, height):
+        """Block timestamp at `height`, or None when the index does not cover it"""
+        view = self._view
+        if view is None or not 0 <= height < len(view) // FIELDS:
+            return None
+        return view[height * FIELDS]
+
+    def cumulative_outputs(self, height):
+        """RingCT outputs created up to and including `height`, or None when not covered"""
+        view = self._view
+        if view is None or not 0 <= height < len(view) // FIELDS:
+            return None
+        return view[height * FIELDS + 1]
+
+    def height_of_output(self, global_index):
+        """Height of the block that created RingCT output `global_index`, or None when not covered"""
+        view = self._view
+        if view is None:
+            return None
+        height = bisect_right(view[1::FIELDS], global_index)
+        return height if height < len(view) // FIELDS else None
+
+    def sync(self, node, max_chunks=None, stop=None):
+        """Bring the index up to the node's tip; returns {"height", "updated", "complete"} or {"error"}
+
+        At most `max_chunks` chunks of HEADERS_RANGE_CHUNK heights are fetched per call,
+        and setting the `stop` event ends the call after the current chunk; a later
+        call carries on from where this one stopped.
+        """
+        info = node._make_rpc_call("get_info")
+        if "result" not in info:
+            return {"error": "Failed to get blockchain info"}
+        chain_height = info["result"]["height"]
+
+        with self._lock:
+            start = max(0, min(len(self), chain_height) - REORG_SAFE_DEPTH)
+            if chain_height < len(self):
+                self._shrink(chain_height)
+
+            updated = 0
+            for chunk, chunk_start in enumerate(range(start, chain_height, HEADERS_RANGE_CHUNK)):
+                if (max_chunks is not None and chunk >= max_chunks) or (stop is not None and stop.is_set()):
+                    break
+                chunk_end = min(chunk_start + HEADERS_RANGE_CHUNK, chain_height) - 1
+                records = self._fetch_records(node, chunk_start, chunk_end)
+                if "error" in records:
+                    return records
+                with open(self.path, "r+b") as f:
+                    f.seek(chunk_start * RECORD_SIZE)
+                    f.write(records["records"].tobytes())
+                self._remap()
+                updated += chunk_end - chunk_start + 1
+                print(f"📇 Height index synced to {chunk_end}/{chain_height - 1}")
+
+        return {"height": len(self), "updated": updated, "complete": len(self) >= chain_height}
+
+    @staticmethod
+    def _fetch_records(node, start_height, end_height):
+        # Raw RPC on purpose: the whole chain's headers should not pass through the block cache
+        headers = node._make_rpc_call("get_block_headers_range", {
+            "start_height": start_height,
+            "end_height": end_height
+        })
+        distribution = node._make_rpc_call("get_output_distribution", {
+            "amounts": [0],
+            "from_height": start_height,
+            "to_height": end_height,
+            "cumulative": True,
+            "binary": False
+        })
+        if "result" not in headers:
+            return {"error": f"Failed to fetch headers {start_height}-{end_height}"}
+        if "result" not in distribution or not distribution["result"].get("distributions"):
+            return {"error": f"Failed to fetch output distribution {start_height}-{end_height}"}
+
+        dist = distribution["result"]["distributions"][0]
+        dist_start = dist["start_height"]
+        counts = dist["distribution"]
+
+        records = array("Q")
+        for header in headers["result"]["headers"]:
+            offset = header["height"] - dist_start
+            if offset < 0:
+                # Heights before the distribution starts have no RingCT outputs yet
+                cumulative = 0
+            elif offset < len(counts):
+                cumulative = counts[offset]
+            else:
+                cumulative = counts[-1] if counts else 0
+            records.append(header["timestamp"])
+            records.append(cumulative)
+        if len(records) != (end_height - start_height + 1) * FIELDS:
+            return {"error": f"Incomplete headers for {start_height}-{end_height}"}
+        return {"records": records}
+
+    def _shrink(self, height):
+        # The chain got shorter: truncate a copy so existing mappings are never cut under a reader
+        tmp_path = self.path + ".tmp"
+        shutil.copyfile(self.path, tmp_path)
+        with open(tmp_path, "r+b") as f:
+            f.truncate(height * RECORD_SIZE)
+        os.replace(tmp_path, self.path)
+        self._remap()
+
+    def _remap(self):
+        size = os.path.getsize(self.path)
+        size -= size % RECORD_SIZE
+        view = None
+        if size:
+            with open(self.path, "rb") as f:
+                mapping = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+            view = memoryview(mapping).cast("Q")
+        # Swap in one assignment; readers holding the old view keep its mapping alive
+        self._view = view
+
+    def close(self):
+        self._view = None
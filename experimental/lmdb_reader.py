@@ -0,0 +1,474 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from array import array
+from bisect import bisect_left
+
+import lmdb
+
+from experimental.blob_decoder import parse_block, parse_block_at, parse_transaction
+from experimental.monero_hash import transaction_hash
+from experimental.node_visualization import MoneroNodeVisualization
+from experimental.output_index import OutputIndex, RECORD
+
+# Tables keyed by a uint64 (height, tx_id or amount)
+INTEGER_TABLES = ("blocks", "txs_pruned", "tx_outputs")
+# Tables stored as fixed-size duplicates of a single key
+DUP_TABLES = ("block_info", "tx_indices", "output_txs", "output_amounts")
+
+# monerod keeps its hash-indexed tables as duplicates under one all-zero uint64 key
+ZERO_KEY = struct.pack("<Q", 0)
+
+# mdb_block_info_4: height, timestamp, coins, weight, cum_diff_lo, cum_diff_hi, hash, cum_rct, long_term_weight
+BLOCK_INFO_V4 = struct.Struct("<QQQQQQ32sQQ")
+# mdb_block_info_3: height, timestamp, coins, weight, cum_diff, hash, cum_rct, long_term_weight
+BLOCK_INFO_V3 = struct.Struct("<QQQQQ32sQQ")
+# txindex: tx hash, then tx_data_t (tx_id, unlock_time, block_id)
+TX_INDEX = struct.Struct("<32sQQQ")
+# outkey for amount 0: amount_index, output_id, pubkey, unlock_time, height, commitment
+OUT_KEY = struct.Struct("<QQ32sQQ32s")
+# outtx: output_id, tx hash, local_index
+OUT_TX = struct.Struct("<Q32sQ")
+
+NOT_AVAILABLE_OFFLINE = ("hard_fork_info", "get_connections", "mining_status", "get_fee_estimate")
+
+# Output index built beside data.mdb (or in the temp dir when that is read-only)
+OUTPUT_INDEX_NAME = "rct_outputs.bin"
+# Output index records buffered before each write while it is built
+OUTPUT_INDEX_FLUSH = 10000
+
+
+def _hash_key(raw_hash):
+    """Sort key matching monerod's compare_hash32 (32-bit words compared from the last one down)"""
+    return int.from_bytes(raw_hash[24:32], "little")
+
+
+class MoneroLMDBReader(MoneroNodeVisualization):
+    """Read-only access to a monerod data.mdb with the same interface as MoneroNodeVisualization
+
+    Instead of talking to a daemon, the RPC layer is answered straight from the LMDB
+    tables, so every higher-level method (summaries, graphs, analysis) works offline.
+
+    monerod sorts its hash-keyed tables with custom comparators that the lmdb bindings
+    cannot register, so hash lookups go through compact in-memory indexes that are
+    built lazily with one zero-copy cursor pass over the table. The same holds for
+    the uint64-sorted duplicates of output_amounts and output_txs (a seek with the
+    bindings' memcmp lands on the wrong entry), so RingCT outputs are served from an
+    OutputIndex file that one merged pass over both tables builds on first use.
+    """
+
+    def __init__(self, db_path, cache=None, output_index_path=None):
+        db_path = os.path.abspath(db_path)
+        if os.path.isfile(db_path):
+            # Accept the data.mdb file itself as well as its directory
+            db_path = os.path.dirname(db_path)
+        if not os.path.exists(os.path.join(db_path, "data.mdb")):
+            raise FileNotFoundError(f"No data.mdb found in {db_path}")
+
+        self.db_path = db_path
+        self.rpc_url = f"lmdb://{db_path}"
+        self.session = None
+        self.cache = cache
+        self.height_index = None
+        self.output_index = None
+        self.chain_store = None
+        self.tip_height = None
+        self.output_index_path = output_index_path or self._default_output_index_path(db_path)
+        if os.path.exists(self.output_index_path):
+            self.output_index = OutputIndex(self.output_index_path)
+        self._output_index_lock = threading.Lock()
+
+        # readahead off: lookups are random, and the OS should not page in neighbours
+        self.env = lmdb.open(db_path, readonly=True, lock=False, max_dbs=32, readahead=False)
+        self.dbs = {}
+        for name in INTEGER_TABLES:
+            self.dbs[name] = self.env.open_db(name.encode(), create=False, integerkey=True)
+        for name in DUP_TABLES:
+            self.dbs[name] = self.env.open_db(name.encode(), create=False,
+                                              integerkey=True, dupsort=True, dupfixed=True)
+
+        self._block_index = None
+        self._tx_index = None
+        print(f"Opened Monero LMDB database at {db_path}")
+
+    def close(self):
+        self.env.close()
+
+    @staticmethod
+    def _default_output_index_path(db_path):
+        if os.access(db_path, os.W_OK):
+            return os.path.join(db_path, OUTPUT_INDEX_NAME)
+        name = hashlib.sha256(db_path.encode()).hexdigest()[:16]
+        return os.path.join(tempfile.gettempdir(), f"{name}_{OUTPUT_INDEX_NAME}")
+
+    # Lazy indexes
+
+    def _load_block_index(self):
+        """One pass over block_info: per-height hash, timestamp, weight, cumulative difficulty and rct outputs"""
+        if self._block_index is not None:
+            return self._block_index
+
+        hashes = bytearray()
+        timestamps, weights, cum_rct = array("Q"), array("Q"), array("Q")
+        # Python ints: mainnet's cumulative difficulty no longer fits in 64 bits
+        cum_diffs = []
+        with self.env.begin(buffers=True) as txn:
+            cursor = txn.cursor(db=self.dbs["block_info"])
+            if cursor.set_key(ZERO_KEY):
+                for value in cursor.iternext_dup():
+                    if len(value) == BLOCK_INFO_V4.size:
+                        _, ts, _, weight, diff_lo, diff_hi, block_hash, rct, _ = BLOCK_INFO_V4.unpack(value)
+                    else:
+                        _, ts, _, weight, diff_lo, block_hash, rct, _ = BLOCK_INFO_V3.unpack_from(value)
+                        diff_hi = 0
+                    hashes += block_hash
+                    timestamps.append(ts)
+                    weights.append(weight)
+                    cum_diffs.append(diff_hi << 64 | diff_lo)
+                    cum_rct.append(rct)
+
+        self._block_index = {
+            "hashes": bytes(hashes),
+            "timestamps": timestamps,
+            "weights": weights,
+            "cum_diffs": cum_diffs,
+            "cum_rct": cum_rct,
+        }
+        return self._block_index
+
+    def _load_tx_index(self):
+        """One pass over tx_indices: hash sort keys with their tx_id, block height and full hash
+
+        The full hashes go to an unnamed temporary file that is memory-mapped: there
+        are far more transactions than blocks, so they are left to the page cache
+        instead of being held on the heap like the block hashes.
+        """
+        if self._tx_index is not None:
+            return self._tx_index
+
+        keys, tx_ids, heights = array("Q"), array("Q"), array("Q")
+        with tempfile.TemporaryFile() as hash_file:
+            with self.env.begin(buffers=True) as txn:
+                cursor = txn.cursor(db=self.dbs["tx_indices"])
+                if cursor.set_key(ZERO_KEY):
+                    # Duplicates come back in compare_hash32 order, so keys is already sorted
+                    for value in cursor.iternext_dup():
+                        tx_hash, tx_id, _, block_id = TX_INDEX.unpack(value)
+                        keys.append(_hash_key(tx_hash))
+                        tx_ids.append(tx_id)
+                        heights.append(block_id)
+                        hash_file.write(tx_hash)
+            hash_file.flush()
+            # The mapping keeps the unlinked file alive after it is closed
+            hashes = mmap.mmap(hash_file.fileno(), 0, access=mmap.ACCESS_READ) if keys else b""
+
+        self._tx_index = {"keys": keys, "tx_ids": tx_ids, "heights": heights, "hashes": hashes}
+        return self._tx_index
+
+    def _load_output_index(self):
+        """The OutputIndex, first extended to every RingCT output in the database
+
+        One pass over the amount-0 duplicates of output_amounts (key, commitment,
+        height), merged with one over output_txs (tx hash, position in the tx): both
+        run in output_id order. Indices already in the file are skipped, not rewritten.
+        """
+        with self._output_index_lock:
+            cum_rct = self._load_block_index()["cum_rct"]
+            total = cum_rct[-1] if cum_rct else 0
+            index = self.output_index if self.output_index is not None else OutputIndex(self.output_index_path)
+            start = len(index)
+            # A file left by another copy of the chain shows as a last record outside its block
+            last = index.get(start - 1) if start else None
+            if start > total or (last is not None and not self._holds_output(last["height"], start - 1)):
+                print(f"⚠️ {index.path} does not match {self.db_path}, rebuilding it")
+                os.truncate(index.path, 0)
+                index._remap()
+                start = 0
+            # Drop a partial record left by an interrupted build so appends stay aligned
+            elif os.path.getsize(index.path) != start * RECORD.size:
+                os.truncate(index.path, start * RECORD.size)
+            if start >= total:
+                self.output_index = index
+                return index
+
+            print(f"📇 Indexing RingCT outputs {start}..{total - 1} of {self.db_path}")
+            with self.env.begin(buffers=True) as txn, open(index.path, "ab") as f:
+                amounts = txn.cursor(db=self.dbs["output_amounts"])
+                output_txs = txn.cursor(db=self.dbs["output_txs"])
+                if amounts.set_key(ZERO_KEY) and output_txs.set_key(ZERO_KEY):
+                    tx_values = output_txs.iternext_dup()
+                    tx_output_id, tx_hash, local_index = -1, bytes(32), 0
+                    records = bytearray()
+                    for value in amounts.iternext_dup():
+                        amount_index, output_id, pubkey, _, height, commitment = OUT_KEY.unpack(value)
+                        if amount_index < start:
+                            continue
+                        # output_txs holds every output, so pre-RingCT ones are stepped over
+                        while tx_output_id < output_id:
+                            tx_value = next(tx_values, None)
+                            if tx_value is None:
+                                break
+                            tx_output_id, tx_hash, local_index = OUT_TX.unpack(tx_value)
+                        if tx_output_id != output_id:
+                            raise ValueError(f"output_txs has no entry for output {output_id}")
+                        records += RECORD.pack(height, bytes(tx_hash), local_index, bytes(pubkey), bytes(commitment))
+                        if len(records) >= OUTPUT_INDEX_FLUSH * RECORD.size:
+                            f.write(records)
+                            records = bytearray()
+                    f.write(records)
+            index._remap()
+            self.output_index = index
+            return index
+
+    def _db_entries(self, name):
+        with self.env.begin() as txn:
+            return txn.stat(self.dbs[name])["entries"]
+
+    def _block_hash(self, height):
+        hashes = self._load_block_index()["hashes"]
+        return hashes[height * 32:(height + 1) * 32].hex()
+
+    def _height_of_hash(self, block_hash):
+        hashes = self._load_block_index()["hashes"]
+        target = bytes.fromhex(block_hash)
+        if len(target) != 32:
+            return None
+        pos = hashes.find(target)
+        while pos != -1 and pos % 32:
+            pos = hashes.find(target, pos + 1)
+        return None if pos == -1 else pos // 32
+
+    def _find_tx(self, tx_hash):
+        """Return (tx_id, height) for a tx hash, or None"""
+        index = self._load_tx_index()
+        target = bytes.fromhex(tx_hash)
+        if len(target) != 32:
+            return None
+        key = _hash_key(target)
+        keys, hashes = index["keys"], index["hashes"]
+        i = bisect_left(keys, key)
+        # Hashes that share the 8-byte sort key sit next to each other; the full hash picks one
+        while i < len(keys) and keys[i] == key:
+            if hashes[i * 32:(i + 1) * 32] == target:
+                return index["tx_ids"][i], index["heights"][i]
+            i += 1
+        return None
+
+    # Record builders
+
+    def _block_header(self, height, block_json, tip_height):
+        index = self._load_block_index()
+        cum_diffs = index["cum_diffs"]
+        difficulty = cum_diffs[height] - (cum_diffs[height - 1] if height > 0 else 0)
+        return {
+            "height": height,
+            "hash": self._block_hash(height),
+            "prev_hash": block_json["prev_id"],
+            "timestamp": index["timestamps"][height],
+            "major_version": block_json["major_version"],
+            "minor_version": block_json["minor_version"],
+            "nonce": block_json["nonce"],
+            "num_txes": len(block_json["tx_hashes"]),
+            "block_size": index["weights"][height],
+            "block_weight": index["weights"][height],
+            "difficulty": difficulty,
+            "cumulative_difficulty": cum_diffs[height],
+            "depth": tip_height - height,
+            "orphan_status": False,
+        }
+
+    def _read_block(self, txn, height):
+        blob = txn.get(struct.pack("<Q", height), db=self.dbs["blocks"])
+        if blob is None:
+            return None, None
+        blob = bytes(blob)
+        return blob, parse_block(blob)
+
+    # Local RPC emulation
+
+    def _make_rpc_call(self, method, params=None, timeout=None):
+        """Answer a json_rpc method from the database instead of a daemon"""
+        params = params or {}
+        try:
+            if method == "get_info":
+                return {"result": self._rpc_get_info()}
+            if method == "get_block":
+                height = params.get("height")
+                if height is None:
+                    height = self._height_of_hash(params.get("hash", ""))
+                result = self._rpc_get_block(height)
+            elif method == "get_block_header_by_height":
+                headers = self._rpc_get_block_headers_range(params["height"], params["height"])
+                result = {"block_header": headers[0], "status": "OK"} if headers else None
+            elif method == "get_block_headers_range":
+                headers = self._rpc_get_block_headers_range(params["start_height"], params["end_height"])
+                result = {"headers": headers, "status": "OK"} if headers else None
+            elif method == "get_output_distribution":
+                result = self._rpc_get_output_distribution(params)
+            elif method == "get_transaction_pool":
+                # A database file has no mempool
+                result = {"transactions": [], "spent_key_images": [], "status": "OK"}
+            elif method in NOT_AVAILABLE_OFFLINE:
+                return {"error": f"{method} is not available from a database file"}
+            else:
+                return {"error": f"Unsupported method for LMDB reader: {method}"}
+        except Exception as e:
+            print(f"❌ LMDB read failed ({method}): {str(e)}")
+            return {"error": str(e)}
+
+        if result is None:
+            return {"error": "Not found in database"}
+        return {"result": result}
+
+    def _make_non_json_rpc_call(self, endpoint, params=None, timeout=None):
+        """Answer a non-JSON RPC endpoint from the database"""
+        params = params or {}
+        try:
+            if endpoint == "get_transactions":
+                return self._rpc_get_transactions(params.get("txs_hashes", []))
+            if endpoint == "get_outs":
+                return self._rpc_get_outs(params.get("outputs", []))
+            if endpoint == "get_transaction_pool_hashes":
+                return {"tx_hashes": [], "status": "OK"}
+        except Exception as e:
+            print(f"❌ LMDB read failed ({endpoint}): {str(e)}")
+            return {"error": str(e)}
+        return {"error": f"Unsupported endpoint for LMDB reader: {endpoint}"}
+
+    def check_rpc_connections(self):
+        """Every local method is available once the database has opened"""
+        return {
+            "get_info": True,
+            "get_block": True,
+            "get_transactions": True,
+            "get_transaction_pool": True
+        }
+
+    def _rpc_get_info(self):
+        height = self._db_entries("blocks")
+        self.tip_height = height - 1
+        return {
+            "height": height,
+            "target_height": height,
+            "top_block_hash": self._block_hash(height - 1) if height else "",
+            "tx_count": self._db_entries("txs_pruned"),
+            "synchronized": True,
+            "offline": True,
+            "status": "OK",
+        }
+
+    def _rpc_get_block(self, height):
+        if height is None:
+            return None
+        tip_height = self._db_entries("blocks") - 1
+        with self.env.begin(buffers=True) as txn:
+            blob = txn.get(struct.pack("<Q", height), db=self.dbs["blocks"])
+            blob = bytes(blob) if blob is not None else None
+        if blob is None:
+            return None
+        buf = memoryview(blob)
+        block_json, _, miner_tx_span, _ = parse_block_at(buf)
+        # Hashed from the blob: looking the coinbase up in tx_indices would need the whole tx index
+        miner_tx_hash = transaction_hash(buf, *miner_tx_span, block_json["miner_tx"]["version"]).hex()
+
+        return {
+            "block_header": self._block_header(height, block_json, tip_height),
+            "blob": blob.hex(),
+            "json": json.dumps(block_json),
+            "miner_tx_hash": miner_tx_hash,
+            "tx_hashes": block_json["tx_hashes"],
+            "status": "OK",
+        }
+
+    def _rpc_get_block_headers_range(self, start_height, end_height):
+        tip_height = self._db_entries("blocks") - 1
+        end_height = min(end_height, tip_height)
+        headers = []
+        with self.env.begin(buffers=True) as txn:
+            for height in range(start_height, end_height + 1):
+                _, block_json = self._read_block(txn, height)
+                if block_json is None:
+                    break
+                headers.append(self._block_header(height, block_json, tip_height))
+        return headers
+
+    def _rpc_get_output_distribution(self, params):
+        """RingCT (amount 0) output distribution from block_info's cumulative counts"""
+        if any(amount != 0 for amount in params.get("amounts", [0])):
+            raise ValueError("Only the RingCT (amount 0) distribution is available from a database file")
+        cum_rct = self._load_block_index()["cum_rct"]
+        from_height = params.get("from_height", 0)
+        to_height = params.get("to_height", 0) or len(cum_rct) - 1
+        counts = cum_rct[from_height:to_height + 1].tolist()
+        base = cum_rct[from_height - 1] if 0 < from_height <= len(cum_rct) else 0
+        if not params.get("cumulative", False):
+            counts = [count - prev for count, prev in zip(counts, [base] + counts[:-1])]
+        return {
+            "distributions": [{"amount": 0, "start_height": from_height, "distribution": counts, "base": base}],
+            "status": "OK",
+        }
+
+    def _rpc_get_transactions(self, tx_hashes):
+        timestamps = self._load_block_index()["timestamps"]
+        tip_height = self._db_entries("blocks") - 1
+        txs = []
+        missed = []
+        with self.env.begin(buffers=True) as txn:
+            for tx_hash in tx_hashes:
+                found = self._find_tx(tx_hash)
+                if found is None:
+                    missed.append(tx_hash)
+                    continue
+                tx_id, height = found
+                blob = txn.get(struct.pack("<Q", tx_id), db=self.dbs["txs_pruned"])
+                if blob is None:
+                    missed.append(tx_hash)
+                    continue
+                tx_json = parse_transaction(blob)
+                raw_indices = txn.get(struct.pack("<Q", tx_id), db=self.dbs["tx_outputs"])
+                output_indices = list(struct.unpack(f"<{len(raw_indices) // 8}Q", raw_indices)) if raw_indices else []
+                txs.append({
+                    "tx_hash": tx_hash,
+                    "as_json": json.dumps(tx_json),
+                    "pruned_as_hex": bytes(blob).hex(),
+                    "block_height": height,
+                    "block_timestamp": timestamps[height],
+                    "confirmations": tip_height - height + 1,
+                    "in_pool": False,
+                    "double_spend_seen": False,
+                    "output_indices": output_indices,
+                })
+
+        result = {"txs": txs, "status": "OK"}
+        if missed:
+            result["missed_tx"] = missed
+        return result
+
+    def _holds_output(self, height, global_index):
+        """Whether block `height` created the RingCT output with this global index"""
+        cum_rct = self._load_block_index()["cum_rct"]
+        if height >= len(cum_rct):
+            return False
+        return (cum_rct[height - 1] if height > 0 else 0) <= global_index < cum_rct[height]
+
+    def _rpc_get_outs(self, outputs):
+        """RingCT outputs by global (amount 0) index, read from the output index"""
+        index = self._load_output_index() if any(o.get("amount", 0) == 0 for o in outputs) else None
+        outs = []
+        for o in outputs:
+            origin = index.get(o["index"]) if index is not None and o.get("amount", 0) == 0 else None
+            if origin is None:
+                outs.append({})
+                continue
+            outs.append({
+                "height": origin["height"],
+                "key": origin["key"],
+                "mask": origin["mask"],
+                "txid": origin["txid"],
+                "unlocked": True,
+            })
+        return {"outs": outs, "status": "OK"}
@@ -0,0 +1,272 @@
+import json
+import queue
+import threading
+import time
+from collections import deque
+
+from experimental.graph_expansion import TX_FETCH_BATCH
+from experimental.health_monitor import percentile
+
+# Seconds between pool polls
+MEMPOOL_INTERVAL = 5
+# Events kept for clients that reconnect with Last-Event-ID
+EVENT_BACKLOG = 1000
+# Events buffered per subscriber before it is cut off as too slow
+SUBSCRIBER_QUEUE_SIZE = 1000
+# Confirmation latencies kept for the percentiles
+LATENCY_WINDOW = 1000
+# Seconds between SSE keep-alive comments
+SSE_HEARTBEAT = 15
+
+
+class MempoolSubscription:
+    """One consumer's queue of (event_id, kind, data) events"""
+
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        # Set when the queue filled up and events were lost; the consumer should resync
+        self.overflowed = False
+
+
+class MempoolWatcher:
+    """Background thread that keeps an in-memory model of a daemon's transaction pool
+
+    Each round polls get_transaction_pool_hashes and diffs it against the model, so
+    details are fetched only for hashes not seen before. Hashes that leave the pool
+    are looked up once to tell confirmed from dropped transactions, which gives the
+    first-seen-to-confirmation latency. Every change is published as an "add" or
+    "remove" event to subscribers (the SSE route) and kept in a short backlog.
+    """
+
+    def __init__(self, node, interval=MEMPOOL_INTERVAL):
+        self.node = node
+        self.interval = interval
+        self.last_poll = None
+        self.last_error = None
+        self._pool = {}
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._confirmed = 0
+        self._dropped = 0
+        self._backlog = deque(maxlen=EVENT_BACKLOG)
+        self._next_event_id = 1
+        self._subscribers = set()
+        self._polls = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="mempool-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+
+    def _run(self):
+        while True:
+            try:
+                result = self.poll()
+                self.last_error = result.get("error")
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"❌ Mempool watcher error: {str(e)}")
+            if self._stop.wait(self.interval):
+                return
+
+    def poll(self):
+        """Diff the daemon's pool against the model and publish the changes"""
+        result = self.node._make_non_json_rpc_call("get_transaction_pool_hashes")
+        if result.get("status") != "OK":
+            return {"error": result.get("error", "Failed to get transaction pool hashes")}
+        pool_hashes = result.get("tx_hashes") or []
+        now = time.time()
+
+        with self._lock:
+            known = set(self._pool)
+            # Transactions already waiting when the watcher started have no real first-seen time
+            initial = self._polls == 0
+        current = set(pool_hashes)
+        added = [tx_hash for tx_hash in pool_hashes if tx_hash not in known]
+        removed = sorted(known - current)
+
+        entries = self._fetch_entries(added, now, initial)
+        if "error" in entries:
+            return entries
+        outcomes = self._resolve_removed(removed)
+        if "error" in outcomes:
+            return outcomes
+
+        with self._lock:
+            for tx_hash in added:
+                if tx_hash in entries["entries"]:
+                    self._pool[tx_hash] = entries["entries"][tx_hash]
+                    self._publish("add", self._pool[tx_hash])
+            for tx_hash, outcome in outcomes["outcomes"].items():
+                entry = self._pool.pop(tx_hash, None)
+                if entry is None:
+                    continue
+                event = {"tx_hash": tx_hash, **outcome}
+                if outcome["reason"] == "confirmed":
+                    self._confirmed += 1
+                    if not entry["initial"]:
+                        event["latency"] = round(now - entry["first_seen"], 3)
+                        self._latencies.append(event["latency"])
+                else:
+                    self._dropped += 1
+                self._publish("remove", event)
+            self._polls += 1
+            self.last_poll = now
+            size = len(self._pool)
+
+        if added or removed:
+            print(f"🧾 Mempool: +{len(entries['entries'])} -{len(outcomes['outcomes'])} ({size} pending)")
+        return {"added": len(entries["entries"]), "removed": len(outcomes["outcomes"]), "size": size}
+
+    def _fetch_entries(self, tx_hashes, now, initial):
+        """Pool model entries for newly seen hashes; ones that left the pool meanwhile are skipped"""
+        entries = {}
+        for i in range(0, len(tx_hashes), TX_FETCH_BATCH):
+            result = self.node.get_transactions(tx_hashes[i:i + TX_FETCH_BATCH])
+            if "error" in result:
+                return {"error": result["error"]}
+            for tx in result.get("txs", []):
+                if tx.get("in_pool", True):
+                    entries[tx["tx_hash"]] = self._entry(tx, now, initial)
+        return {"entries": entries}
+
+    @staticmethod
+    def _entry(tx, now, initial):
+        tx_json = tx.get("tx_json") or {}
+        key_inputs = [vin["key"] for vin in tx_json.get("vin", []) if "key" in vin]
+        return {
+            "tx_hash": tx["tx_hash"],
+            "first_seen": now,
+            "initial": initial,
+            # When the daemon itself received it, if it says
+            "received_timestamp": tx.get("received_timestamp"),
+            "fee": tx_json.get("rct_signatures", {}).get("txnFee"),
+            "inputs": len(tx_json.get("vin", [])),
+            "outputs": len(tx_json.get("vout", [])),
+            "ring_size": len(key_inputs[0].get("key_offsets", [])) if key_inputs else None,
+            "key_images": [key.get("k_image") for key in key_inputs],
+        }
+
+    def _resolve_removed(self, tx_hashes):
+        """{tx_hash: {"reason": "confirmed" | "dropped", "block_height"}} for hashes gone from the pool"""
+        outcomes = {}
+        for i in range(0, len(tx_hashes), TX_FETCH_BATCH):
+            batch = tx_hashes[i:i + TX_FETCH_BATCH]
+            # Only the location is needed, so skip the bodies
+            result = self.node._make_non_json_rpc_call("get_transactions", {"txs_hashes": batch, "prune": True})
+            if "txs" not in result and "missed_tx" not in result:
+                return {"error": result.get("error", "Failed to get transactions")}
+            for tx in result.get("txs", []):
+                if tx.get("in_pool"):
+                    # Listed again by the time we asked; it stays in the model
+                    continue
+                outcomes[tx["tx_hash"]] = {
+                    "reason": "confirmed",
+                    "block_height": tx.get("block_height"),
+                    "block_timestamp": tx.get("block_timestamp"),
+                }
+            for tx_hash in result.get("missed_tx", []):
+                outcomes[tx_hash] = {"reason": "dropped", "block_height": None, "block_timestamp": None}
+        return {"outcomes": outcomes}
+
+    # Events
+
+    def _publish(self, kind, data):
+        """Record and fan out one event; call with the lock held"""
+        event = (self._next_event_id, kind, data)
+        self._next_event_id += 1
+        self._backlog.append(event)
+        for subscription in list(self._subscribers):
+            try:
+                subscription.queue.put_nowait(event)
+            except queue.Full:
+                subscription.overflowed = True
+                self._subscribers.discard(subscription)
+
+    def subscribe(self, last_event_id=None):
+        """Register a consumer; returns (subscription, events to send first)
+
+        A consumer resuming from an id still in the backlog gets the events it
+        missed; anyone else starts from a ("snapshot", ...) of the whole pool.
+        """
+        subscription = MempoolSubscription()
+        with self._lock:
+            self._subscribers.add(subscription)
+            if (last_event_id is not None and self._backlog
+                    and self._backlog[0][0] <= last_event_id + 1 and last_event_id < self._next_event_id):
+                replay = [event for event in self._backlog if event[0] > last_event_id]
+            else:
+                replay = [(self._next_event_id - 1, "snapshot", self._snapshot_locked())]
+        return subscription, replay
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def sse_lines(self, last_event_id=None, heartbeat=SSE_HEARTBEAT):
+        """Server-Sent Events stream of the pool: a snapshot or replay, then live add/remove events
+
+        Ends when the subscriber falls too far behind; the browser's EventSource then
+        reconnects with Last-Event-ID and is resynced.
+        """
+        subscription, replay = self.subscribe(last_event_id)
+        try:
+            yield f"retry: {int(self.interval * 1000)}\n\n"
+            for event in replay:
+                yield _sse(*event)
+            while not subscription.overflowed:
+                try:
+                    event = subscription.queue.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse(*event)
+        finally:
+            self.unsubscribe(subscription)
+
+    # Readers
+
+    def _snapshot_locked(self):
+        return {
+            "transactions": sorted(self._pool.values(), key=lambda entry: entry["first_seen"]),
+            "stats": self._stats_locked(),
+        }
+
+    def _stats_locked(self):
+        latencies = list(self._latencies)
+        return {
+            "size": len(self._pool),
+            "confirmed": self._confirmed,
+            "dropped": self._dropped,
+            "latency": {
+                "samples": len(latencies),
+                "p50": percentile(latencies, 50),
+                "p90": percentile(latencies, 90),
+                "max": max(latencies) if latencies else None,
+            },
+            "last_poll": self.last_poll,
+            "last_error": self.last_error,
+            "running": self._thread is not None and self._thread.is_alive(),
+        }
+
+    def snapshot(self):
+        """The pending transactions (oldest first) and the watcher's stats"""
+        with self._lock:
+            return self._snapshot_locked()
+
+    def stats(self):
+        with self._lock:
+            return self._stats_locked()
+
+
+def _sse(event_id, kind, data):
+    return f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
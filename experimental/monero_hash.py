@@ -0,0 +1,119 @@
+"""
+Monero's hash functions: Keccak-256 (cn_fast_hash), the Merkle tree hash, and
+transaction and block ids computed from their serialized blobs.
+
+Keccak uses pycryptodome when it is installed and a pure-Python permutation
+otherwise. Monero uses the original Keccak padding, so hashlib.sha3_256 cannot
+stand in for it.
+"""
+
+try:
+    from Crypto.Hash import keccak as _pycryptodome_keccak
+except ImportError:
+    _pycryptodome_keccak = None
+
+
+NULL_HASH = bytes(32)
+RATE = 136
+MASK = (1 << 64) - 1
+
+ROUND_CONSTANTS = [
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+]
+# Rotation offset of lane x + 5y, and where rho-pi moves it
+ROTATIONS = [0, 1, 62, 28, 27, 36, 44, 6, 55, 20, 3, 10, 43, 25, 39, 41, 45, 15, 21, 8, 18, 2, 61, 56, 14]
+PI = [y + 5 * ((2 * x + 3 * y) % 5) for y in range(5) for x in range(5)]
+# Lanes mixed into lane i by chi
+CHI = [(5 * (i // 5) + (i + 1) % 5, 5 * (i // 5) + (i + 2) % 5) for i in range(25)]
+
+
+def _keccak_f(state):
+    for rc in ROUND_CONSTANTS:
+        c = [state[x] ^ state[x + 5] ^ state[x + 10] ^ state[x + 15] ^ state[x + 20] for x in range(5)]
+        d = [c[(x - 1) % 5] ^ (((c[(x + 1) % 5] << 1) | (c[(x + 1) % 5] >> 63)) & MASK) for x in range(5)]
+        b = [0] * 25
+        for i in range(25):
+            lane = state[i] ^ d[i % 5]
+            r = ROTATIONS[i]
+            b[PI[i]] = ((lane << r) | (lane >> (64 - r))) & MASK if r else lane
+        state = [b[i] ^ (~b[j] & b[k]) for i, (j, k) in enumerate(CHI)]
+        state[0] ^= rc
+    return state
+
+
+def _keccak_256_python(data):
+    padded = bytearray(data)
+    padded.append(0x01)
+    padded.extend(bytes(-len(padded) % RATE))
+    padded[-1] |= 0x80
+    state = [0] * 25
+    for offset in range(0, len(padded), RATE):
+        block = padded[offset:offset + RATE]
+        for i in range(RATE // 8):
+            state[i] ^= int.from_bytes(block[8 * i:8 * i + 8], "little")
+        state = _keccak_f(state)
+    return b"".join(lane.to_bytes(8, "little") for lane in state[:4])
+
+
+def keccak_256(data):
+    """cn_fast_hash: original-padding Keccak-256 of a bytes-like object"""
+    if _pycryptodome_keccak is not None:
+        return _pycryptodome_keccak.new(digest_bits=256, data=bytes(data)).digest()
+    return _keccak_256_python(data)
+
+
+def tree_hash(hashes):
+    """Monero's Merkle root of a list of 32-byte hashes (tree-hash.c)"""
+    count = len(hashes)
+    if count == 1:
+        return hashes[0]
+    if count == 2:
+        return keccak_256(hashes[0] + hashes[1])
+
+    # Largest power of two below count
+    cnt = 1 << ((count - 1).bit_length() - 1)
+    ints = list(hashes[:2 * cnt - count]) + [None] * (count - cnt)
+    for i, j in zip(range(2 * cnt - count, count, 2), range(2 * cnt - count, cnt)):
+        ints[j] = keccak_256(hashes[i] + hashes[i + 1])
+    while cnt > 2:
+        cnt >>= 1
+        ints = [keccak_256(ints[2 * j] + ints[2 * j + 1]) for j in range(cnt)]
+    return keccak_256(ints[0] + ints[1])
+
+
+def transaction_hash(buf, start, prefix_end, base_end, end, version):
+    """Transaction id of the serialized transaction at buf[start:end]
+
+    Offsets are as parse_full_transaction returns them. v1 hashes the whole blob.
+    v2 hashes the prefix, the rct base and the prunable section separately and then
+    hashes the three hashes; a transaction without a RingCT signature (coinbase)
+    uses a null prunable hash.
+    """
+    if version == 1:
+        return keccak_256(buf[start:end])
+    return keccak_256(
+        keccak_256(buf[start:prefix_end])
+        + keccak_256(buf[prefix_end:base_end])
+        + (keccak_256(buf[base_end:end]) if end > base_end else NULL_HASH)
+    )
+
+
+def block_hash(header_blob, miner_tx_hash, tx_hashes):
+    """Block id from the serialized header, the miner tx id and the other tx ids (32-byte values)"""
+    leaves = [miner_tx_hash] + list(tx_hashes)
+    hashing_blob = bytes(header_blob) + tree_hash(leaves) + _varint_bytes(len(leaves))
+    return keccak_256(_varint_bytes(len(hashing_blob)) + hashing_blob)
+
+
+def _varint_bytes(value):
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
@@ -0,0 +1,343 @@
+import os
+import re
+import socket
+import subprocess
+import threading
+import time
+from collections import deque
+
+from experimental.daemon_readiness import DaemonReadiness, SERVING_STATES, FAILED, STOPPED
+
+# Seconds an API request for a starting daemon is held before it is answered 503 with the progress
+HOLD_TIMEOUT = 60
+# Requests held per instance at once; further ones are answered 503 straight away
+MAX_HELD_REQUESTS = 64
+# Retry-After (seconds) sent with those 503s
+RETRY_AFTER = 5
+# Seconds without API use after which an instance is shut down
+IDLE_TIMEOUT = 30 * 60
+# Seconds between the supervisor's idle and exit checks
+SUPERVISOR_INTERVAL = 30
+# Seconds monerod gets to exit after SIGTERM before it is killed
+STOP_TIMEOUT = 10
+# Instances allowed at once; each one maps its whole database
+MAX_INSTANCES = 4
+# Output lines kept per instance for the status route
+LOG_LINES = 200
+# Dataset ids are upload ids or directory names under the upload folder, never paths
+DATASET_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class MonerodError(Exception):
+    def __init__(self, message, status=400, retry_after=None, **details):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        self.details = details
+
+
+class MonerodInstance:
+    """One supervised monerod serving one dataset directory"""
+
+    def __init__(self, dataset_id, data_dir, rpc_port, p2p_port, process):
+        self.dataset_id = dataset_id
+        self.data_dir = data_dir
+        self.rpc_port = rpc_port
+        self.p2p_port = p2p_port
+        self.process = process
+        self.readiness = DaemonReadiness(self.rpc_url, process)
+        self.started_at = time.time()
+        self.last_used = time.time()
+        self.log = deque(maxlen=LOG_LINES)
+        self.node = None
+
+    @property
+    def rpc_url(self):
+        return f"http://127.0.0.1:{self.rpc_port}"
+
+    @property
+    def state(self):
+        return self.readiness.state
+
+    def status(self):
+        return {
+            "dataset_id": self.dataset_id,
+            **self.readiness.status(),
+            "rpc_url": self.rpc_url,
+            "rpc_port": self.rpc_port,
+            "p2p_port": self.p2p_port,
+            "pid": self.process.pid,
+            "returncode": self.process.poll(),
+            "started_at": self.started_at,
+            "last_used": self.last_used,
+            "log_tail": list(self.log)[-20:],
+        }
+
+
+class MonerodSupervisor:
+    """Runs one isolated monerod per uploaded dataset, on ports picked at start
+
+    A dataset is a directory under dataset_root: either an upload directory with
+    data.mdb at its top (ChunkedUploadManager's layout), which is linked into a
+    monerod data dir as lmdb/data.mdb, or a ready monerod data dir with lmdb/.
+    Each instance's startup is tracked by a DaemonReadiness (starting, loading,
+    syncing, ready) and API requests for it are held until it can serve them, so
+    callers never talk to a daemon that is still opening its database. Its stdout and stderr
+    are drained into a short in-memory log, since a full PIPE buffer would block
+    monerod. A background thread reaps instances that exited and shuts down ones
+    nobody used for idle_timeout seconds.
+    """
+
+    def __init__(self, monerod_path, dataset_root, network_args=("--stagenet",), node_class=None,
+                 health_monitor=None, idle_timeout=IDLE_TIMEOUT, max_instances=MAX_INSTANCES,
+                 interval=SUPERVISOR_INTERVAL):
+        self.monerod_path = monerod_path
+        self.dataset_root = dataset_root
+        self.network_args = list(network_args)
+        # Builds the per-instance API client, e.g. MoneroNodeVisualization
+        self.node_class = node_class
+        self.health_monitor = health_monitor
+        self.idle_timeout = idle_timeout
+        self.max_instances = max_instances
+        self.interval = interval
+        self._instances = {}
+        # The last stopped or failed instance per dataset, so its outcome can still be read
+        self._finished = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="monerod-supervisor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"❌ Monerod supervisor error: {str(e)}")
+
+    def check(self):
+        """Mark instances whose process exited and stop the idle ones"""
+        now = time.time()
+        with self._lock:
+            instances = list(self._instances.values())
+        for instance in instances:
+            returncode = instance.process.poll()
+            if returncode is not None and instance.state not in (FAILED, STOPPED):
+                instance.readiness.finish(FAILED, f"monerod exited with code {returncode}")
+                print(f"❌ monerod for {instance.dataset_id} exited with code {returncode}")
+                self._forget(instance)
+            elif (instance.state in SERVING_STATES and not instance.readiness.waiting
+                  and now - instance.last_used > self.idle_timeout):
+                print(f"💤 Stopping idle monerod for {instance.dataset_id}")
+                self.stop_instance(instance.dataset_id)
+
+    # Datasets
+
+    def dataset_dir(self, dataset_id):
+        if not dataset_id or not DATASET_ID.match(dataset_id):
+            raise MonerodError("Invalid dataset id")
+        path = os.path.join(self.dataset_root, dataset_id)
+        if not os.path.isdir(path):
+            raise MonerodError(f"Unknown dataset {dataset_id}", status=404)
+        return path
+
+    def latest_dataset(self):
+        """Id of the most recently uploaded dataset, or None"""
+        latest = None
+        for entry in os.scandir(self.dataset_root):
+            if not entry.is_dir() or not DATASET_ID.match(entry.name):
+                continue
+            for candidate in (os.path.join(entry.path, "data.mdb"), os.path.join(entry.path, "lmdb", "data.mdb")):
+                if os.path.isfile(candidate):
+                    mtime = os.path.getmtime(candidate)
+                    if latest is None or mtime > latest[0]:
+                        latest = (mtime, entry.name)
+                    break
+        return latest[1] if latest else None
+
+    def _prepare_data_dir(self, dataset_dir):
+        """The --data-dir for a dataset, linking an uploaded data.mdb into lmdb/ where needed"""
+        if os.path.isfile(os.path.join(dataset_dir, "lmdb", "data.mdb")):
+            return dataset_dir
+        uploaded = os.path.join(dataset_dir, "data.mdb")
+        if not os.path.isfile(uploaded):
+            raise MonerodError("Dataset has no data.mdb", status=404)
+        data_dir = os.path.join(dataset_dir, "monerod")
+        lmdb_dir = os.path.join(data_dir, "lmdb")
+        os.makedirs(lmdb_dir, exist_ok=True)
+        target = os.path.join(lmdb_dir, "data.mdb")
+        if not os.path.exists(target):
+            try:
+                os.link(uploaded, target)
+            except OSError:
+                os.symlink(os.path.abspath(uploaded), target)
+        return data_dir
+
+    # Instances
+
+    def launch(self, dataset_id):
+        """Start (or return) the instance for a dataset; follow its startup through instance.readiness"""
+        dataset_dir = self.dataset_dir(dataset_id)
+        with self._lock:
+            instance = self._instances.get(dataset_id)
+            if instance is not None:
+                instance.last_used = time.time()
+                return instance
+            if len(self._instances) >= self.max_instances:
+                raise MonerodError(f"At most {self.max_instances} monerod instances may run at once", status=503)
+            data_dir = self._prepare_data_dir(dataset_dir)
+            rpc_port, p2p_port = _free_ports(2)
+            command = [
+                self.monerod_path,
+                *self.network_args,
+                "--data-dir", data_dir,
+                "--rpc-bind-ip", "127.0.0.1",
+                "--rpc-bind-port", str(rpc_port),
+                "--p2p-bind-ip", "127.0.0.1",
+                "--p2p-bind-port", str(p2p_port),
+                # The ZMQ port is fixed per network and would collide between instances
+                "--no-zmq",
+                "--non-interactive",
+            ]
+            try:
+                process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                           stdin=subprocess.DEVNULL, text=True, errors="replace")
+            except OSError as e:
+                raise MonerodError(f"Could not start monerod: {str(e)}", status=500)
+            instance = MonerodInstance(dataset_id, data_dir, rpc_port, p2p_port, process)
+            self._instances[dataset_id] = instance
+
+        print(f"🚀 Started monerod for {dataset_id} (pid {process.pid}, RPC port {rpc_port})")
+        threading.Thread(target=self._drain, args=(instance,), name=f"monerod-log-{dataset_id}", daemon=True).start()
+        threading.Thread(target=self._track, args=(instance,), name=f"monerod-ready-{dataset_id}",
+                         daemon=True).start()
+        return instance
+
+    def _drain(self, instance):
+        """Read monerod's output until it exits so the pipe never fills up; it also drives readiness"""
+        for line in instance.process.stdout:
+            line = line.rstrip()
+            instance.log.append(line)
+            instance.readiness.feed_log(line)
+        instance.process.stdout.close()
+
+    def _track(self, instance):
+        def on_serving():
+            if self.health_monitor is not None and self.node_class is not None:
+                # Probed through the instance's own client, never the registry's: that one shares
+                # the default daemon's caches, which another chain's tip height would evict
+                self.health_monitor.add_url(instance.rpc_url, node=self._client(instance))
+            print(f"✅ monerod for {instance.dataset_id} is serving ({instance.readiness.message})")
+
+        state = instance.readiness.track(on_serving)
+        if state == FAILED:
+            print(f"❌ monerod for {instance.dataset_id}: {instance.readiness.error}")
+            if instance.process.poll() is None:
+                self.stop_instance(instance.dataset_id, state=FAILED)
+            else:
+                self._forget(instance)
+
+    def instance(self, dataset_id, finished=False):
+        """The running instance for a dataset; with finished=True, else the last one that ended"""
+        with self._lock:
+            instance = self._instances.get(dataset_id)
+            if instance is None and finished:
+                instance = self._finished.get(dataset_id)
+        if instance is None:
+            raise MonerodError(f"No monerod is running for dataset {dataset_id}", status=404)
+        return instance
+
+    def node(self, dataset_id, wait=HOLD_TIMEOUT):
+        """The API client of a dataset's instance; counts as use for the idle timeout
+
+        While the daemon starts up the call is held (up to `wait` seconds) until
+        it can serve, then answers 503 with the startup progress.
+        """
+        instance = self.instance(dataset_id)
+        readiness = instance.readiness
+        if instance.state not in SERVING_STATES:
+            if readiness.waiting >= MAX_HELD_REQUESTS:
+                raise MonerodError(f"Too many requests waiting for monerod of dataset {dataset_id}", status=503,
+                                   retry_after=RETRY_AFTER, startup=readiness.status())
+            if readiness.wait(wait) not in SERVING_STATES:
+                raise MonerodError(f"monerod for dataset {dataset_id} is {instance.state}", status=503,
+                                   retry_after=RETRY_AFTER if instance.state not in (FAILED, STOPPED) else None,
+                                   startup=readiness.status())
+        if self.node_class is None:
+            raise MonerodError("Node visualization module not available", status=503)
+        instance.last_used = time.time()
+        return self._client(instance)
+
+    def _client(self, instance):
+        """The instance's client, created on first use"""
+        with self._lock:
+            if instance.node is None:
+                # Not the app's shared caches: those hold the default daemon's chain
+                instance.node = self.node_class(instance.rpc_url, check_on_init=False)
+            return instance.node
+
+    def stop_instance(self, dataset_id, state=STOPPED):
+        """Terminate a dataset's monerod, killing it if it does not exit in time"""
+        with self._lock:
+            instance = self._instances.pop(dataset_id, None)
+            if instance is not None:
+                self._finished[dataset_id] = instance
+        if instance is None:
+            raise MonerodError(f"No monerod is running for dataset {dataset_id}", status=404)
+        if self.health_monitor is not None:
+            self.health_monitor.remove_url(instance.rpc_url)
+        instance.readiness.finish(state)
+        process = instance.process
+        if process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=STOP_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+                print(f"⚠️ monerod for {dataset_id} did not exit in {STOP_TIMEOUT}s and was killed")
+        print(f"🛑 Stopped monerod for {dataset_id}")
+        return instance
+
+    def stop_all(self):
+        with self._lock:
+            dataset_ids = list(self._instances)
+        return [self.stop_instance(dataset_id) for dataset_id in dataset_ids]
+
+    def _forget(self, instance):
+        """Drop an instance whose process already exited"""
+        with self._lock:
+            if self._instances.get(instance.dataset_id) is instance:
+                del self._instances[instance.dataset_id]
+                self._finished[instance.dataset_id] = instance
+        if self.health_monitor is not None:
+            self.health_monitor.remove_url(instance.rpc_url)
+
+    def status(self):
+        with self._lock:
+            return [instance.status() for instance in self._instances.values()]
+
+
+def _free_ports(count):
+    """Ports the OS reports free on the loopback interface right now"""
+    sockets = []
+    try:
+        for _ in range(count):
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.bind(("127.0.0.1", 0))
+            sockets.append(s)
+        return [s.getsockname()[1] for s in sockets]
+    finally:
+        for s in sockets:
+            s.close()
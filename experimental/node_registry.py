@@ -0,0 +1,62 @@
+import threading
+
+from experimental.daemon_pool import DaemonPool
+from experimental.node_visualization import MoneroNodeVisualization
+
+
+class NodeRegistry:
+    """Application-scoped MoneroNodeVisualization clients, one per daemon URL
+
+    Clients are created on first use and skip the startup RPC check. Their health
+    is tracked by HealthMonitor, which probes through these clients.
+    """
+
+    def __init__(self, node_class=MoneroNodeVisualization, **node_kwargs):
+        self.node_class = node_class
+        # Passed to every client, e.g. cache= and output_index=
+        self.node_kwargs = node_kwargs
+        self._nodes = {}
+        self._pools = {}
+        self._pooled_nodes = {}
+        self._lock = threading.Lock()
+
+    def get(self, rpc_url):
+        """The shared client for `rpc_url`, created on first use"""
+        with self._lock:
+            node = self._nodes.get(rpc_url)
+            if node is None:
+                node = self.node_class(rpc_url, check_on_init=False, **self.node_kwargs)
+                self._nodes[rpc_url] = node
+            return node
+
+    def remove(self, rpc_url):
+        """Drop the client for a daemon that went away"""
+        with self._lock:
+            self._nodes.pop(rpc_url, None)
+
+    def get_pooled(self, rpc_urls, sticky=False):
+        """The shared client whose RPCs a DaemonPool spreads over `rpc_urls`
+
+        sticky clients stay on one daemon while it is healthy, for consumers that
+        diff successive answers (see StickyDaemonSession). Both kinds share the pool.
+        """
+        key = tuple(url.rstrip("/") for url in rpc_urls)
+        with self._lock:
+            node = self._pooled_nodes.get((key, sticky))
+            if node is None:
+                pool = self._pools.get(key)
+                if pool is None:
+                    pool = self._pools[key] = DaemonPool(key)
+                session = pool.sticky() if sticky else pool
+                node = self.node_class(pool.base_url, session=session, check_on_init=False, **self.node_kwargs)
+                self._pooled_nodes[(key, sticky)] = node
+            return node
+
+    def pool(self, rpc_urls):
+        """The DaemonPool behind get_pooled(rpc_urls), None before it is first used"""
+        with self._lock:
+            return self._pools.get(tuple(url.rstrip("/") for url in rpc_urls))
+
+    def urls(self):
+        with self._lock:
+            return list(self._nodes)
@@ -1,23 +1,81 @@
 import requests
 import json
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from experimental.rpc_session import get_session, DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT
+from experimental.daemon_pool import DaemonPool
+from experimental.blob_decoder import parse_transaction, BlobDecodeError
+from experimental.graph_expansion import GraphExpander, DEFAULT_MAX_NODES, DEFAULT_MAX_EDGES
+from experimental.output_resolver import GET_OUTS_BATCH
+from experimental.graph_model import Graph, GraphNode, OutputNode, RingMembers
+
+# monerod's restricted RPC refuses header ranges longer than this
+HEADERS_RANGE_CHUNK = 1000
+# Parallel get_block calls when full blocks are needed (bounded by the session pool)
+BLOCK_FETCH_WORKERS = 8
+# Heights needing a timestamp that lie closer than this share one header range call
+TIMESTAMP_RUN_GAP = 32
+# Blocks the chain store may trail the tip by and still answer dashboard queries
+CHAIN_STORE_MAX_LAG = 2
+# Fetch pruned binary transactions and decode them here instead of asking monerod for JSON
+DECODE_TX_BLOBS = True
+# Transactions fetched per step while a block graph is streamed
+GRAPH_STREAM_CHUNK = 25
+
+# Node ids produced by the graph builders, used to serve node details lazily
+TX_NODE_ID = re.compile(r"^([0-9a-f]{64})$")
+INPUT_NODE_ID = re.compile(r"^([0-9a-f]{64})_in_(\d+)$")
+RING_NODE_ID = re.compile(r"^([0-9a-f]{64})_in_(\d+)_ring_(\d+)$")
+OUTPUT_NODE_ID = re.compile(r"^([0-9a-f]{64})_out_(\d+)$")
+# out_<global index> for RingCT outputs, out_<amount>_<global index> for pre-RingCT ones
+GLOBAL_OUTPUT_NODE_ID = re.compile(r"^out_(?:(\d+)_)?(\d+)$")
+MINER_TX_NODE_ID = re.compile(r"^miner_tx_(\d+)$")
+
 class MoneroNodeVisualization:
-    def __init__(self, rpc_url="http://localhost:18081"):
+    def __init__(self, rpc_url="http://localhost:18081", session=None,
+                 pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT, cache=None, height_index=None,
+                 output_index=None, chain_store=None, check_on_init=True):
+        # A list of daemon URLs is served by a DaemonPool: balanced reads, lag ejection, hedging, failover
+        if isinstance(rpc_url, (list, tuple)):
+            session = session or DaemonPool(rpc_url, pool_size=pool_size, timeout=timeout)
+            rpc_url = session.base_url
         self.rpc_url = rpc_url
+        # All RPC paths share one keep-alive connection pool per daemon URL
+        self.session = session or get_session(rpc_url, pool_size=pool_size, timeout=timeout)
+        # Optional BlockCache for confirmed blocks, headers and transactions
+        self.cache = cache
+        # Optional HeightIndex for O(1) height → timestamp lookups
+        self.height_index = height_index
+        # Optional OutputIndex for labelling ring members with their origin outputs
+        self.output_index = output_index
+        # Optional ChainStore kept current by ChainFollower; dashboard queries read it when fresh
+        self.chain_store = chain_store
+        self.tip_height = None
         print(f"Initialized MoneroNodeVisualization with RPC URL: {rpc_url}")
-        # Run a startup check
-        status = self.check_rpc_connections()
-        for method, success in status.items():
-            print(f"Initial RPC check - {method}: {'✅' if success else '❌'}")
+        # Long-lived clients (see NodeRegistry) leave health checks to the registry
+        if check_on_init:
+            status = self.check_rpc_connections()
+            for method, success in status.items():
+                print(f"Initial RPC check - {method}: {'✅' if success else '❌'}")
     
+    def _fresh_chain_store(self):
+        """The attached ChainStore if it is within CHAIN_STORE_MAX_LAG blocks of the last seen tip"""
+        if self.chain_store is None:
+            return None
+        tip = self.chain_store.tip()
+        if tip is None or (self.tip_height is not None and tip[0] < self.tip_height - CHAIN_STORE_MAX_LAG):
+            return None
+        return self.chain_store
+
     def _format_timestamp(self, timestamp):
         """Format timestamp as a readable date"""
         if not timestamp:
             return 'Pending'
         return datetime.utcfromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S UTC')
 
-    def _make_rpc_call(self, method, params=None):
+    def _make_rpc_call(self, method, params=None, timeout=None):
         """Make RPC call to Monero daemon with visible feedback"""
         payload = {
             "jsonrpc": "2.0",
@@ -30,12 +88,14 @@ class MoneroNodeVisualization:
             
         try:
             print(f"➡️ Making RPC call: {method} to {self.rpc_url}/json_rpc")
-            response = requests.post(self.rpc_url + "/json_rpc", json=payload, timeout=10)
+            response = self.session.post("json_rpc", payload, timeout=timeout)
             
             if response.status_code == 200:
                 result = response.json()
                 if "result" in result:
                     print(f"✅ RPC call successful: {method}")
+                    if method == "get_info":
+                        self._note_tip(result["result"].get("height", 0) - 1)
                     return result
                 else:
                     error_msg = result.get("error", {}).get("message", "Unknown error")
@@ -51,13 +111,18 @@ class MoneroNodeVisualization:
             print(f"❌ RPC call exception ({method}): {str(e)}")
             return {"error": str(e)}
     
-    def _make_non_json_rpc_call(self, endpoint, params=None):
+    def _note_tip(self, tip_height):
+        """Remember the daemon's tip height and let the cache react to reorgs"""
+        self.tip_height = tip_height
+        if self.cache:
+            self.cache.note_tip(tip_height)
+
+    def _make_non_json_rpc_call(self, endpoint, params=None, timeout=None):
         """Make RPC call to non-JSON RPC endpoints with visible feedback"""
         try:
             print(f"➡️ Making non-JSON RPC call: {endpoint} to {self.rpc_url}/{endpoint}")
-            # Add proper Content-Type header
-            headers = {'Content-Type': 'application/json'}
-            response = requests.post(self.rpc_url + "/" + endpoint, json=params, headers=headers, timeout=10)
+            # Session already sends the JSON Content-Type header
+            response = self.session.post(endpoint, params, timeout=timeout)
             
             if response.status_code == 200:
                 result = response.json()
@@ -102,8 +167,7 @@ class MoneroNodeVisualization:
         # Test get_transactions (might not work without valid tx hashes)
         try:
             print(f"➡️ Testing non-JSON endpoint: get_transactions to {self.rpc_url}/get_transactions")
-            headers = {'Content-Type': 'application/json'}
-            response = requests.post(self.rpc_url + "/get_transactions", json={"txs_hashes":[]}, headers=headers, timeout=10)
+            response = self.session.post("get_transactions", {"txs_hashes":[]})
             if response.status_code == 200:
                 print(f"✅ RPC endpoint check successful: get_transactions")
                 checks["get_transactions"] = True
@@ -133,10 +197,10 @@ class MoneroNodeVisualization:
         start_height = max(0, height - max_blocks)
         
         print(f"Fetching blocks from height {start_height} to {height}...")
+        fetched = self.get_blocks_by_heights(list(range(start_height, height)))
         for h in range(start_height, height):
-            block_data = self.get_block_by_height(h)
-            if "error" not in block_data:
-                blocks.append(block_data)
+            if "error" not in fetched[h]:
+                blocks.append(fetched[h])
         
         mempool_info = self._make_rpc_call("get_transaction_pool")
         
@@ -148,6 +212,11 @@ class MoneroNodeVisualization:
     
     def get_block_by_height(self, height):
         """Get block data by height"""
+        if self.cache:
+            cached = self.cache.get_block(height=height)
+            if cached:
+                return cached
+        
         result = self._make_rpc_call("get_block", {"height": height})
         
         if "result" in result:
@@ -160,12 +229,20 @@ class MoneroNodeVisualization:
             
             block_data["height"] = height
             
+            if self.cache:
+                self.cache.put_block(block_data)
+            
             return block_data
         
         return {"error": "Failed to get block", "details": result}
     
     def get_block_by_hash(self, block_hash):
         """Get block data by hash"""
+        if self.cache:
+            cached = self.cache.get_block(block_hash=block_hash)
+            if cached:
+                return cached
+        
         result = self._make_rpc_call("get_block", {"hash": block_hash})
         
         if "result" in result:
@@ -176,16 +253,99 @@ class MoneroNodeVisualization:
                     block_data["block_header"]["timestamp"]
                 )
             
+            if self.cache:
+                self.cache.put_block(block_data)
+            
             return block_data
         
         return {"error": "Failed to get block", "details": result}
+
+    def get_block_headers_range(self, start_height, end_height):
+        """Get block headers for heights start_height..end_height (inclusive) in chunked range calls"""
+        cached = self.cache.get_headers(start_height, end_height) if self.cache else {}
+        missing = [h for h in range(start_height, end_height + 1) if h not in cached]
+        if not missing:
+            return {"headers": [cached[h] for h in range(start_height, end_height + 1)]}
+        
+        # One range spanning all missing heights (usually just the unconfirmed tip)
+        headers = []
+        for chunk_start in range(missing[0], missing[-1] + 1, HEADERS_RANGE_CHUNK):
+            chunk_end = min(chunk_start + HEADERS_RANGE_CHUNK - 1, missing[-1])
+            result = self._make_rpc_call("get_block_headers_range", {
+                "start_height": chunk_start,
+                "end_height": chunk_end
+            })
+            if "result" not in result:
+                return {"error": "Failed to get block headers", "details": result}
+            headers.extend(result["result"].get("headers", []))
+
+        for header in headers:
+            if "timestamp" in header:
+                header["timestamp_formatted"] = self._format_timestamp(header["timestamp"])
+
+        if self.cache:
+            self.cache.put_headers(headers)
+            for header in headers:
+                cached[header["height"]] = header
+            headers = [cached[h] for h in range(start_height, end_height + 1) if h in cached]
+
+        return {"headers": headers}
+
+    def get_block_timestamps(self, heights):
+        """Map heights to block timestamps, from the height index where it covers them"""
+        heights = set(heights)
+        timestamps = {}
+        if self.height_index is not None:
+            for h in heights:
+                timestamp = self.height_index.timestamp(h)
+                if timestamp is not None:
+                    timestamps[h] = timestamp
+
+        missing = sorted(heights - timestamps.keys())
+        if not missing:
+            return timestamps
+
+        # Ring members are spread over the whole chain: fetch runs of nearby heights, not one
+        # range from the lowest to the highest, which could be hundreds of thousands of headers
+        runs = [[missing[0], missing[0]]]
+        for h in missing[1:]:
+            if h - runs[-1][1] <= TIMESTAMP_RUN_GAP:
+                runs[-1][1] = h
+            else:
+                runs.append([h, h])
+        with ThreadPoolExecutor(max_workers=min(BLOCK_FETCH_WORKERS, len(runs))) as pool:
+            results = list(pool.map(lambda run: self.get_block_headers_range(*run), runs))
+        wanted = set(missing)
+        for result in results:
+            if "error" in result:
+                continue
+            for header in result["headers"]:
+                if header["height"] in wanted:
+                    timestamps[header["height"]] = header["timestamp"]
+        return timestamps
+
+    def get_blocks_by_heights(self, heights):
+        """Get full blocks for many heights concurrently, returned as {height: block_data}"""
+        if not heights:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(BLOCK_FETCH_WORKERS, len(heights))) as pool:
+            blocks = list(pool.map(self.get_block_by_height, heights))
+        return dict(zip(heights, blocks))
     
     def get_transactions(self, tx_hashes, decode_as_json=True):
         """Get transaction data by hash"""
-        # Format parameters exactly as in the working curl command
+        # Only decoded transactions are cached
+        cached = self.cache.get_txs(tx_hashes) if self.cache and decode_as_json else {}
+        missing = [tx_hash for tx_hash in tx_hashes if tx_hash not in cached]
+        if not missing:
+            return {"txs": [cached[tx_hash] for tx_hash in tx_hashes], "status": "OK"}
+        
+        # Pruned blobs are a fraction of monerod's JSON and cost it no encoding work
+        decode_locally = decode_as_json and DECODE_TX_BLOBS
         params = {
-            "txs_hashes": tx_hashes,
-            "decode_as_json": decode_as_json
+            "txs_hashes": missing,
+            "decode_as_json": decode_as_json and not decode_locally,
+            "prune": decode_locally
         }
         
         print(f"Requesting transactions with params: {json.dumps(params)}")
@@ -193,17 +353,51 @@ class MoneroNodeVisualization:
         
         if "txs" in result:
             if decode_as_json:
-                for tx in result["txs"]:
-                    if "tx_json" in tx and isinstance(tx["tx_json"], str):
-                        try:
-                            tx["tx_json"] = json.loads(tx["tx_json"])
-                        except json.JSONDecodeError:
-                            print(f"Failed to parse tx_json: {tx['tx_json'][:100]}...")
+                undecoded = self._decode_tx_entries(result["txs"])
+                if undecoded:
+                    # Layouts the local decoder does not know are left to monerod
+                    retry = self._make_non_json_rpc_call("get_transactions", {"txs_hashes": undecoded, "decode_as_json": True})
+                    replacements = {tx["tx_hash"]: tx for tx in retry.get("txs", [])}
+                    self._decode_tx_entries(replacements.values())
+                    failed = [tx_hash for tx_hash in undecoded if "tx_json" not in replacements.get(tx_hash, {})]
+                    if failed:
+                        print(f"Failed to decode transactions {failed}. Response: {json.dumps(retry, indent=2)}")
+                        return {"error": "Failed to decode transactions", "tx_hashes": failed, "details": retry}
+                    result["txs"] = [replacements.get(tx["tx_hash"], tx) for tx in result["txs"]]
+                if self.cache:
+                    self.cache.put_txs(result["txs"], self.tip_height)
+            if cached:
+                fetched = {tx["tx_hash"]: tx for tx in result["txs"]}
+                fetched.update(cached)
+                result["txs"] = [fetched[tx_hash] for tx_hash in tx_hashes if tx_hash in fetched]
             return result
         
         print(f"Failed to get transaction data. Response: {json.dumps(result, indent=2)}")
         return {"error": "Failed to get transactions", "details": result}
     
+    @staticmethod
+    def _decode_tx_entries(txs):
+        """Attach a parsed tx_json to get_transactions entries; returns hashes that could not be decoded"""
+        undecoded = []
+        for tx in txs:
+            # monerod returns the decoded transaction as a JSON string in as_json
+            if "tx_json" not in tx and tx.get("as_json"):
+                tx["tx_json"] = tx["as_json"]
+            if isinstance(tx.get("tx_json"), str):
+                try:
+                    tx["tx_json"] = json.loads(tx["tx_json"])
+                except json.JSONDecodeError:
+                    print(f"Failed to parse tx_json: {tx['tx_json'][:100]}...")
+                continue
+            if "tx_json" in tx:
+                continue
+            try:
+                tx["tx_json"] = parse_transaction(bytes.fromhex(tx.get("pruned_as_hex") or tx["as_hex"]))
+            except (BlobDecodeError, IndexError, KeyError, ValueError) as e:
+                print(f"Failed to decode transaction blob {tx.get('tx_hash')}: {str(e)}")
+                undecoded.append(tx.get("tx_hash"))
+        return undecoded
+
     def get_transaction(self, tx_hash, decode_as_json=True):
         """Get single transaction data by hash"""
         result = self.get_transactions([tx_hash], decode_as_json)
@@ -220,9 +414,16 @@ class MoneroNodeVisualization:
         if "error" in block:
             return block
         
+        transactions_result = None
         if "tx_hashes" in block and block["tx_hashes"]:
             transactions_result = self.get_transactions(block["tx_hashes"])
-            
+        
+        return self._attach_block_transactions(block, transactions_result)
+    
+    @staticmethod
+    def _attach_block_transactions(block, transactions_result):
+        """Merge a get_transactions result and the miner tx into a fetched block"""
+        if transactions_result is not None:
             if "txs" in transactions_result:
                 block["transactions"] = transactions_result["txs"]
             else:
@@ -281,6 +482,10 @@ class MoneroNodeVisualization:
     
     def analyze_block_data(self, num_blocks=100):
         """Analyze recent blocks to extract visualization data"""
+        store = self._fresh_chain_store()
+        if store is not None:
+            return self._analyze_stored_blocks(store, num_blocks)
+
         info = self._make_rpc_call("get_info")
         if "result" not in info:
             return {"error": "Failed to get blockchain info"}
@@ -294,32 +499,34 @@ class MoneroNodeVisualization:
         timestamps = []
         fees = []
         
-        for h in range(start_height, height):
-            block = self.get_block_by_height(h)
-            if "error" in block:
-                continue
+        # Everything charted here is in the headers, so no full blocks are needed
+        headers_result = self.get_block_headers_range(start_height, height - 1) if height > start_height else {"headers": []}
+        if "error" in headers_result:
+            return {"error": headers_result["error"]}
+        
+        for header in headers_result["headers"]:
+            h = header["height"]
             
             block_sizes.append({
                 "height": h,
-                "size": block.get("block_size", 0)
+                "size": header.get("block_size", 0)
             })
             
             difficulties.append({
                 "height": h,
-                "difficulty": block.get("difficulty", 0)
+                "difficulty": header.get("difficulty", 0)
             })
             
-            tx_count = len(block.get("tx_hashes", []))
             tx_counts.append({
                 "height": h,
-                "count": tx_count
+                "count": header.get("num_txes", 0)
             })
             
-            if "block_header" in block and "timestamp" in block["block_header"]:
+            if "timestamp" in header:
                 timestamps.append({
                     "height": h,
-                    "timestamp": block["block_header"]["timestamp"],
-                    "formatted": self._format_timestamp(block["block_header"]["timestamp"])
+                    "timestamp": header["timestamp"],
+                    "formatted": header["timestamp_formatted"]
                 })
         
         return {
@@ -330,126 +537,240 @@ class MoneroNodeVisualization:
             "timestamps": timestamps,
             "fees": fees
         }
+
+    def _analyze_stored_blocks(self, store, num_blocks):
+        """analyze_block_data from the local chain store, which also knows per-block fees"""
+        rows = store.block_stats(num_blocks)
+        return {
+            "height_range": {"start": rows[0][0], "end": rows[-1][0]},
+            "block_sizes": [{"height": h, "size": size or 0} for h, _, size, _, _, _ in rows],
+            "difficulties": [{"height": h, "difficulty": difficulty or 0} for h, _, _, difficulty, _, _ in rows],
+            "tx_counts": [{"height": h, "count": count} for h, _, _, _, count, _ in rows],
+            "timestamps": [
+                {"height": h, "timestamp": ts, "formatted": self._format_timestamp(ts)}
+                for h, ts, _, _, _, _ in rows
+            ],
+            "fees": [{"height": h, "fees": fees} for h, _, _, _, _, fees in rows],
+        }
         
     
     # API compatibility methods with new names
     
-    def visualize_transaction(self, tx_hash, graph_depth=1, include_rings=True):
-        """Visualize transaction with RPC data"""
-        result = {
-            "nodes": [],
-            "links": [],
-            "transaction": None,
-            "error": None
-        }
-        
+    def visualize_transaction(self, tx_hash, graph_depth=1, include_rings=True,
+                              max_nodes=DEFAULT_MAX_NODES, max_edges=DEFAULT_MAX_EDGES, ring_references=None,
+                              as_graph=False):
+        """Visualize transaction with RPC data
+
+        With graph_depth > 1 the graph is expanded hop by hop through ring members
+        (and, given a ring reference index, forward to referencing transactions). The
+        attached chain store serves as that index unless another is passed.
+        With as_graph the compact Graph is returned instead of its dict form.
+        """
         try:
+            if graph_depth > 1:
+                expander = GraphExpander(self, graph_depth, max_nodes, max_edges, ring_references or self.chain_store)
+                return expander.expand(tx_hash, as_graph)
+
             tx_data = self.get_transaction(tx_hash)
             if "error" in tx_data:
                 return {"error": tx_data["error"]}
             
-            tx_node = {
-                "id": tx_hash,
-                "type": "transaction",
-                "data": tx_data
-            }
-            result["nodes"].append(tx_node)
-            result["transaction"] = tx_data
-            
-            if "tx_json" in tx_data:
-                tx_json = tx_data["tx_json"]
-                
-                # Process inputs
-                if "vin" in tx_json:
-                    for idx, vin in enumerate(tx_json["vin"]):
-                        if "key" in vin:
-                            input_id = f"{tx_hash}_in_{idx}"
-                            input_node = {
-                                "id": input_id,
-                                "type": "input",
-                                "data": vin
-                            }
-                            result["nodes"].append(input_node)
-                            
-                            result["links"].append({
-                                "source": input_id,
-                                "target": tx_hash,
-                                "type": "input"
-                            })
-                            
-                            if include_rings and "key_offsets" in vin["key"]:
-                                for ring_idx, offset in enumerate(vin["key"]["key_offsets"]):
-                                    ring_id = f"{input_id}_ring_{ring_idx}"
-                                    ring_node = {
-                                        "id": ring_id,
-                                        "type": "ring_member",
-                                        "data": {
-                                            "offset": offset,
-                                            "key_image": vin["key"].get("k_image", "")
-                                        }
-                                    }
-                                    result["nodes"].append(ring_node)
-                                    
-                                    result["links"].append({
-                                        "source": ring_id,
-                                        "target": input_id,
-                                        "type": "ring_member"
-                                    })
-                
-                # Process outputs
-                if "vout" in tx_json:
-                    for idx, vout in enumerate(tx_json["vout"]):
-                        if "target" in vout and "key" in vout["target"]:
-                            output_id = f"{tx_hash}_out_{idx}"
-                            output_node = {
-                                "id": output_id,
-                                "type": "output",
-                                "data": {
-                                    "key": vout["target"]["key"],
-                                    "amount": vout.get("amount", 0)
-                                }
-                            }
-                            result["nodes"].append(output_node)
-                            
-                            result["links"].append({
-                                "source": tx_hash,
-                                "target": output_id,
-                                "type": "output"
-                            })
-            
-            # Get block info
+            block_data = None
             if "block_height" in tx_data:
-                block_height = tx_data["block_height"]
-                block_data = self.get_block_by_height(block_height)
-                
-                if "error" not in block_data:
-                    block_id = str(block_height)
-                    block_node = {
-                        "id": block_id,
-                        "type": "block",
-                        "data": block_data
-                    }
-                    result["nodes"].append(block_node)
-                    
-                    result["links"].append({
-                        "source": block_id,
-                        "target": tx_hash,
-                        "type": "contains"
-                    })
+                block_data = self.get_block_by_height(tx_data["block_height"])
             
-            return result
+            ring_origins = self.get_ring_member_origins(tx_data.get("tx_json", {})) if include_rings else None
+            return self._build_transaction_graph(tx_hash, tx_data, block_data, include_rings, ring_origins, as_graph)
         except Exception as e:
             return {"error": str(e)}
 
-    def visualize_block(self, height):
-        """Visualize block with RPC data"""
-        result = {
-            "nodes": [],
-            "links": [],
-            "block": None,
-            "error": None
-        }
-        
+    def stream_transaction_graph(self, tx_hash, graph_depth=1, include_rings=True,
+                                 max_nodes=DEFAULT_MAX_NODES, max_edges=DEFAULT_MAX_EDGES, ring_references=None):
+        """Yield the events of visualize_transaction's graph; multi-hop graphs arrive level by level"""
+        if graph_depth > 1:
+            yield from GraphExpander(self, graph_depth, max_nodes, max_edges, ring_references or self.chain_store).iter_expand(tx_hash)
+            return
+
+        tx_data = self.get_transaction(tx_hash)
+        if "error" in tx_data:
+            yield "error", {"error": tx_data["error"]}
+            return
+        block_data = self.get_block_by_height(tx_data["block_height"]) if "block_height" in tx_data else None
+        ring_origins = self.get_ring_member_origins(tx_data.get("tx_json", {})) if include_rings else None
+        graph = Graph()
+        self._add_transaction_graph(graph, tx_hash, tx_data, block_data, include_rings, ring_origins)
+        yield from graph.events()
+
+    def get_graph_node_detail(self, node_id):
+        """Full {"id", "type", "data"} for a node id from a (compact) graph"""
+        match = TX_NODE_ID.match(node_id)
+        if match:
+            tx_data = self.get_transaction(node_id)
+            return tx_data if "error" in tx_data else {"id": node_id, "type": "transaction", "data": tx_data}
+
+        if node_id.isdigit():
+            block_data = self.get_block_by_height(int(node_id))
+            return block_data if "error" in block_data else {"id": node_id, "type": "block", "data": block_data}
+
+        match = MINER_TX_NODE_ID.match(node_id)
+        if match:
+            block_data = self._attach_block_transactions(self.get_block_by_height(int(match.group(1))), None)
+            if "miner_transaction" not in block_data:
+                return {"error": "Miner transaction not found"}
+            return {"id": node_id, "type": "transaction", "subtype": "miner", "data": block_data["miner_transaction"]}
+
+        match = GLOBAL_OUTPUT_NODE_ID.match(node_id)
+        if match:
+            amount, global_index = int(match.group(1) or 0), int(match.group(2))
+            origin = self.resolve_ring_members({(amount, global_index)}).get((amount, global_index))
+            if origin is None:
+                return {"error": "Output not found"}
+            return {"id": node_id, "type": "output",
+                    "data": {"amount": amount, "global_index": global_index, "origin": origin}}
+
+        for pattern in (RING_NODE_ID, INPUT_NODE_ID, OUTPUT_NODE_ID):
+            match = pattern.match(node_id)
+            if match:
+                tx_data = self.get_transaction(match.group(1))
+                if "error" in tx_data:
+                    return tx_data
+                # Rebuild the transaction's graph and pick the node; cheap once the tx is cached
+                ring_origins = self.get_ring_member_origins(tx_data.get("tx_json", {})) if pattern is RING_NODE_ID else None
+                graph = Graph()
+                self._add_transaction_graph(graph, match.group(1), tx_data, None, True, ring_origins)
+                node = graph.get(node_id)
+                return node.to_dict() if node is not None else {"error": "Node not found"}
+
+        return {"error": "Unknown node id"}
+
+    def get_ring_member_origins(self, tx_json):
+        """Map every ring member, as (amount, global_index), to its origin output
+
+        Served from the output index where it covers the member; the rest are
+        resolved with get_outs (without vout, which get_outs does not return).
+        """
+        return self.resolve_ring_members(self._ring_members(tx_json))
+
+    def resolve_ring_members(self, members):
+        """{(amount, global_index): origin} for the resolvable members, in GET_OUTS_BATCH calls"""
+        origins, missing = self._indexed_origins(self.output_index, members)
+        for i in range(0, len(missing), GET_OUTS_BATCH):
+            batch = missing[i:i + GET_OUTS_BATCH]
+            result = self._make_non_json_rpc_call("get_outs", self._get_outs_params(batch))
+            origins.update(self._origins_from_outs(batch, result.get("outs", [])))
+        return origins
+
+    @staticmethod
+    def _ring_members(tx_json):
+        """(amount, global_index) of every ring member in a decoded transaction
+
+        Global indices count per amount: RingCT inputs (amount 0) index the RingCT
+        outputs, pre-RingCT inputs index the outputs of their own amount.
+        """
+        members = set()
+        for vin in tx_json.get("vin", []):
+            if "key" in vin:
+                amount = vin["key"].get("amount", 0)
+                global_index = 0
+                # key_offsets are relative; each one is added to the previous index
+                for offset in vin["key"].get("key_offsets", []):
+                    global_index += offset
+                    members.add((amount, global_index))
+        return members
+
+    @staticmethod
+    def _indexed_origins(output_index, members):
+        """Origins the output index has (it covers RingCT outputs only) and the sorted members it lacks"""
+        origins = {}
+        if output_index is not None:
+            indexed = output_index.get_many(index for amount, index in members if amount == 0)
+            origins = {(0, index): origin for index, origin in indexed.items()}
+        return origins, sorted(set(members) - origins.keys())
+
+    @staticmethod
+    def _get_outs_params(members):
+        return {"outputs": [{"amount": amount, "index": index} for amount, index in members], "get_txid": True}
+
+    @staticmethod
+    def _origins_from_outs(members, outs):
+        origins = {}
+        for (amount, global_index), out in zip(members, outs):
+            if out.get("height") is None or not out.get("key"):
+                continue
+            origins[(amount, global_index)] = {
+                "global_index": global_index,
+                "height": out["height"],
+                "txid": out.get("txid", ""),
+                "vout": None,
+                "key": out["key"],
+                "mask": out.get("mask", ""),
+            }
+        return origins
+
+    @staticmethod
+    def _build_transaction_graph(tx_hash, tx_data, block_data, include_rings=True, ring_origins=None, as_graph=False):
+        """Build the nodes/links graph for a fetched transaction and its block (the Graph itself if as_graph)"""
+        graph = Graph(transaction=tx_data, error=None)
+        MoneroNodeVisualization._add_transaction_graph(graph, tx_hash, tx_data, block_data, include_rings, ring_origins)
+        return graph if as_graph else graph.to_dict()
+
+    @staticmethod
+    def _add_transaction_graph(graph, tx_hash, tx_data, block_data, include_rings=True, ring_origins=None):
+        """Add a fetched transaction, its inputs, ring members, outputs and block to a Graph
+
+        `ring_origins` maps (amount, global_index) to origin outputs and labels the ring members.
+        """
+        ring_origins = ring_origins or {}
+        tx_slot = graph.add(GraphNode(tx_hash, "transaction", tx_data))
+        tx_json = tx_data.get("tx_json", {})
+
+        for idx, vin in enumerate(tx_json.get("vin", [])):
+            if "key" not in vin:
+                continue
+            key = vin["key"]
+            input_id = f"{tx_hash}_in_{idx}"
+            input_slot = graph.add(GraphNode(input_id, "input", vin))
+            graph.link(input_slot, tx_slot, "input")
+
+            if include_rings and "key_offsets" in key:
+                graph.link(graph.add(RingMembers(input_id, key, ring_origins)), input_slot, "ring_member")
+
+        for idx, vout in enumerate(tx_json.get("vout", [])):
+            if "key" in vout.get("target", {}):
+                output_slot = graph.add(OutputNode(f"{tx_hash}_out_{idx}", vout))
+                graph.link(tx_slot, output_slot, "output")
+
+        if block_data is not None and "error" not in block_data:
+            block_slot = graph.add(GraphNode(str(tx_data["block_height"]), "block", block_data))
+            graph.link(block_slot, tx_slot, "contains")
+
+    def stream_block_graph(self, height):
+        """Yield the events of visualize_block's graph, fetching the block's transactions chunk by chunk
+
+        The block and miner transaction go out first and each chunk of transactions is
+        emitted as soon as it arrives, so the whole block is never held at once.
+        """
+        block = self.get_block_by_height(height)
+        if "error" in block:
+            yield "error", {"error": block["error"]}
+            return
+        graph = Graph()
+        self._add_block_graph(graph, height, self._attach_block_transactions(block, None))
+        yield from graph.events()
+
+        tx_hashes = block.get("tx_hashes") or []
+        for i in range(0, len(tx_hashes), GRAPH_STREAM_CHUNK):
+            result = self.get_transactions(tx_hashes[i:i + GRAPH_STREAM_CHUNK])
+            if "error" in result:
+                yield "error", {"error": result["error"]}
+                return
+            chunk = Graph()
+            self._add_block_graph(chunk, height, {"transactions": result["txs"]})
+            # Slot 0 is the block node, which already went out
+            yield from chunk.events((1, 0))
+
+    def visualize_block(self, height, as_graph=False):
+        """Visualize block with RPC data (the compact Graph with as_graph)"""
         try:
             if isinstance(height, str):
                 if height.isdigit():
@@ -461,62 +782,41 @@ class MoneroNodeVisualization:
             if "error" in block_data:
                 return {"error": block_data["error"]}
             
-            result["block"] = block_data
-            
-            block_id = str(height)
-            block_node = {
-                "id": block_id,
-                "type": "block",
-                "data": block_data
-            }
-            result["nodes"].append(block_node)
-            
-            # Process miner transaction
-            if "miner_transaction" in block_data:
-                miner_tx = block_data["miner_transaction"]
-                miner_tx_id = miner_tx.get("tx_hash", f"miner_tx_{height}")
-                
-                miner_tx_node = {
-                    "id": miner_tx_id,
-                    "type": "transaction",
-                    "subtype": "miner",
-                    "data": miner_tx
-                }
-                result["nodes"].append(miner_tx_node)
-                
-                result["links"].append({
-                    "source": block_id,
-                    "target": miner_tx_id,
-                    "type": "contains",
-                    "subtype": "miner"
-                })
-            
-            # Process regular transactions
-            if "transactions" in block_data:
-                for tx in block_data["transactions"]:
-                    tx_hash = tx.get("tx_hash", "")
-                    if not tx_hash:
-                        continue
-                    
-                    tx_node = {
-                        "id": tx_hash,
-                        "type": "transaction",
-                        "data": tx
-                    }
-                    result["nodes"].append(tx_node)
-                    
-                    result["links"].append({
-                        "source": block_id,
-                        "target": tx_hash,
-                        "type": "contains"
-                    })
-            
-            return result
+            return self._build_block_graph(height, block_data, as_graph)
         except Exception as e:
             return {"error": str(e)}
 
-    def get_blockchain_summary(self):
+    @staticmethod
+    def _build_block_graph(height, block_data, as_graph=False):
+        """Build the nodes/links graph for a block fetched with its transactions (the Graph itself if as_graph)"""
+        graph = Graph(block=block_data, error=None)
+        MoneroNodeVisualization._add_block_graph(graph, height, block_data)
+        return graph if as_graph else graph.to_dict()
+
+    @staticmethod
+    def _add_block_graph(graph, height, block_data):
+        """Add a block and the transactions fetched with it to a Graph; the block node is added once"""
+        block_slot = graph.add(GraphNode(str(height), "block", block_data))
+
+        if "miner_transaction" in block_data:
+            miner_tx = block_data["miner_transaction"]
+            miner_tx_id = miner_tx.get("tx_hash", f"miner_tx_{height}")
+            miner_slot = graph.add(GraphNode(miner_tx_id, "transaction", miner_tx, subtype="miner"))
+            graph.link(block_slot, miner_slot, "contains", "miner")
+
+        for tx in block_data.get("transactions", []):
+            tx_hash = tx.get("tx_hash", "")
+            if not tx_hash:
+                continue
+            tx_slot = graph.add(GraphNode(tx_hash, "transaction", tx))
+            graph.link(block_slot, tx_slot, "contains")
+
+    def get_blockchain_summary(self, max_blocks=100):
         """Get blockchain summary for visualization interface"""
+        store = self._fresh_chain_store()
+        if store is not None:
+            return store.blockchain_summary(max_blocks)
+
         info_result = self._make_rpc_call("get_info")
         if "result" not in info_result:
             return {"error": "Failed to get blockchain info"}
@@ -524,38 +824,48 @@ class MoneroNodeVisualization:
         blockchain_info = info_result["result"]
         height = blockchain_info["height"]
         
-        max_blocks = 100
         blocks = []
         transactions = []
         
         start_height = max(0, height - max_blocks)
-        
-        for h in range(start_height, height):
-            block_data = self.get_block_by_height(h)
+        if start_height >= height:
+            return {'blocks': blocks, 'transactions': transactions}
+        
+        headers_result = self.get_block_headers_range(start_height, height - 1)
+        if "error" in headers_result:
+            return {"error": headers_result["error"]}
+        headers = headers_result["headers"]
+        
+        # Tx hashes are only in full blocks, so fetch just the blocks that have any
+        full_blocks = self.get_blocks_by_heights([hdr["height"] for hdr in headers if hdr.get("num_txes", 0) > 0])
+        
+        for header in headers:
+            h = header["height"]
+            block = {
+                'height': h,
+                'hash': header.get("hash", ""),
+                'timestamp': header.get("timestamp_formatted", "Unknown"),
+                'difficulty': header.get("difficulty", 0)
+            }
+            blocks.append(block)
             
-            if "error" not in block_data:
-                block = {
-                    'height': h,
-                    'hash': block_data.get("hash", ""),
-                    'timestamp': block_data.get("block_header", {}).get("timestamp_formatted", "Unknown"),
-                    'difficulty': block_data.get("difficulty", 0)
+            block_data = full_blocks.get(h, {})
+            for tx_hash in block_data.get("tx_hashes", []):
+                tx = {
+                    'hash': tx_hash,
+                    'block_height': h
                 }
-                blocks.append(block)
-                
-                if "tx_hashes" in block_data:
-                    for tx_hash in block_data["tx_hashes"]:
-                        tx = {
-                            'hash': tx_hash,
-                            'block_height': h
-                        }
-                        transactions.append(tx)
+                transactions.append(tx)
         
         return {
             'blocks': blocks,
             'transactions': transactions
         }
         
+    def process_data_mdb_direct(self, file_path=None):
+        """Summarize the chain; over RPC the daemon's own database is used and file_path is ignored"""
+        return self.get_blockchain_summary()
+        
     # For backward compatibility with existing app.py
     process_data_mdb_for_transaction = visualize_transaction
     process_data_mdb_for_block = visualize_block
-    process_data_mdb_direct = get_blockchain_summary
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Global RingCT output index → origin (height, txid, vout, key, commitment) table.
+
+Usage:
+    python -m experimental.output_index [--daemon URL] [--path FILE]
+
+The table is built by a sequential get_outs scan over every confirmed RingCT
+output and stored as fixed-width records in global-index order, so resolving a
+ring member is one offset into a memory-mapped file.
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import threading
+
+from experimental.block_cache import REORG_SAFE_DEPTH
+from experimental.node_visualization import MoneroNodeVisualization
+from experimental.output_resolver import GET_OUTS_BATCH
+
+DAEMON = "http://127.0.0.1:18081"
+
+# height, origin txid, vout, one-time key, commitment
+RECORD = struct.Struct("<Q32sI32s32s")
+
+
+class OutputIndex:
+    """Memory-mapped table of every RingCT output, addressed by global output index
+
+    Only outputs at least REORG_SAFE_DEPTH blocks deep are indexed, so records never
+    need rewriting; `sync` appends whatever became final since the last run.
+    """
+
+    def __init__(self, path="output_index.bin"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mapping = None
+        if not os.path.exists(path):
+            open(path, "wb").close()
+        self._remap()
+
+    def __len__(self):
+        mapping = self._mapping
+        return len(mapping) // RECORD.size if mapping is not None else 0
+
+    def get(self, global_index):
+        """Origin of one output as a dict, or None when the index does not cover it"""
+        mapping = self._mapping
+        if mapping is None or not 0 <= global_index < len(mapping) // RECORD.size:
+            return None
+        height, txid, vout, key, mask = RECORD.unpack_from(mapping, global_index * RECORD.size)
+        return {
+            "global_index": global_index,
+            "height": height,
+            "txid": txid.hex(),
+            "vout": vout,
+            "key": key.hex(),
+            "mask": mask.hex(),
+        }
+
+    def get_many(self, global_indices):
+        """{global_index: origin} for every covered index"""
+        origins = {}
+        for global_index in global_indices:
+            origin = self.get(global_index)
+            if origin is not None:
+                origins[global_index] = origin
+        return origins
+
+    def sync(self, node, batch_size=GET_OUTS_BATCH):
+        """Append every output that became final since the last sync; returns {"outputs", "added"} or {"error"}"""
+        total = self._final_output_count(node)
+        if "error" in total:
+            return total
+        total = total["count"]
+
+        with self._lock:
+            start = len(self)
+            # Drop a partial record left by an interrupted sync so appends stay aligned
+            if os.path.getsize(self.path) != start * RECORD.size:
+                os.truncate(self.path, start * RECORD.size)
+            # vout is the position inside the origin tx's run of consecutive indices
+            last = self.get(start - 1) if start else None
+            prev_txid, prev_vout = (last["txid"], last["vout"]) if last else (None, -1)
+
+            for batch_start in range(start, total, batch_size):
+                batch = list(range(batch_start, min(batch_start + batch_size, total)))
+                result = node._make_non_json_rpc_call("get_outs", {
+                    "outputs": [{"amount": 0, "index": index} for index in batch],
+                    "get_txid": True
+                })
+                outs = result.get("outs", [])
+                if len(outs) != len(batch):
+                    return {"error": f"get_outs failed at output {batch_start}", "details": result}
+
+                records = bytearray()
+                for out in outs:
+                    txid = out.get("txid", "")
+                    vout = prev_vout + 1 if txid == prev_txid else 0
+                    prev_txid, prev_vout = txid, vout
+                    records += RECORD.pack(out["height"], bytes.fromhex(txid), vout,
+                                           bytes.fromhex(out["key"]), bytes.fromhex(out["mask"]))
+                with open(self.path, "ab") as f:
+                    f.write(records)
+                self._remap()
+                print(f"📇 Output index at {len(self)}/{total}")
+
+        return {"outputs": len(self), "added": len(self) - start}
+
+    @staticmethod
+    def _final_output_count(node):
+        """Number of RingCT outputs in blocks at least REORG_SAFE_DEPTH deep"""
+        info = node._make_rpc_call("get_info")
+        if "result" not in info:
+            return {"error": "Failed to get blockchain info"}
+        final_height = info["result"]["height"] - 1 - REORG_SAFE_DEPTH
+        if final_height < 0:
+            return {"count": 0}
+
+        height_index = getattr(node, "height_index", None)
+        if height_index is not None and height_index.cumulative_outputs(final_height) is not None:
+            return {"count": height_index.cumulative_outputs(final_height)}
+
+        result = node._make_rpc_call("get_output_distribution", {
+            "amounts": [0],
+            "from_height": final_height,
+            "to_height": final_height,
+            "cumulative": True,
+            "binary": False
+        })
+        distributions = result.get("result", {}).get("distributions")
+        if not distributions or not distributions[0]["distribution"]:
+            return {"error": "Failed to get output distribution", "details": result}
+        return {"count": distributions[0]["distribution"][-1]}
+
+    def _remap(self):
+        size = os.path.getsize(self.path)
+        size -= size % RECORD.size
+        mapping = None
+        if size:
+            with open(self.path, "rb") as f:
+                mapping = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+        # Readers holding the old mapping keep it alive until they finish
+        self._mapping = mapping
+
+    def close(self):
+        self._mapping = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or extend the global output index")
+    parser.add_argument("--daemon", default=DAEMON)
+    parser.add_argument("--path", default="output_index.bin")
+    parser.add_argument("--batch-size", type=int, default=GET_OUTS_BATCH)
+    args = parser.parse_args()
+
+    index = OutputIndex(args.path)
+    result = index.sync(MoneroNodeVisualization(args.daemon), args.batch_size)
+    if "error" in result:
+        raise SystemExit(f"[!] Sync failed: {result['error']}")
+    print(f"[+] {result['outputs']} outputs indexed ({result['added']} new) → {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import sqlite3
+import threading
+
+import numpy as np
+
+from experimental.block_cache import REORG_SAFE_DEPTH
+
+# Outputs per get_outs request; monerod's restricted RPC allows up to 5000
+GET_OUTS_BATCH = 1000
+# Seconds a write waits for the database lock; parallel workers share one file
+SQLITE_TIMEOUT = 60
+
+
+class OutputResolver:
+    """Resolve ring members, (amount, global_index) pairs, to (height, timestamp, key, mask)
+
+    Global indices count per amount: RingCT members (amount 0) index the RingCT
+    outputs, pre-RingCT members the outputs of their own amount. Members are
+    deduplicated across every ring in a batch. RingCT ones come from the node's
+    OutputIndex when it has one; the rest are fetched with size-capped bulk get_outs
+    calls, and their heights mapped to timestamps with one header-range fetch.
+    Fetched results go into a persistent SQLite table so later runs skip the daemon.
+    """
+
+    def __init__(self, node, path="output_index.sqlite", batch_size=GET_OUTS_BATCH):
+        self.node = node
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=SQLITE_TIMEOUT)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # The old table was keyed by global index alone and fetched every member as
+        # RingCT, so its pre-RingCT rows point at the wrong outputs
+        self._conn.execute("DROP TABLE IF EXISTS outputs")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS ring_outputs (
+                amount INTEGER NOT NULL,
+                global_index INTEGER NOT NULL,
+                height INTEGER NOT NULL,
+                timestamp INTEGER,
+                key BLOB NOT NULL,
+                mask BLOB NOT NULL,
+                txid BLOB,
+                PRIMARY KEY (amount, global_index)
+            )
+        """)
+        self._conn.commit()
+
+    def resolve(self, members):
+        """Return {(amount, global_index): {"height", "timestamp", "key", "mask", "txid"}} for every resolvable member"""
+        wanted = sorted({(int(amount), int(index)) for amount, index in members})
+        # RingCT members the node's output index covers need neither a daemon call nor a row here
+        found, missing = self.node._indexed_origins(getattr(self.node, "output_index", None), wanted)
+        self._attach_timestamps(found)
+        found.update(self._load(missing))
+
+        missing = [m for m in missing if m not in found]
+        if missing:
+            fetched = self._fetch_outs(missing)
+            self._attach_timestamps(fetched)
+            self._store(fetched)
+            found.update(fetched)
+        return found
+
+    def resolve_arrays(self, members, amounts=None):
+        """Resolve flat arrays of ring members into aligned float (heights, timestamps), NaN if unknown
+
+        `amounts` gives each member's amount; without it every member is RingCT.
+        """
+        members = np.asarray(members, dtype=np.uint64)
+        amounts = np.zeros(len(members), dtype=np.uint64) if amounts is None else np.asarray(amounts, dtype=np.uint64)
+        unique, inverse = np.unique(np.column_stack((amounts, members)), axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        keys = [tuple(pair) for pair in unique.tolist()]
+        resolved = self.resolve(keys)
+
+        unique_heights = np.full(len(keys), np.nan)
+        unique_timestamps = np.full(len(keys), np.nan)
+        for i, key in enumerate(keys):
+            out = resolved.get(key)
+            if out is not None:
+                unique_heights[i] = out["height"]
+                if out["timestamp"] is not None:
+                    unique_timestamps[i] = out["timestamp"]
+        return unique_heights[inverse], unique_timestamps[inverse]
+
+    def _fetch_outs(self, members):
+        fetched = {}
+        for i in range(0, len(members), self.batch_size):
+            batch = members[i:i + self.batch_size]
+            result = self.node._make_non_json_rpc_call("get_outs", self.node._get_outs_params(batch))
+            for member, origin in self.node._origins_from_outs(batch, result.get("outs", [])).items():
+                fetched[member] = {
+                    "height": origin["height"],
+                    "timestamp": None,
+                    "key": origin["key"],
+                    "mask": origin["mask"],
+                    "txid": origin["txid"],
+                }
+        return fetched
+
+    def _attach_timestamps(self, outputs):
+        """Fill in block timestamps from the node's height index, or header fetches of just those heights"""
+        if not outputs:
+            return
+        timestamps = self.node.get_block_timestamps(out["height"] for out in outputs.values())
+        for out in outputs.values():
+            out["timestamp"] = timestamps.get(out["height"])
+
+    def _load(self, members):
+        found = {}
+        by_amount = {}
+        for amount, index in members:
+            by_amount.setdefault(amount, []).append(index)
+        with self._lock:
+            for amount, indices in by_amount.items():
+                # Stay under SQLite's bound-parameter limit; rows an earlier run stored
+                # without a timestamp count as missing
+                for i in range(0, len(indices), 500):
+                    chunk = indices[i:i + 500]
+                    rows = self._conn.execute(
+                        f"SELECT global_index, height, timestamp, key, mask, txid FROM ring_outputs "
+                        f"WHERE amount = ? AND global_index IN ({','.join('?' * len(chunk))}) "
+                        f"AND timestamp IS NOT NULL", [amount] + chunk
+                    ).fetchall()
+                    for index, height, timestamp, key, mask, txid in rows:
+                        found[(amount, index)] = {
+                            "height": height,
+                            "timestamp": timestamp,
+                            "key": key.hex(),
+                            "mask": mask.hex(),
+                            "txid": txid.hex() if txid else "",
+                        }
+        return found
+
+    def _store(self, outputs):
+        # Outputs near the tip could still be reorged away, so only persist settled ones;
+        # one whose timestamp lookup failed stays out so the next run fetches it again
+        tip_height = self.node.tip_height
+        rows = [
+            (amount, index, out["height"], out["timestamp"], bytes.fromhex(out["key"]),
+             bytes.fromhex(out["mask"]), bytes.fromhex(out["txid"]) if out["txid"] else None)
+            for (amount, index), out in outputs.items()
+            if tip_height is not None and out["height"] <= tip_height - REORG_SAFE_DEPTH
+            and out["timestamp"] is not None
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO ring_outputs VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
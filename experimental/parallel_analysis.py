@@ -0,0 +1,101 @@
+"""
+Process-pool GNH analysis of a block range.
+
+The range is cut into contiguous height shards, a few per worker so a shard full of
+busy blocks does not hold up the rest. Each worker process opens its own daemon
+session (or its own LMDB reader) and output resolver once, then fetches, decodes,
+resolves and scores its shards independently. The per-shard DataFrames come back in
+height order and are concatenated into one columnar result.
+"""
+
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from experimental.gnh_batch import analyze_range
+from experimental.height_index import HeightIndex
+from experimental.output_resolver import OutputResolver
+
+# Shards queued per worker; smaller shards balance better but repeat more lookups
+SHARDS_PER_WORKER = 4
+# Shards smaller than this are not worth a round trip to a worker
+MIN_SHARD_BLOCKS = 10
+
+# Per-process state, set up once by _init_worker
+_worker = {}
+
+
+def shard_range(start_height, end_height, num_shards, min_blocks=MIN_SHARD_BLOCKS):
+    """Split start..end (inclusive) into at most num_shards contiguous (start, end) ranges"""
+    total = end_height - start_height + 1
+    if total <= 0:
+        return []
+    num_shards = max(1, min(num_shards, total // min_blocks or 1))
+    size, extra = divmod(total, num_shards)
+    shards = []
+    low = start_height
+    for i in range(num_shards):
+        high = low + size - 1 + (1 if i < extra else 0)
+        shards.append((low, high))
+        low = high + 1
+    return shards
+
+
+def open_source(daemon=None, lmdb_path=None, height_index=None, output_index=None):
+    """A node for this process: an LMDB reader when lmdb_path is given, otherwise a daemon client"""
+    if lmdb_path:
+        from experimental.lmdb_reader import MoneroLMDBReader
+        return MoneroLMDBReader(lmdb_path)
+    from experimental.node_visualization import MoneroNodeVisualization
+    from experimental.output_index import OutputIndex
+    index = HeightIndex(height_index) if height_index else None
+    outputs = OutputIndex(output_index) if output_index else None
+    return MoneroNodeVisualization(daemon, height_index=index, output_index=outputs, check_on_init=False)
+
+
+def _init_worker(daemon, lmdb_path, height_index, output_index, outputs_db):
+    # The node logs every call; workers would interleave thousands of lines
+    sys.stdout = open(os.devnull, "w")
+    node = open_source(daemon, lmdb_path, height_index, output_index)
+    node._make_rpc_call("get_info")
+    _worker["node"] = node
+    _worker["resolver"] = OutputResolver(node, outputs_db)
+
+
+def _analyze_shard(shard):
+    start_height, end_height = shard
+    return analyze_range(_worker["node"], start_height, end_height, _worker["resolver"])
+
+
+def run_parallel(start_height, end_height, daemon=None, lmdb_path=None, height_index=None,
+                 outputs_db="output_index.sqlite", workers=None, shards_per_worker=SHARDS_PER_WORKER,
+                 output_index=None):
+    """Score every ring in start..end on a process pool; returns one DataFrame in height order
+
+    The height and output indexes, if any, must already be synced: workers only map them read-only.
+    """
+    workers = workers or os.cpu_count() or 1
+    shards = shard_range(start_height, end_height, workers * shards_per_worker)
+    if not shards:
+        raise ValueError("end_height must not be below start_height")
+    workers = min(workers, len(shards))
+    if lmdb_path:
+        # Built once here; every worker then maps the finished file instead of scanning the tables
+        reader = open_source(lmdb_path=lmdb_path)
+        try:
+            reader._load_output_index()
+        finally:
+            reader.close()
+
+    # spawn: LMDB environments and HTTP pools must not be inherited across fork
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(daemon, lmdb_path, height_index, output_index, outputs_db)) as pool:
+        frames = list(pool.map(_analyze_shard, shards))
+
+    # Empty shards still carry the column layout, so keep one if nothing else is left
+    frames = [df for df in frames if len(df)] or frames[:1]
+    return pd.concat(frames, ignore_index=True)
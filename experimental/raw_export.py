@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped reader for `monero-blockchain-export` files (blockchain.raw).
+
+Usage:
+    python -m experimental.raw_export <blockchain.raw> [--start H] [--end H] [--show N]
+    python -m experimental.raw_export <blockchain.raw> --load chain_store.sqlite [--start H] [--end H]
+                                      [--height-index FILE]
+
+Layout: a 4-byte magic, a header of `header_size` bytes (file_info and blocks_info,
+zero-padded), then one chunk per block: a uint32 length followed by a serialized
+block_package (block, full transactions, weight, cumulative difficulty, coins
+generated). Blocks are yielded as zero-copy memoryview slices of the mapping; a side
+index of chunk offsets (<file>.idx) makes seeking to a height O(1).
+
+--load decodes every block into the same (header, transactions) shape the RPC path
+produces and bulk-inserts it into a ChainStore, so an exported chain can be loaded
+offline without a daemon.
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import time
+from array import array
+from datetime import datetime
+
+from experimental.blob_decoder import (
+    BlobDecodeError, read_varint, read_bytes, parse_block_at, parse_full_transaction,
+)
+from experimental.monero_hash import transaction_hash, block_hash
+
+RAW_MAGIC = 0x28721586
+# Blocks written per ChainStore transaction during --load
+LOAD_BATCH = 500
+
+
+def _read_big_varint(buf, pos):
+    """Varint without the 64-bit cap (cumulative difficulty is 128-bit)"""
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(buf):
+            raise BlobDecodeError("Truncated varint")
+        byte = buf[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def parse_block_package(buf):
+    """Decode one chunk's block_package
+
+    Returns {"block", "header_end", "miner_tx_span", "txs", "tx_spans", "block_weight",
+    "cumulative_difficulty", "coins_generated"}; spans are offsets into buf.
+    """
+    block, header_end, miner_tx_span, pos = parse_block_at(buf)
+    count, pos = read_varint(buf, pos)
+    txs = []
+    tx_spans = []
+    for _ in range(count):
+        start = pos
+        tx, prefix_end, base_end, pos = parse_full_transaction(buf, pos)
+        txs.append(tx)
+        tx_spans.append((start, prefix_end, base_end, pos))
+
+    package = {
+        "block": block,
+        "header_end": header_end,
+        "miner_tx_span": miner_tx_span,
+        "txs": txs,
+        "tx_spans": tx_spans,
+        "block_weight": None,
+        "cumulative_difficulty": None,
+        "coins_generated": None,
+    }
+    try:
+        package["block_weight"], pos = read_varint(buf, pos)
+        package["cumulative_difficulty"], pos = _read_big_varint(buf, pos)
+        package["coins_generated"], pos = _read_big_varint(buf, pos)
+    except BlobDecodeError:
+        # Older exports end the package differently; the block itself is intact
+        pass
+    return package
+
+
+class RawExportReader:
+    """Zero-copy iteration and seeking over a blockchain.raw export"""
+
+    def __init__(self, path, index_path=None):
+        self.path = path
+        self.index_path = index_path or path + ".idx"
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mmap)
+        self.size = len(self._buf)
+        self._offsets = None
+
+        (magic,) = struct.unpack_from("<I", self._buf, 0)
+        if magic != RAW_MAGIC:
+            raise BlobDecodeError(f"Not a blockchain export: magic 0x{magic:08x}")
+        # file_info: major, minor (uint8), header_size (varint)
+        (info_size,) = struct.unpack_from("<I", self._buf, 4)
+        info = self._buf[8:8 + info_size]
+        self.major_version, self.minor_version = info[0], info[1]
+        header_size, _ = read_varint(info, 2)
+        # blocks_info: block_first, block_last, block_last_pos (varints)
+        pos = 8 + info_size
+        (blocks_size,) = struct.unpack_from("<I", self._buf, pos)
+        blocks_info = self._buf[pos + 4:pos + 4 + blocks_size]
+        self.block_first, p = read_varint(blocks_info, 0)
+        self.block_last, _ = read_varint(blocks_info, p)
+        self.data_start = 4 + header_size
+
+    def __len__(self):
+        return len(self._index()) - 2
+
+    def __iter__(self):
+        return self.iter_blocks()
+
+    def iter_blocks(self, start_height=None, end_height=None):
+        """Yield (height, block_package memoryview) for start..end (inclusive), in order"""
+        if start_height is None or start_height <= self.block_first:
+            height, pos = self.block_first, self.data_start
+        else:
+            height, pos = start_height, self.offset_of(start_height)
+        buf = self._buf
+        while pos + 4 <= self.size and (end_height is None or height <= end_height):
+            (chunk_size,) = struct.unpack_from("<I", buf, pos)
+            chunk, _ = read_bytes(buf, pos + 4, chunk_size)
+            yield height, chunk
+            pos += 4 + chunk_size
+            height += 1
+
+    def offset_of(self, height):
+        """File offset of the chunk holding `height`"""
+        offsets = self._index()
+        i = height - self.block_first + 2
+        if not 2 <= i < len(offsets):
+            raise IndexError(f"Height {height} is not in {self.path}")
+        return offsets[i]
+
+    def block_package(self, height):
+        """Decoded block_package for one height"""
+        for _, chunk in self.iter_blocks(height, height):
+            return parse_block_package(chunk)
+        raise IndexError(f"Height {height} is not in {self.path}")
+
+    def _index(self):
+        """[file size, first height, chunk offset per block...], loaded or rebuilt as needed"""
+        if self._offsets is not None:
+            return self._offsets
+        offsets = array("Q")
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                offsets.frombytes(f.read())
+        if len(offsets) < 2 or offsets[0] != self.size or offsets[1] != self.block_first:
+            offsets = self.build_index()
+        self._offsets = offsets
+        return offsets
+
+    def build_index(self):
+        """One pass over the chunk lengths (no block is decoded); writes the side index"""
+        offsets = array("Q", [self.size, self.block_first])
+        buf = self._buf
+        pos = self.data_start
+        while pos + 4 <= self.size:
+            (chunk_size,) = struct.unpack_from("<I", buf, pos)
+            if pos + 4 + chunk_size > self.size:
+                break
+            offsets.append(pos)
+            pos += 4 + chunk_size
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            offsets.tofile(f)
+        os.replace(tmp_path, self.index_path)
+        self._offsets = offsets
+        return offsets
+
+    def close(self):
+        """Unmap the file; fails with BufferError while yielded slices are still referenced"""
+        self._buf.release()
+        self._mmap.close()
+        self._file.close()
+
+
+def iter_store_blocks(reader, start_height=None, end_height=None, output_counts=None):
+    """Yield (header, txs) in ChainStore.ingest_block's shape, as the RPC path builds them
+
+    Global output indices are counted per amount (v2 outputs under amount 0), so
+    they are only known from genesis or for the amounts output_counts gives counts
+    before start_height for; a transaction with an output of any other amount keeps
+    empty output_indices. A mid-chain seed normally covers RingCT (amount 0) only, so
+    below the RingCT fork v1 transactions are left without indices rather than given
+    ones counted from 0. A block's hash is the next block's prev_id, so only the last
+    one is hashed here.
+    """
+    counts = dict(output_counts) if output_counts is not None else None
+    # From genesis every amount starts at 0; a seed knows only the amounts it lists
+    from_genesis = counts is None and reader.block_first == 0 and not start_height
+    if from_genesis:
+        counts = {}
+
+    pending = None
+    prev_cumulative = None
+    for height, chunk in reader.iter_blocks(start_height, end_height):
+        package = parse_block_package(chunk)
+        block = package["block"]
+        miner_tx = block["miner_tx"]
+        miner_hash = transaction_hash(chunk, *package["miner_tx_span"], miner_tx["version"])
+
+        cumulative = package["cumulative_difficulty"]
+        if cumulative is not None and (prev_cumulative is not None or height == 0):
+            difficulty = cumulative - (prev_cumulative or 0)
+        else:
+            difficulty = None
+        prev_cumulative = cumulative
+
+        txs = [{"tx_hash": miner_hash.hex(), "tx_json": miner_tx}]
+        txs += [{"tx_hash": tx_hash, "tx_json": tx} for tx_hash, tx in zip(block["tx_hashes"], package["txs"])]
+        for tx in txs:
+            tx["block_height"] = height
+            tx["block_timestamp"] = block["timestamp"]
+            if counts is not None:
+                indices = []
+                for out in tx["tx_json"]["vout"]:
+                    amount = 0 if tx["tx_json"]["version"] >= 2 else out["amount"]
+                    if amount not in counts and not from_genesis:
+                        indices.append(None)
+                        continue
+                    indices.append(counts.get(amount, 0))
+                    counts[amount] = indices[-1] + 1
+                tx["output_indices"] = [] if None in indices else indices
+
+        header = {
+            "height": height,
+            "hash": None,
+            "prev_hash": block["prev_id"],
+            "timestamp": block["timestamp"],
+            "difficulty": difficulty,
+            "block_size": package["block_weight"],
+            "reward": sum(out["amount"] for out in miner_tx["vout"]),
+            "major_version": block["major_version"],
+            "minor_version": block["minor_version"],
+            "nonce": block["nonce"],
+        }
+        if pending is not None:
+            pending[0]["hash"] = block["prev_id"]
+            yield pending[:2]
+        pending = (header, txs, chunk[:package["header_end"]], miner_hash, block["tx_hashes"])
+
+    if pending is not None:
+        header, txs, header_blob, miner_hash, tx_hashes = pending
+        header["hash"] = block_hash(header_blob, miner_hash, [bytes.fromhex(h) for h in tx_hashes]).hex()
+        yield header, txs
+
+
+def load_into_store(reader, store, start_height=None, end_height=None, output_counts=None, batch_size=LOAD_BATCH):
+    """Bulk-load an export into a ChainStore; returns {"blocks", "height", "seconds"}"""
+    started = time.perf_counter()
+    loaded = 0
+    batch = []
+    height = None
+    for header, txs in iter_store_blocks(reader, start_height, end_height, output_counts):
+        batch.append((header, txs))
+        height = header["height"]
+        if len(batch) >= batch_size:
+            store.ingest_blocks(batch)
+            loaded += len(batch)
+            batch = []
+            print(f"⛓️ Loaded up to height {height} ({loaded / (time.perf_counter() - started):.0f} blocks/s)")
+    if batch:
+        store.ingest_blocks(batch)
+        loaded += len(batch)
+    return {"blocks": loaded, "height": height, "seconds": round(time.perf_counter() - started, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read or bulk-load a monero-blockchain-export file")
+    parser.add_argument("path", help="blockchain.raw")
+    parser.add_argument("--start", type=int, default=None)
+    parser.add_argument("--end", type=int, default=None)
+    parser.add_argument("--show", type=int, default=10, help="Blocks to print when not loading")
+    parser.add_argument("--load", default=None, help="ChainStore database to bulk-load into")
+    parser.add_argument("--height-index", default=None,
+                        help="HeightIndex used to seed RingCT output indices when not starting at genesis; "
+                             "pre-RingCT outputs are left without indices")
+    args = parser.parse_args()
+
+    reader = RawExportReader(args.path)
+    print(f"[+] {args.path}: format {reader.major_version}.{reader.minor_version}, "
+          f"{len(reader)} blocks from height {reader.block_first}")
+
+    if args.load:
+        from experimental.chain_store import ChainStore
+        output_counts = None
+        if args.height_index and args.start:
+            from experimental.height_index import HeightIndex
+            # Only the RingCT count is known; v1 amounts are not seeded
+            ringct_outputs = HeightIndex(args.height_index).cumulative_outputs(args.start - 1)
+            if ringct_outputs is None:
+                raise SystemExit(f"[!] {args.height_index} does not cover height {args.start - 1}")
+            output_counts = {0: ringct_outputs}
+        result = load_into_store(reader, ChainStore(args.load), args.start, args.end, output_counts)
+        print(f"[+] Loaded {result['blocks']} blocks up to height {result['height']} in {result['seconds']}s")
+        return
+
+    end = args.end if args.end is not None else (args.start or reader.block_first) + args.show - 1
+    for height, chunk in reader.iter_blocks(args.start, end):
+        package = parse_block_package(chunk)
+        block = package["block"]
+        print(f"Block {height}: {len(chunk)} bytes, {len(block['tx_hashes'])} txs, "
+              f"{datetime.utcfromtimestamp(block['timestamp']).strftime('%Y-%m-%d %H:%M:%S UTC')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Connections kept alive per daemon host
+DEFAULT_POOL_SIZE = 20
+# (connect timeout, read timeout) in seconds
+DEFAULT_TIMEOUT = (3.05, 10)
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.2
+# monerod answers 503/504 while busy syncing or behind a restrictive proxy
+RETRY_STATUS_CODES = (502, 503, 504)
+
+
+class RpcSession:
+    """Keep-alive, connection-pooled HTTP session for a single monerod"""
+
+    def __init__(self, base_url, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT,
+                 retries=DEFAULT_RETRIES, backoff_factor=DEFAULT_BACKOFF):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+
+        # Only retry when the request provably did not run (connect errors) or the daemon
+        # refused it while busy (status codes). A read timeout may mean the RPC ran, and
+        # not every RPC is idempotent; retrying it would also stretch the timeout several-fold
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(["POST"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry, pool_block=False)
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+
+    def post(self, endpoint, payload=None, timeout=None):
+        """POST a JSON payload to <base_url>/<endpoint> over a pooled connection"""
+        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        return self.session.post(url, json=payload, timeout=timeout or self.timeout)
+
+    def close(self):
+        self.session.close()
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(base_url, **kwargs):
+    """Return the process-wide shared session for a daemon URL, creating it on first use
+
+    The first caller's settings stay in effect; a later caller asking for different
+    ones gets the existing session and a warning.
+    """
+    key = base_url.rstrip("/")
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = RpcSession(key, **kwargs)
+            _sessions[key] = session
+            return session
+    ignored = {name: value for name, value in kwargs.items() if getattr(session, name, None) != value}
+    if ignored:
+        current = {name: getattr(session, name, None) for name in ignored}
+        print(f"⚠️ Shared session for {key} already uses {current}; ignoring {ignored}")
+    return session
+
+
+def close_all_sessions():
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()